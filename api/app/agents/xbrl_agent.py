@@ -0,0 +1,55 @@
+"""
+Pydantic-AI agent that drafts a validated XBRL statement from evidence.
+"""
+from pathlib import Path
+from typing import Callable, Optional
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.providers.openai import OpenAIProvider
+
+from app import clients
+from app.config import settings
+from app.models.financial import FinancialStatement
+
+SYSTEM_PROMPT = (Path(__file__).resolve().parents[1] / "prompts" / "system_prompt.txt").read_text(encoding="utf-8")
+
+# The model is bound per call to the shared OpenAI client, so nothing connects at import
+xbrl_agent = Agent(
+    output_type=FinancialStatement,
+    system_prompt=SYSTEM_PROMPT,
+    retries=2,
+    defer_model_check=True
+)
+
+
+def _arguments(message: ModelResponse) -> str:
+    """JSON arguments of the structured-output tool call received so far."""
+    return "".join(part.args_as_json_str() for part in message.parts if isinstance(part, ToolCallPart))
+
+
+async def draft_statement(evidence: str,
+                          on_delta: Optional[Callable[[str], None]] = None,
+                          model=None) -> FinancialStatement:
+    """
+    Draft a statement from formatted evidence, streaming its JSON as the model writes it.
+
+    Args:
+        evidence: Evidence digest (see `app.evidence.format_evidence`)
+        on_delta: Called with each new chunk of the statement's partial JSON
+        model: Pydantic-AI model (default: the chat model on the shared OpenAI client)
+
+    Returns:
+        Statement validated against `FinancialStatement`
+    """
+    if model is None:
+        model = OpenAIModel(settings.openai_model, provider=OpenAIProvider(openai_client=await clients.openai()))
+    async with xbrl_agent.run_stream(evidence, model=model, model_settings={"temperature": 0.0}) as result:
+        sent = ""
+        async for message, _ in result.stream_structured(debounce_by=None):
+            text = _arguments(message)
+            # A retried call restarts the JSON; only forward text that extends what was sent
+            if on_delta is not None and len(text) > len(sent) and text.startswith(sent):
+                on_delta(text[len(sent):])
+                sent = text
+        return await result.get_output()
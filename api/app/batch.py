@@ -0,0 +1,185 @@
+"""
+Batch due diligence jobs with bounded concurrency and resumable JSONL output.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.config import settings
+
+# Jobs started in this worker, by ID, for status queries
+JOBS: Dict[str, "BatchJob"] = {}
+
+RunFn = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def job_id_for(runs: List[Dict[str, Any]]) -> str:
+    """ID of a batch, derived from its run bodies so resubmitting it resumes it."""
+    digest = hashlib.sha256(json.dumps(runs, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def completed_indexes(path: str) -> Set[int]:
+    """
+    Indexes of the runs already written to a job's output.
+
+    A line cut short by a crash is dropped from the file, so appending
+    continues on a clean line. Failed runs do not count and are retried.
+
+    Args:
+        path: JSONL output of the job
+
+    Returns:
+        Indexes of successful runs
+    """
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    valid_bytes = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            valid_bytes += len(line)
+            record = json.loads(line)
+            if "error" not in record:
+                done.add(record["index"])
+    if valid_bytes < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return done
+
+
+class BatchJob:
+    """
+    One batch of runs executed by a fixed pool of worker tasks.
+
+    Every run goes through the same process-wide retrieval caches, so
+    prompts that share questions pay for embeddings and searches once.
+    Each result is appended to the output as a JSON line the moment it
+    finishes; restarting a job skips the runs already in the file.
+    """
+
+    def __init__(self,
+                 runs: List[Dict[str, Any]],
+                 run: RunFn,
+                 concurrency: Optional[int] = None,
+                 job_id: Optional[str] = None):
+        """
+        Create a job and register it for status queries.
+
+        Args:
+            runs: /run request bodies
+            run: Coroutine function running one body and returning the /run response body
+            concurrency: Runs in flight at once (default: settings.batch_concurrency)
+            job_id: ID to resume under (default: derived from the runs)
+        """
+        self.job_id = job_id or job_id_for(runs)
+        self.runs = runs
+        self.run = run
+        self.concurrency = max(1, concurrency or settings.batch_concurrency)
+        self.path = os.path.join(settings.batch_dir, f"{self.job_id}.jsonl")
+        self.state = "pending"
+        self.resumed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        JOBS[self.job_id] = self
+
+    def start(self) -> None:
+        """Run the job in the background on the current event loop."""
+        self._task = asyncio.create_task(self._execute())
+
+    def cancel(self) -> None:
+        """Stop the job; runs already written stay in the output for a later resume."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    @property
+    def running(self) -> bool:
+        """Whether the job has not reached a final state."""
+        return self.state in ("pending", "running")
+
+    async def _execute(self) -> None:
+        """Feed pending runs to the workers and append their results to the output."""
+        self.started_at = time.time()
+        self.state = "running"
+        try:
+            os.makedirs(settings.batch_dir, exist_ok=True)
+            done = completed_indexes(self.path)
+            self.resumed = len(done)
+            queue: asyncio.Queue = asyncio.Queue(maxsize=2 * self.concurrency)
+            with open(self.path, "a", encoding="utf-8") as output:
+                workers = [asyncio.create_task(self._worker(queue, output)) for _ in range(self.concurrency)]
+                try:
+                    for index, body in enumerate(self.runs):
+                        if index not in done:
+                            await queue.put((index, body))
+                    for _ in workers:
+                        await queue.put(None)
+                    await asyncio.gather(*workers)
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+            self.state = "done"
+        except asyncio.CancelledError:
+            self.state = "cancelled"
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+
+    async def _worker(self, queue: asyncio.Queue, output) -> None:
+        """Run bodies from the queue until the end marker."""
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, body = item
+            # A per-entry run ID lets a resumed job continue interrupted runs from their checkpoints
+            body = {**body, "run_id": body.get("run_id") or f"{self.job_id}-{index}"}
+            try:
+                record = {"index": index, "prompt": body.get("prompt"), **await self.run(body)}
+                self.succeeded += 1
+            except Exception as e:
+                record = {"index": index, "prompt": body.get("prompt"), "error": str(e)}
+                self.failed += 1
+            # No await between write and flush: lines from concurrent workers never interleave
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Progress of the job.
+
+        Returns:
+            State, run counts, elapsed seconds and throughput of this
+            session (resumed runs excluded), and the output path
+        """
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        finished = self.succeeded + self.failed
+        remaining = len(self.runs) - self.resumed - finished
+        rate = finished / elapsed if elapsed else 0.0
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "total": len(self.runs),
+            "resumed": self.resumed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "remaining": remaining,
+            "concurrency": self.concurrency,
+            "elapsed": round(elapsed, 3),
+            "runs_per_second": round(rate, 3),
+            "eta_seconds": round(remaining / rate, 1) if rate and self.running else None,
+            "output": self.path,
+            "error": self.error,
+        }
@@ -0,0 +1,161 @@
+"""
+Per-run budgets for the retrieve/analyze loop.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+from app.config import settings
+from app.evidence import count_tokens
+
+Budget = Dict[str, Any]
+T = TypeVar("T")
+
+# Budgets whose exhaustion ends the run without drafting: drafting would
+# overrun them further
+HARD_LIMITS = ("deadline", "tokens")
+
+_stats_lock = threading.Lock()
+_stats = {"runs": 0, "iterations": 0, "tokens": 0, "seconds": 0.0,
+          "stopped": {"iterations": 0, "tokens": 0, "deadline": 0}}
+
+
+def new_budget(max_iterations: Optional[int] = None,
+               max_tokens: Optional[int] = None,
+               timeout: Optional[float] = None) -> Budget:
+    """
+    Budget for one run, starting now.
+    
+    Args:
+        max_iterations: Retrieve/analyze rounds allowed (default: settings.max_iterations)
+        max_tokens: LLM tokens allowed (default: settings.max_run_tokens)
+        timeout: Seconds until the deadline (default: settings.run_timeout)
+    
+    Returns:
+        Budget with limits, start time and absolute deadline
+    """
+    started_at = time.time()
+    return {
+        "max_iterations": max_iterations or settings.max_iterations,
+        "max_tokens": max_tokens or settings.max_run_tokens,
+        "started_at": started_at,
+        "deadline": started_at + (timeout or settings.run_timeout),
+    }
+
+
+def exhausted(state: Dict[str, Any]) -> Optional[str]:
+    """
+    Name of the first budget the run has used up.
+    
+    Args:
+        state: Graph state with budget, iterations and tokens
+    
+    Returns:
+        "deadline", "tokens" or "iterations", or None while within budget
+    """
+    budget = state["budget"]
+    if time.time() >= budget["deadline"]:
+        return "deadline"
+    if state.get("tokens", 0) >= budget["max_tokens"]:
+        return "tokens"
+    if state.get("iterations", 0) >= budget["max_iterations"]:
+        return "iterations"
+    return None
+
+
+def remaining(state: Dict[str, Any]) -> float:
+    """Seconds left until the run's deadline, 0 once it has passed."""
+    return max(0.0, state["budget"]["deadline"] - time.time())
+
+
+async def before_deadline(state: Dict[str, Any], awaitable: Awaitable[T]) -> T:
+    """
+    Await a Qdrant or LLM call, cancelling it when the run's deadline passes.
+    
+    `exhausted` only sees the deadline between rounds; this bounds the
+    calls inside a round, so a slow search or completion cannot hold the
+    run past its timeout.
+    
+    Args:
+        state: Graph state with the budget
+        awaitable: Call to await
+    
+    Returns:
+        Result of the call
+    
+    Raises:
+        asyncio.TimeoutError: The deadline passed first
+    """
+    return await asyncio.wait_for(awaitable, remaining(state))
+
+
+def llm_tokens(prompt: str, reply: Any) -> int:
+    """
+    Tokens an LLM call used: the provider's count when the reply carries
+    one, otherwise an estimate from the prompt and reply text.
+    
+    Args:
+        prompt: Prompt sent
+        reply: Chat model reply (message) or its text
+    
+    Returns:
+        Total tokens of the call
+    """
+    metadata = getattr(reply, "usage_metadata", None)
+    if metadata and metadata.get("total_tokens"):
+        return metadata["total_tokens"]
+    return count_tokens(prompt) + count_tokens(getattr(reply, "content", None) or str(reply))
+
+
+def usage(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Budget usage of a run, for the response.
+    
+    Args:
+        state: Graph state
+    
+    Returns:
+        Iterations, tokens and seconds used against their limits, and the
+        budget that stopped the run, if any
+    """
+    budget = state["budget"]
+    return {
+        "iterations": state.get("iterations", 0),
+        "max_iterations": budget["max_iterations"],
+        "tokens": state.get("tokens", 0),
+        "max_tokens": budget["max_tokens"],
+        "seconds": round(time.time() - budget["started_at"], 3),
+        "timeout": round(budget["deadline"] - budget["started_at"], 3),
+        "stop_reason": state.get("stop_reason"),
+    }
+
+
+def record(state: Dict[str, Any]) -> None:
+    """Add a finished run's usage to the worker totals."""
+    used = usage(state)
+    with _stats_lock:
+        _stats["runs"] += 1
+        _stats["iterations"] += used["iterations"]
+        _stats["tokens"] += used["tokens"]
+        _stats["seconds"] += used["seconds"]
+        if used["stop_reason"]:
+            _stats["stopped"][used["stop_reason"]] += 1
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Budget usage of the runs finished in this worker.
+    
+    Returns:
+        Totals and per-run averages, and how often each budget stopped a run
+    """
+    with _stats_lock:
+        runs = _stats["runs"] or 1
+        return {
+            **_stats,
+            "stopped": dict(_stats["stopped"]),
+            "avg_iterations": _stats["iterations"] / runs,
+            "avg_tokens": _stats["tokens"] / runs,
+            "avg_seconds": _stats["seconds"] / runs,
+        }
@@ -0,0 +1,162 @@
+"""
+In-process LRU/TTL caches with an optional shared Redis layer.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional dependency
+    redis = None
+
+# Every cache created, by name, for the /metrics endpoint
+CACHES: Dict[str, "Cache"] = {}
+
+
+class Cache:
+    """
+    Bounded LRU cache, optionally with a TTL and a Redis layer shared by all workers.
+    
+    Lookups check the local cache first, then Redis; a Redis hit is copied
+    into the local cache. Redis is reached through the asyncio client, so
+    `get` and `set` are coroutines and never block the event loop. Values written to Redis go through `encode` and
+    come back through `decode`, so they must round-trip through bytes.
+    """
+    
+    def __init__(self,
+                 name: str,
+                 maxsize: int,
+                 ttl: Optional[float] = None,
+                 redis_url: Optional[str] = None,
+                 encode: Callable[[Any], bytes] = None,
+                 decode: Callable[[bytes], Any] = None):
+        """
+        Create a cache and register it for metrics.
+        
+        Args:
+            name: Name used in metrics and as the Redis key prefix
+            maxsize: Maximum entries held in process
+            ttl: Seconds an entry stays valid (None: until evicted)
+            redis_url: Redis URL for the shared layer (None: in-process only)
+            encode: Serialiser for Redis values
+            decode: Deserialiser for Redis values
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self._redis = None
+        if redis_url:
+            if redis is None:
+                print(f"CACHE_REDIS_URL is set but the redis package is not installed; "
+                      f"{name} cache is in-process only")
+            else:
+                self._redis = redis.Redis.from_url(redis_url)
+                self._encode, self._decode = encode, decode
+        
+        CACHES[name] = self
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a value.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(f"{self.name}:{key}")
+            except Exception as e:
+                print(f"Error reading {self.name} cache from Redis: {e}")
+                raw = None
+            if raw is not None:
+                value = self._decode(raw)
+                self._store(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store a value locally and, if configured, in Redis.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        self._store(key, value)
+        if self._redis is not None:
+            try:
+                await self._redis.set(f"{self.name}:{key}", self._encode(value),
+                                      ex=int(self.ttl) if self.ttl else None)
+            except Exception as e:
+                print(f"Error writing {self.name} cache to Redis: {e}")
+    
+    def _store(self, key: str, value: Any) -> None:
+        """Insert into the local cache, evicting the least recently used entries."""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every local entry."""
+        with self._lock:
+            self._entries.clear()
+    
+    async def close(self) -> None:
+        """Close the Redis connection pool, if any."""
+        if self._redis is not None:
+            await self._redis.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarise cache usage for this process.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "shared": self._redis is not None,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            }
+
+
+async def close_caches() -> None:
+    """Close the Redis pools of every cache."""
+    for cache in CACHES.values():
+        await cache.close()
@@ -0,0 +1,157 @@
+"""
+Durable LangGraph checkpoints and recorded node outputs in local SQLite.
+
+Checkpoints are keyed by run ID (the LangGraph thread ID), so a run cut
+short by a crash or restart resumes after its last completed node. Every
+node that calls Qdrant or the LLM also records its output under a hash of
+the node name and its input state; a replayed run with identical state
+reads those outputs back instead of paying for the calls again.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from app.config import settings
+
+# Budget timestamps differ between otherwise identical runs
+_VOLATILE_BUDGET_KEYS = ("started_at", "deadline")
+
+_store: Dict[str, Any] = {}
+_open_lock = asyncio.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {"recorded": 0, "replayed": 0, "resumed": 0}
+
+
+async def open_checkpointer() -> None:
+    """Open the checkpoint database, if configured and not already open."""
+    if _store or not settings.checkpoint_db:
+        return
+    # Concurrent first requests outside the lifespan must not each open (and leak) a connection
+    async with _open_lock:
+        if not _store:
+            await _connect()
+
+
+async def _connect() -> None:
+    """Connect, create the node outputs table and set up the saver."""
+    conn = await aiosqlite.connect(settings.checkpoint_db)
+    # Several API workers share the file: readers must not block the writer
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA busy_timeout=5000")
+    await conn.execute(
+        "CREATE TABLE IF NOT EXISTS node_outputs "
+        "(key TEXT PRIMARY KEY, node TEXT NOT NULL, output TEXT NOT NULL, created_at REAL NOT NULL)"
+    )
+    await conn.commit()
+    saver = AsyncSqliteSaver(conn)
+    await saver.setup()
+    _store.update(conn=conn, saver=saver)
+
+
+async def close_checkpointer() -> None:
+    """Close the checkpoint database."""
+    if not _store:
+        return
+    await _store["conn"].close()
+    _store.clear()
+
+
+async def checkpointer() -> Optional[AsyncSqliteSaver]:
+    """Shared checkpointer, or None when CHECKPOINT_DB is empty."""
+    await open_checkpointer()
+    return _store.get("saver")
+
+
+def state_key(node: str, state: Dict[str, Any]) -> str:
+    """
+    Replay key of a node call: the node name and its input state, without
+    the budget clock.
+
+    Args:
+        node: Node name
+        state: Graph state passed to the node
+
+    Returns:
+        Hex digest identifying the call
+    """
+    values = dict(state)
+    if values.get("budget"):
+        values["budget"] = {k: v for k, v in values["budget"].items() if k not in _VOLATILE_BUDGET_KEYS}
+    payload = json.dumps({"node": node, "state": values}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def recorded_output(key: str) -> Optional[Dict[str, Any]]:
+    """Output recorded for a node call, or None."""
+    if not _store:
+        return None
+    async with _store["conn"].execute("SELECT output FROM node_outputs WHERE key = ?", (key,)) as cursor:
+        row = await cursor.fetchone()
+    return json.loads(row[0]) if row else None
+
+
+async def record_output(key: str, node: str, output: Dict[str, Any]) -> None:
+    """Record a node call's output for later replays."""
+    if not _store:
+        return
+    await _store["conn"].execute(
+        "INSERT OR REPLACE INTO node_outputs (key, node, output, created_at) VALUES (?, ?, ?, ?)",
+        (key, node, json.dumps(output, default=str), time.time())
+    )
+    await _store["conn"].commit()
+    with _stats_lock:
+        _stats["recorded"] += 1
+
+
+def replayable(node: str, fn: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+    """
+    Wrap a graph node so its outputs are recorded, and reused when the run
+    config sets `replay`.
+
+    Args:
+        node: Node name, part of the replay key
+        fn: Async node function
+
+    Returns:
+        Async node function taking the state and the run config
+    """
+    async def call(state: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+        key = state_key(node, state)
+        if (config.get("configurable") or {}).get("replay"):
+            output = await recorded_output(key)
+            if output is not None:
+                with _stats_lock:
+                    _stats["replayed"] += 1
+                return output
+        output = await fn(state)
+        if output.get("stop_reason") != "deadline":  # depends on the clock, not the state
+            await record_output(key, node, output)
+        return output
+
+    call.__name__ = fn.__name__
+    call.__doc__ = fn.__doc__
+    return call
+
+
+def record_resume() -> None:
+    """Count a run resumed from its checkpoint."""
+    with _stats_lock:
+        _stats["resumed"] += 1
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Checkpoint usage in this worker.
+
+    Returns:
+        Whether checkpointing is on, node outputs recorded and replayed,
+        and runs resumed
+    """
+    with _stats_lock:
+        return {"enabled": bool(settings.checkpoint_db), **_stats}
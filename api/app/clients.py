@@ -0,0 +1,64 @@
+"""
+Shared async clients for Qdrant, OpenAI embeddings and the chat model.
+
+The FastAPI lifespan opens them once per worker with connection pools sized
+by the settings, so concurrent requests share keep-alive connections instead
+of each blocking a thread. Scripts that never start the app get the same
+clients on first use.
+"""
+from typing import Any, Dict
+import httpx
+from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI
+from qdrant_client import AsyncQdrantClient
+
+from app.config import settings
+
+_clients: Dict[str, Any] = {}
+
+
+async def open_clients() -> None:
+    """Create the shared clients, if not already open."""
+    if _clients:
+        return
+    limits = httpx.Limits(
+        max_connections=settings.openai_max_connections,
+        max_keepalive_connections=settings.openai_max_connections
+    )
+    http_client = httpx.AsyncClient(limits=limits, timeout=settings.openai_timeout)
+    _clients["http"] = http_client
+    _clients["qdrant"] = AsyncQdrantClient(url=settings.qdrant_url, pool_size=settings.qdrant_pool_size)
+    _clients["openai"] = AsyncOpenAI(api_key=settings.openai_api_key, http_client=http_client)
+    _clients["llm"] = ChatOpenAI(
+        model=settings.openai_model,
+        temperature=0.0,
+        api_key=settings.openai_api_key,
+        http_async_client=http_client
+    )
+
+
+async def close_clients() -> None:
+    """Close the shared clients and their connection pools."""
+    if not _clients:
+        return
+    await _clients["qdrant"].close()
+    await _clients["http"].aclose()
+    _clients.clear()
+
+
+async def qdrant() -> AsyncQdrantClient:
+    """Shared async Qdrant client."""
+    await open_clients()
+    return _clients["qdrant"]
+
+
+async def openai() -> AsyncOpenAI:
+    """Shared async OpenAI client (embeddings)."""
+    await open_clients()
+    return _clients["openai"]
+
+
+async def llm() -> ChatOpenAI:
+    """Shared chat model for the graph nodes."""
+    await open_clients()
+    return _clients["llm"]
@@ -0,0 +1,169 @@
+"""
+Configuration for the RegulaSense API.
+"""
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+
+# Load environment variables
+load_dotenv()
+
+class Settings(BaseModel):
+    """Settings for the API service."""
+    # Server
+    api_host: str = Field(
+        default=os.getenv("API_HOST", "0.0.0.0"),
+        description="Interface the API listens on"
+    )
+    api_port: int = Field(
+        default=int(os.getenv("API_PORT", "8000")),
+        description="Port the API listens on"
+    )
+    debug: bool = Field(
+        default=os.getenv("DEBUG", "false").lower() in ("1", "true", "yes"),
+        description="Enable debug mode"
+    )
+
+    # OpenAI
+    openai_api_key: Optional[str] = Field(
+        default=os.getenv("OPENAI_API_KEY"),
+        description="OpenAI API key"
+    )
+    openai_model: str = Field(
+        default=os.getenv("OPENAI_MODEL", "gpt-4o"),
+        description="Chat model used by the graph"
+    )
+    embedding_model: str = Field(
+        default=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+        description="Embedding model; must match the one used at ingest time"
+    )
+    openai_max_connections: int = Field(
+        default=int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+        description="Pooled HTTP connections per worker shared by the embedding and chat clients"
+    )
+    openai_timeout: float = Field(
+        default=float(os.getenv("OPENAI_TIMEOUT", "60")),
+        description="Seconds before an OpenAI request times out"
+    )
+
+    # Qdrant
+    qdrant_url: str = Field(
+        default=os.getenv("QDRANT_URL", "http://localhost:6333"),
+        description="URL for the Qdrant server"
+    )
+    qdrant_pool_size: int = Field(
+        default=int(os.getenv("QDRANT_POOL_SIZE", "100")),
+        description="Pooled connections per worker for the async Qdrant client"
+    )
+    collection_name: str = Field(
+        default=os.getenv("COLLECTION_NAME", "regulasense-evidence"),
+        description="Qdrant collection holding the evidence"
+    )
+    retrieval_limit: int = Field(
+        default=int(os.getenv("RETRIEVAL_LIMIT", "5")),
+        description="Evidence chunks returned per retrieval"
+    )
+    hybrid_search: bool = Field(
+        default=os.getenv("HYBRID_SEARCH", "false").lower() in ("1", "true", "yes"),
+        description="Fuse dense and BM25 sparse results (the collection needs SPARSE_VECTORS=1 at ingest)"
+    )
+    hybrid_candidates: int = Field(
+        default=int(os.getenv("HYBRID_CANDIDATES", "20")),
+        description="Candidates taken from each of the dense and sparse rankings before fusion"
+    )
+    rrf_k: int = Field(
+        default=int(os.getenv("RRF_K", "60")),
+        description="Reciprocal rank fusion constant; larger values flatten the rank weighting"
+    )
+    mmr_candidates: int = Field(
+        default=int(os.getenv("MMR_CANDIDATES", "20")),
+        description="Hits fetched for Maximal Marginal Relevance selection; at or below RETRIEVAL_LIMIT disables it"
+    )
+    mmr_lambda: float = Field(
+        default=float(os.getenv("MMR_LAMBDA", "0.7")),
+        description="MMR trade-off: 1.0 ranks by relevance only, lower values favour diverse chunks"
+    )
+    evidence_token_budget: int = Field(
+        default=int(os.getenv("EVIDENCE_TOKEN_BUDGET", "6000")),
+        description="Maximum tokens of evidence kept in the graph state; lowest-scoring chunks are evicted first"
+    )
+
+    # Run budgets (per-request overrides in the /run body)
+    max_iterations: int = Field(
+        default=int(os.getenv("MAX_ITERATIONS", "5")),
+        description="Retrieve/analyze rounds before the graph drafts with the evidence it has"
+    )
+    max_run_tokens: int = Field(
+        default=int(os.getenv("MAX_RUN_TOKENS", "50000")),
+        description="LLM tokens a run may use before it returns a partial answer"
+    )
+    run_timeout: float = Field(
+        default=float(os.getenv("RUN_TIMEOUT", "120")),
+        description="Seconds after which a run stops looping and returns a partial answer"
+    )
+
+    # Checkpoints
+    checkpoint_db: str = Field(
+        default=os.getenv("CHECKPOINT_DB", "checkpoints.sqlite"),
+        description="SQLite file for run checkpoints and recorded node outputs; empty disables them"
+    )
+
+    # Batch jobs
+    batch_concurrency: int = Field(
+        default=int(os.getenv("BATCH_CONCURRENCY", "16")),
+        description="Runs a batch job keeps in flight unless the request sets its own limit"
+    )
+    batch_dir: str = Field(
+        default=os.getenv("BATCH_DIR", "batch_runs"),
+        description="Directory for batch job JSONL output, one file per job ID"
+    )
+
+    # Gap analysis
+    coverage_done_threshold: float = Field(
+        default=float(os.getenv("COVERAGE_DONE_THRESHOLD", "0.9")),
+        description="Evidence coverage at or above which the gap analyzer finishes without an LLM call"
+    )
+    coverage_continue_threshold: float = Field(
+        default=float(os.getenv("COVERAGE_CONTINUE_THRESHOLD", "0.4")),
+        description="Evidence coverage below which the gap analyzer keeps retrieving without an LLM call"
+    )
+
+    # LLM response cache
+    llm_cache_db: str = Field(
+        default=os.getenv("LLM_CACHE_DB", "llm_cache.sqlite"),
+        description="SQLite file caching gap analyzer and draft responses across workers; empty disables it"
+    )
+    llm_cache_ttl: float = Field(
+        default=float(os.getenv("LLM_CACHE_TTL", "604800")),
+        description="Seconds a cached LLM response stays valid"
+    )
+    llm_cache_max_mb: float = Field(
+        default=float(os.getenv("LLM_CACHE_MAX_MB", "256")),
+        description="Size above which the least recently used LLM responses are evicted"
+    )
+
+    # Retrieval caches
+    query_embedding_cache_size: int = Field(
+        default=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048")),
+        description="Query embeddings kept in the in-process LRU cache"
+    )
+    result_cache_size: int = Field(
+        default=int(os.getenv("RESULT_CACHE_SIZE", "1024")),
+        description="Search results kept in the in-process cache"
+    )
+    result_cache_ttl: float = Field(
+        default=float(os.getenv("RESULT_CACHE_TTL", "300")),
+        description="Seconds a cached search result stays valid"
+    )
+    collection_version_ttl: float = Field(
+        default=float(os.getenv("COLLECTION_VERSION_TTL", "5")),
+        description="Seconds between checks of the collection version written by ingest"
+    )
+    cache_redis_url: Optional[str] = Field(
+        default=os.getenv("CACHE_REDIS_URL"),
+        description="Redis URL for sharing caches across API workers (requires the redis package)"
+    )
+
+# Default settings instance
+settings = Settings()
@@ -0,0 +1,167 @@
+"""
+Local evidence sufficiency scoring for the gap analyzer.
+"""
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.evidence import Evidence
+
+# Concepts the XBRL draft needs, with the phrasings filings use for them
+CONCEPTS = {
+    "revenue": ["revenue", "revenues", "net sales", "total sales", "turnover", "total net sales"],
+    "assets": ["total assets", "total consolidated assets"],  # bare "assets" also names HQLA, risk-weighted assets...
+    "net_income": ["net income", "net earnings", "net profit", "net loss", "profit for the year",
+                   "profit attributable"],
+}
+
+# Any concept term, as one alternation with a named group per concept
+_CONCEPT = re.compile(
+    "|".join(
+        rf"(?P<{concept}>\b(?:{'|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))})\b)"
+        for concept, terms in CONCEPTS.items()
+    ),
+    re.IGNORECASE
+)
+# A number, with the currency before it and a percent sign after it when present
+_NUMBER = re.compile(
+    r"(?P<currency>[$€£¥]\s?|\b(?:USD|EUR|GBP|JPY|CHF)\s?)?"
+    r"(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"(?P<percent>\s?(?:%|percent\b|per cent\b))?",
+    re.IGNORECASE
+)
+# Words that make the number after them a standard, rule or cross-reference (IFRS 15, Basel 3, paragraph 4)
+_REFERENCE = re.compile(
+    r"\b(?:IFRS|IAS|ASC|ASU|FAS|SFAS|GAAP|Basel|Pillar|CRR|CRD|Solvency|paragraph|para|section|article|"
+    r"art|note|chapter|rule|part|item|schedule|annex|appendix|page|table|figure|level|tier)\.?\s*$|§\s*$",
+    re.IGNORECASE
+)
+_YEAR = re.compile(r"(?:19|20)\d{2}")
+_PERIOD = re.compile(
+    r"\b(?:fiscal(?: year)?\s*(?:19|20)\d{2}|FY\s?(?:19|20)?\d{2}|Q[1-4]\s*(?:19|20)\d{2}"
+    r"|(?:year|quarter|period|months)\s+ended\b[^.]{0,40}?(?:19|20)\d{2}"
+    r"|as of\b[^.]{0,30}?(?:19|20)\d{2}|(?:19|20)\d{2})\b",
+    re.IGNORECASE
+)
+_UNIT = re.compile(
+    r"(?:\$|€|£|¥|\b(?:USD|EUR|GBP|JPY|CHF|dollars|euros)\b|\bin (?:thousands|millions|billions)\b"
+    r"|\b(?:thousand|million|billion|bn|mn)\b)",
+    re.IGNORECASE
+)
+# Characters after a concept term searched for its figure
+_FIGURE_WINDOW = 80
+
+_stats_lock = threading.Lock()
+_stats = {"done": 0, "continue": 0, "llm": 0}
+
+
+def _has_amount(window: str) -> bool:
+    """
+    Whether a window of text after a concept term holds a reported amount.
+    
+    An amount has a thousands separator or decimals, a currency sign or
+    code, or a currency/scale unit elsewhere in the window (e.g.
+    "450 million"). Percentages, years and numbers naming a standard or a
+    cross-reference ("IFRS 15", "Basel 3", "paragraph 4") are not amounts,
+    so a bare small integer in regulatory text earns no credit.
+    """
+    unit = _UNIT.search(window) is not None
+    for match in _NUMBER.finditer(window):
+        number = match.group("number")
+        if match.group("percent") or _REFERENCE.search(window[:match.start()]):
+            continue
+        if not match.group("currency") and _YEAR.fullmatch(number):
+            continue
+        if match.group("currency") or "," in number or "." in number or unit:
+            return True
+    return False
+
+
+@lru_cache(maxsize=4096)
+def _text_coverage(text: str) -> Tuple[Tuple[Tuple[str, float], ...], bool, bool]:
+    """
+    Concept, period and unit coverage of one chunk.
+    
+    A concept counts fully when an amount follows its term closely (see
+    `_has_amount`), and half when the term appears without one.
+    
+    Returns:
+        ((concept, credit), ...), period found, unit found
+    """
+    credit: Dict[str, float] = {}
+    for match in _CONCEPT.finditer(text):
+        concept = match.lastgroup
+        if credit.get(concept) == 1.0:
+            continue
+        window = text[match.end():match.end() + _FIGURE_WINDOW]
+        credit[concept] = max(credit.get(concept, 0.0), 1.0 if _has_amount(window) else 0.5)
+    return tuple(credit.items()), bool(_PERIOD.search(text)), bool(_UNIT.search(text))
+
+
+def coverage(evidence: List[Evidence]) -> Dict[str, Any]:
+    """
+    Score how well the evidence covers what the draft needs.
+    
+    Args:
+        evidence: Evidence records in the state
+    
+    Returns:
+        Dictionary with the overall score in [0, 1], per-concept credit and
+        whether a reporting period and a unit were found
+    """
+    concepts = {concept: 0.0 for concept in CONCEPTS}
+    period = unit = False
+    for record in evidence:
+        credits, has_period, has_unit = _text_coverage(record["text"])
+        for concept, credit in credits:
+            concepts[concept] = max(concepts[concept], credit)
+        period = period or has_period
+        unit = unit or has_unit
+    
+    score = (sum(concepts.values()) + period + unit) / (len(concepts) + 2)
+    return {"score": score, "concepts": concepts, "period": period, "unit": unit}
+
+
+def decide(evidence: List[Evidence]) -> Tuple[Optional[bool], Dict[str, Any]]:
+    """
+    Decide locally whether the evidence is sufficient, when the score is clear.
+    
+    A low score only means "keep retrieving" when the evidence is on the
+    statement's subject: some concept is named without its figure. Evidence
+    naming none of the concepts may answer a different kind of question
+    (e.g. a regulatory one), so that case is left to the LLM.
+    
+    Args:
+        evidence: Evidence records in the state
+    
+    Returns:
+        (True for done, False for continue, None when the gap analyzer
+        should ask the LLM), and the coverage report
+    """
+    report = coverage(evidence)
+    if report["score"] >= settings.coverage_done_threshold:
+        decision, outcome = True, "done"
+    elif (report["score"] < settings.coverage_continue_threshold
+          and any(credit == 0.5 for credit in report["concepts"].values())):
+        decision, outcome = False, "continue"
+    else:
+        decision, outcome = None, "llm"
+    with _stats_lock:
+        _stats[outcome] += 1
+    return decision, report
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Gap analyzer decisions in this worker.
+    
+    Returns:
+        Counts of local done/continue decisions and LLM calls, and the
+        share of LLM calls avoided
+    """
+    with _stats_lock:
+        avoided = _stats["done"] + _stats["continue"]
+        total = avoided + _stats["llm"]
+        return {**_stats, "llm_calls_avoided": avoided, "avoided_rate": avoided / total if total else 0.0}
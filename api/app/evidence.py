@@ -0,0 +1,114 @@
+"""
+Evidence records and the DDState evidence reducer.
+"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+Evidence = Dict[str, Any]
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """tiktoken encoding for the chat model, or None to fall back to a character estimate."""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(settings.openai_model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of chat-model tokens in text (about four characters per token without tiktoken)."""
+    encoding = _encoding()
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def text_hash(text: str) -> str:
+    """Hash of chunk text with whitespace folded, so reformatted copies collide."""
+    return hashlib.sha256(re.sub(r"\s+", " ", text).strip().encode("utf-8")).hexdigest()
+
+
+def make_evidence(hit: Dict[str, Any]) -> Evidence:
+    """
+    Build an evidence record from a search hit.
+    
+    Args:
+        hit: Hit with id, score and payload, as returned by `app.retrieval.search`
+    
+    Returns:
+        Evidence record with text, score, provenance, content hash and token count
+    """
+    payload = hit.get("payload") or {}
+    text = payload.get("text", "")
+    return {
+        "id": hit["id"],
+        "text": text,
+        "score": hit.get("score", 0.0),
+        "source": payload.get("source"),
+        "source_id": payload.get("source_id"),
+        "chunk_index": payload.get("chunk_index"),
+        "title": payload.get("title"),
+        "hash": text_hash(text),
+        "tokens": count_tokens(text),
+    }
+
+
+def merge_evidence(current: Optional[List[Evidence]], update: Optional[List[Evidence]]) -> List[Evidence]:
+    """
+    Reducer for `DDState.evidence`.
+    
+    Adds new chunks, drops duplicates by point ID or content hash (keeping
+    the higher score), and then evicts the lowest-scoring chunks until the
+    total fits `settings.evidence_token_budget`. Surviving chunks keep their
+    first-seen order, so repeated retrievals do not reshuffle the prompt.
+    
+    Args:
+        current: Evidence already in the state
+        update: Evidence returned by a node
+    
+    Returns:
+        Merged evidence list
+    """
+    merged: List[Evidence] = []
+    by_id: Dict[str, Evidence] = {}
+    by_hash: Dict[str, Evidence] = {}
+    
+    for record in (current or []) + (update or []):
+        existing = by_id.get(record["id"]) or by_hash.get(record["hash"])
+        if existing is not None:
+            if record["score"] > existing["score"]:
+                existing["score"] = record["score"]
+            continue
+        record = dict(record)
+        merged.append(record)
+        by_id[record["id"]] = record
+        by_hash[record["hash"]] = record
+    
+    budget = settings.evidence_token_budget
+    total = sum(record["tokens"] for record in merged)
+    if total <= budget:
+        return merged
+    
+    evicted = set()
+    for index in sorted(range(len(merged)), key=lambda i: merged[i]["score"]):
+        if total <= budget:
+            break
+        evicted.add(index)
+        total -= merged[index]["tokens"]
+    return [record for i, record in enumerate(merged) if i not in evicted]
+
+
+def format_evidence(evidence: List[Evidence]) -> str:
+    """Render evidence for a prompt, one cited chunk per paragraph."""
+    return "\n\n".join(
+        f"[{record['source']}:{record['source_id']}] {record['text']}" for record in evidence
+    )
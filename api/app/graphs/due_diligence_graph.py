@@ -1,60 +1,152 @@
 """
 LangGraph definition for iterative retrieval → enrichment → validation loop.
 """
-from typing import TypedDict, List, Annotated
-import operator, asyncio
+from typing import TypedDict, List, Annotated, Dict, Any, Optional
+import asyncio
+import json
+import operator
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
-from langchain_core.chat_models import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from qdrant_client import QdrantClient
-from app.config import settings
+from app import checkpoint, clients, llm_cache
 from app.agents.xbrl_agent import draft_statement
+from app.retrieval import search
+from app.evidence import Evidence, make_evidence, merge_evidence, format_evidence
+from app.coverage import decide
+from app.budget import Budget, HARD_LIMITS, before_deadline, exhausted, llm_tokens, new_budget
 
-llm = ChatOpenAI(model=settings.openai_model, temperature=0.0)
-
-client = QdrantClient(url=settings.qdrant_url)
-COLL = settings.collection_name
+# Part of the LLM response cache keys: bump when a node's prompt changes
+GAP_PROMPT_VERSION = "gap-v1"
+DRAFT_PROMPT_VERSION = "draft-v1"
 
 class DDState(TypedDict):
     messages: Annotated[List[str], operator.add]
-    evidence: Annotated[List[str], operator.add]  # doc chunks
+    evidence: Annotated[List[Evidence], merge_evidence]  # deduplicated, token-budgeted chunks
     complete: bool
+    filters: Dict[str, Any]  # payload filters for retrieval, e.g. source or date_from/date_to
+    budget: Budget  # iteration/token limits and deadline of this run
+    iterations: Annotated[int, operator.add]  # retrieve rounds so far
+    tokens: Annotated[int, operator.add]  # LLM tokens used so far
+    stop_reason: Optional[str]  # budget that ended the loop early
+
+def initial_state(prompt: str, filters: Optional[Dict[str, Any]] = None,
+                  budget: Optional[Budget] = None) -> DDState:
+    """Starting state of a run; the budget clock starts here unless one is given."""
+    return {"messages": [prompt], "evidence": [], "complete": False, "filters": filters or {},
+            "budget": budget or new_budget(), "iterations": 0, "tokens": 0, "stop_reason": None}
 
 # ------------- Node definitions ---------------------------------
-def retrieve(state: DDState) -> DDState:
-    query = state["messages"][-1]
-    hits = client.search(collection_name=COLL, query_text=query, limit=5)
-    docs = [h.payload["text"] for h in hits]
-    return {"evidence": docs, "messages": [f"Retrieved {len(docs)} docs."]}
+def deadline_reached(node: str) -> DDState:
+    # A Qdrant/LLM call outlived the run's deadline and was cancelled
+    get_stream_writer()({"event": "decision", "decision": "STOP", "stop_reason": "deadline"})
+    return {"messages": [f"Deadline reached in {node}."], "stop_reason": "deadline"}
+
+async def retrieve(state: DDState) -> DDState:
+    query = state["messages"][0]  # the user's prompt; later messages are node status lines
+    try:
+        # cached per normalised query and collection version
+        hits = await before_deadline(state, search(query, state.get("filters")))
+    except asyncio.TimeoutError:
+        return deadline_reached("retrieve")
+    docs = [make_evidence(h) for h in hits]
+    seen = {e["id"] for e in state["evidence"]} | {e["hash"] for e in state["evidence"]}
+    new = [d for d in docs if d["id"] not in seen and d["hash"] not in seen]
+    get_stream_writer()({"event": "retrieved", "chunks": len(docs), "new": len(new)})  # no-op unless streaming
+    return {"evidence": docs, "messages": [f"Retrieved {len(docs)} docs ({len(new)} new)."], "iterations": 1}
 
-def gap_analyzer(state: DDState) -> DDState:
+async def gap_analyzer(state: DDState) -> DDState:
+    write = get_stream_writer()
+    reason = exhausted(state)  # out of budget: stop looping without another LLM call
+    if reason is not None:
+        write({"event": "decision", "decision": "STOP", "stop_reason": reason})
+        return {"messages": [f"Budget exhausted ({reason})."], "stop_reason": reason}
+    done, report = decide(state["evidence"])  # local term/regex coverage; None = uncertain
+    if done is not None:
+        verdict = "DONE" if done else "CONTINUE"
+        write({"event": "decision", "decision": verdict, "coverage": report["score"], "llm": False})
+        return {"messages": [f"{verdict} (coverage {report['score']:.2f}, no LLM call)"], "complete": done}
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system", "Decide if evidence is sufficient. Reply DONE or CONTINUE."),
-            ("user", "\n".join(state["evidence"])),
+            ("user", format_evidence(state["evidence"])),
         ]
     )
-    resp = llm.invoke(prompt.format())
-    done = "DONE" in resp.content
-    return {"messages": [resp.content], "complete": done}
+    text = prompt.format()
+    key = llm_cache.cache_key("analyze", GAP_PROMPT_VERSION, text)
+    content, tokens = await llm_cache.get_response("analyze", key), 0  # temperature 0: same prompt, same answer
+    cached = content is not None
+    if not cached:
+        llm = await clients.llm()  # shared pool opened by the app lifespan
+        try:
+            resp = await before_deadline(state, llm.ainvoke(text))
+        except asyncio.TimeoutError:
+            return deadline_reached("analyze")
+        content, tokens = resp.content, llm_tokens(text, resp)
+        await llm_cache.put_response("analyze", key, content)
+    done = "DONE" in content
+    write({"event": "decision", "decision": "DONE" if done else "CONTINUE",
+           "coverage": report["score"], "llm": True, "cached": cached})
+    return {"messages": [content], "complete": done, "tokens": tokens}
 
 async def draft_xbrl(state: DDState) -> DDState:
-    digest = "\n".join(state["evidence"])
-    result = await draft_statement(digest)  # Pydantic-AI ensures validity
-    return {"messages": [result.model_dump_json()], "complete": True}
+    write = get_stream_writer()
+    digest = format_evidence(state["evidence"])
+    key = llm_cache.cache_key("draft", DRAFT_PROMPT_VERSION, digest)
+    output = await llm_cache.get_response("draft", key)
+    if output is not None:
+        write({"event": "draft", "delta": output})
+        return {"messages": [output], "complete": True}
+    # Partial JSON is forwarded to streaming clients as the model produces it
+    try:
+        result = await before_deadline(
+            state, draft_statement(digest, on_delta=lambda delta: write({"event": "draft", "delta": delta}))
+        )
+    except asyncio.TimeoutError:
+        return deadline_reached("draft")
+    output = result.model_dump_json()
+    await llm_cache.put_response("draft", key, output)
+    return {"messages": [output], "complete": True, "tokens": llm_tokens(digest, output)}
+
+def partial_answer(state: DDState) -> DDState:
+    # Deadline or token budget spent: report what was found instead of drafting
+    sources = [{"source": e["source"], "source_id": e["source_id"], "title": e["title"]}
+               for e in state["evidence"]]
+    return {"messages": [json.dumps({"partial": True, "stop_reason": state["stop_reason"],
+                                     "evidence": sources})]}
 
 def route(state: DDState) -> str:
-    return "draft" if state["complete"] else "retrieve"
+    if state["complete"]:
+        return "draft"
+    if state.get("stop_reason") in HARD_LIMITS:
+        return "partial"
+    if state.get("stop_reason"):
+        return "draft" if state["evidence"] else "partial"  # out of iterations: draft what we have
+    return "retrieve"
+
+def after_call(state: DDState) -> str:
+    # A node whose call hit the deadline hands over to the partial answer
+    return "partial" if state.get("stop_reason") == "deadline" else "next"
 
 # ------------- Build the graph ----------------------------------
 graph = StateGraph(DDState)
-graph.add_node("retrieve", retrieve)
-graph.add_node("analyze", gap_analyzer)
-graph.add_async_node("draft", draft_xbrl)
+# Nodes that call Qdrant or the LLM record their outputs for replays
+graph.add_node("retrieve", checkpoint.replayable("retrieve", retrieve))
+graph.add_node("analyze", checkpoint.replayable("analyze", gap_analyzer))
+graph.add_node("draft", checkpoint.replayable("draft", draft_xbrl))
+graph.add_node("partial", partial_answer)
 
 graph.set_entry_point("retrieve")
-graph.add_edge("retrieve", "analyze")
-graph.add_conditional_edge("analyze", route, {"retrieve": "retrieve", "draft": "draft"})
-graph.add_edge("draft", END)
+graph.add_conditional_edges("retrieve", after_call, {"next": "analyze", "partial": "partial"})
+graph.add_conditional_edges("analyze", route, {"retrieve": "retrieve", "draft": "draft", "partial": "partial"})
+graph.add_conditional_edges("draft", after_call, {"next": END, "partial": "partial"})
+graph.add_edge("partial", END)
+
+due_diligence_flow = graph.compile()
+_flows: Dict[str, Any] = {}
 
-due_diligence_flow = graph.compile() 
\ No newline at end of file
+async def checkpointed_flow():
+    """The graph compiled with the SQLite checkpointer (plain graph when CHECKPOINT_DB is empty)."""
+    if "flow" not in _flows:
+        saver = await checkpoint.checkpointer()
+        _flows["flow"] = graph.compile(checkpointer=saver) if saver is not None else due_diligence_flow
+    return _flows["flow"] 
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Disk-backed cache of deterministic LLM responses, shared by all API workers.
+
+The chat model runs at temperature 0, so a prompt that has been answered
+once can be answered from disk. Entries are keyed by model, node, prompt
+template version and a hash of the formatted prompt, expire after
+`settings.llm_cache_ttl` seconds, and the least recently used ones are
+evicted once the cache exceeds `settings.llm_cache_max_mb`. The store is a
+SQLite file in WAL mode, so every worker process reads and writes it
+safely through its own connection.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional
+import aiosqlite
+
+from app.config import settings
+
+# Size is checked every this many writes rather than on each one
+_EVICT_EVERY = 50
+
+_store: Dict[str, Any] = {}
+_open_lock = asyncio.Lock()
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def cache_key(node: str, version: str, prompt: str, model: Optional[str] = None) -> str:
+    """
+    Key of a response.
+
+    Args:
+        node: Graph node making the call
+        version: Version of the node's prompt template; bump it when the template changes
+        prompt: Fully formatted prompt
+        model: Chat model (default: settings.openai_model)
+
+    Returns:
+        Hex digest identifying the call
+    """
+    model = model or settings.openai_model
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{model}\0{node}\0{version}\0{prompt_hash}".encode("utf-8")).hexdigest()
+
+
+async def open_llm_cache() -> None:
+    """Open the cache database, if configured and not already open."""
+    if _store or not settings.llm_cache_db:
+        return
+    async with _open_lock:
+        if not _store:
+            await _connect()
+
+
+async def _connect() -> None:
+    """Connect and create the responses table."""
+    conn = await aiosqlite.connect(settings.llm_cache_db)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA busy_timeout=5000")
+    await conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses "
+        "(key TEXT PRIMARY KEY, node TEXT NOT NULL, response TEXT NOT NULL, size INTEGER NOT NULL, "
+        "created_at REAL NOT NULL, used_at REAL NOT NULL)"
+    )
+    await conn.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+    await conn.commit()
+    _store.update(conn=conn, writes=0)
+
+
+async def close_llm_cache() -> None:
+    """Close the cache database."""
+    if not _store:
+        return
+    await _store["conn"].close()
+    _store.clear()
+
+
+def _count(node: str, outcome: str) -> None:
+    """Count a lookup for the per-node hit rates."""
+    with _stats_lock:
+        counts = _stats.setdefault(node, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+
+async def get_response(node: str, key: str) -> Optional[str]:
+    """
+    Look up a response.
+
+    Args:
+        node: Graph node, for the hit-rate counters
+        key: Key from `cache_key`
+
+    Returns:
+        Cached response text, or None on a miss or when the cache is disabled
+    """
+    await open_llm_cache()
+    if not _store:
+        return None
+    conn = _store["conn"]
+    now = time.time()
+    async with conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)) as cursor:
+        row = await cursor.fetchone()
+    if row is None or now - row[1] >= settings.llm_cache_ttl:
+        _count(node, "misses")
+        return None
+    await conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+    await conn.commit()
+    _count(node, "hits")
+    return row[0]
+
+
+async def put_response(node: str, key: str, response: str) -> None:
+    """
+    Store a response, evicting expired and least recently used entries now and then.
+
+    Args:
+        node: Graph node that made the call
+        key: Key from `cache_key`
+        response: Response text
+    """
+    await open_llm_cache()
+    if not _store:
+        return
+    conn = _store["conn"]
+    now = time.time()
+    await conn.execute(
+        "INSERT OR REPLACE INTO responses (key, node, response, size, created_at, used_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (key, node, response, len(response.encode("utf-8")), now, now)
+    )
+    await conn.commit()
+    _store["writes"] += 1
+    if _store["writes"] % _EVICT_EVERY == 0:
+        await evict()
+
+
+async def evict() -> int:
+    """
+    Drop expired entries, then the least recently used ones until the cache
+    fits in `settings.llm_cache_max_mb`.
+
+    Returns:
+        Number of entries removed
+    """
+    if not _store:
+        return 0
+    conn = _store["conn"]
+    cursor = await conn.execute("DELETE FROM responses WHERE created_at <= ?",
+                                (time.time() - settings.llm_cache_ttl,))
+    removed = cursor.rowcount
+    async with conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses") as cursor:
+        excess = (await cursor.fetchone())[0] - settings.llm_cache_max_mb * 1024 * 1024
+    if excess > 0:
+        stale = []
+        async with conn.execute("SELECT key, size FROM responses ORDER BY used_at") as cursor:
+            async for key, size in cursor:
+                stale.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+        await conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        removed += len(stale)
+    await conn.commit()
+    return removed
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Response cache usage in this worker.
+
+    Returns:
+        Hits, misses and hit rate per node
+    """
+    with _stats_lock:
+        nodes = {}
+        for node, counts in _stats.items():
+            lookups = counts["hits"] + counts["misses"]
+            nodes[node] = {**counts, "hit_rate": counts["hits"] / lookups if lookups else 0.0}
+    return {"enabled": bool(settings.llm_cache_db), "ttl": settings.llm_cache_ttl,
+            "max_mb": settings.llm_cache_max_mb, "nodes": nodes}
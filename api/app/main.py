@@ -0,0 +1,204 @@
+"""
+FastAPI entry point for the RegulaSense API.
+"""
+import json
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.cache import CACHES, close_caches
+from app import batch, budget, checkpoint, clients, coverage, llm_cache
+from app.graphs.due_diligence_graph import checkpointed_flow, initial_state
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the pooled Qdrant/OpenAI clients, checkpoint database and LLM cache for this worker."""
+    await clients.open_clients()
+    await checkpoint.open_checkpointer()
+    await llm_cache.open_llm_cache()
+    yield
+    for job in batch.JOBS.values():
+        job.cancel()  # resumable from its output file
+    await checkpoint.close_checkpointer()
+    await llm_cache.close_llm_cache()
+    await close_caches()
+    await clients.close_clients()
+
+app = FastAPI(title="RegulaSense API", lifespan=lifespan)
+
+class RunRequest(BaseModel):
+    """Body of a due diligence run."""
+    prompt: str
+    filters: Optional[Dict[str, Any]] = None  # e.g. {"source": ["bis", "fsb"], "date_from": "2024-01-01"}
+    max_iterations: Optional[int] = None  # budgets default to the MAX_ITERATIONS/MAX_RUN_TOKENS/RUN_TIMEOUT settings
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None
+    run_id: Optional[str] = None  # an earlier run's ID resumes it from its last checkpoint
+    replay: bool = False  # rerun under a new run ID, reusing recorded Qdrant/LLM node outputs
+
+class RunResponse(BaseModel):
+    """Result of a due diligence run."""
+    result: str  # drafted XBRL statement as JSON, or a partial answer when a budget ran out
+    complete: bool
+    budget: Dict[str, Any]  # iterations, tokens and seconds used against their limits
+    run_id: str  # checkpoint key: pass it back to resume or replay the run
+
+class BatchRequest(BaseModel):
+    """Body of a batch job."""
+    runs: List[RunRequest]
+    concurrency: Optional[int] = None  # default: the BATCH_CONCURRENCY setting
+    job_id: Optional[str] = None  # default: derived from the runs, so resubmitting a batch resumes it
+
+class RunStart(NamedTuple):
+    """How to execute a run: graph, its input (None to resume), config and the state so far."""
+    flow: Any
+    input: Optional[Dict[str, Any]]
+    config: Dict[str, Any]
+    state: Dict[str, Any]
+    finished: bool  # the run ID names a run that already ended: nothing to execute
+
+async def start_run(request: RunRequest) -> RunStart:
+    """
+    Prepare a run; the budget clock starts here.
+    
+    A `run_id` with a checkpoint resumes that run after its last completed
+    node, with the same limits and a fresh deadline. With `replay` the run
+    starts over in a new thread, `<run_id>:replay:<hex>`, so the earlier
+    run's checkpoints are not merged into its state, and nodes return their
+    recorded outputs where the state matches.
+    """
+    flow = await checkpointed_flow()
+    run_budget = budget.new_budget(request.max_iterations, request.max_tokens, request.timeout)
+    run_id = request.run_id or uuid.uuid4().hex
+    if request.replay:
+        run_id = f"{run_id}:replay:{uuid.uuid4().hex}"
+    # Two steps per retrieve/analyze round, plus the draft
+    config = {"recursion_limit": 2 * run_budget["max_iterations"] + 4,
+              "configurable": {"thread_id": run_id, "replay": request.replay}}
+    
+    if request.run_id and not request.replay and flow.checkpointer is not None:
+        snapshot = await flow.aget_state(config)
+        if snapshot.values and not snapshot.next:
+            return RunStart(flow, None, config, snapshot.values, True)
+        if snapshot.values:
+            limits = snapshot.values["budget"]
+            resumed = budget.new_budget(limits["max_iterations"], limits["max_tokens"],
+                                        limits["deadline"] - limits["started_at"])
+            await flow.aupdate_state(config, {"budget": resumed})
+            checkpoint.record_resume()
+            return RunStart(flow, None, config, {**snapshot.values, "budget": resumed}, False)
+    
+    state = initial_state(request.prompt, request.filters, run_budget)
+    return RunStart(flow, state, config, state, False)
+
+async def execute(start: RunStart) -> Dict[str, Any]:
+    """Run the graph to the end, or return the state of a run that already ended."""
+    if start.finished:
+        return start.state
+    return await start.flow.ainvoke(start.input, config=start.config)
+
+def finish_run(start: RunStart, state: Dict[str, Any]) -> RunResponse:
+    """Record a run's budget usage, unless it ended earlier, and build its response."""
+    if not start.finished:
+        budget.record(state)
+    return RunResponse(result=state["messages"][-1], complete=state["complete"], budget=budget.usage(state),
+                       run_id=start.config["configurable"]["thread_id"])
+
+def sse(event: str, data: Any) -> str:
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/run")
+async def run(request: RunRequest) -> RunResponse:
+    """Run the due diligence graph within the request's budget."""
+    start = await start_run(request)
+    return finish_run(start, await execute(start))
+
+@app.post("/run/stream")
+async def run_stream(request: RunRequest, http_request: Request) -> StreamingResponse:
+    """
+    Run the due diligence graph, streaming its progress as server-sent events.
+    
+    Events: `start` (budget limits, sent at once), `retrieved` (chunk
+    counts per round), `decision` (gap analyzer verdicts), `draft` (partial
+    JSON of the statement), then `result` with the /run response body, or
+    `error`. The run is cancelled when the client disconnects.
+    """
+    start = await start_run(request)
+
+    async def events() -> AsyncIterator[str]:
+        yield sse("start", {"budget": budget.usage(start.state), "run_id": start.config["configurable"]["thread_id"]})
+        if start.finished:
+            yield sse("result", finish_run(start, start.state).model_dump())
+            return
+        final = start.state
+        stream = start.flow.astream(start.input, config=start.config, stream_mode=["custom", "values"])
+        try:
+            async for mode, chunk in stream:
+                if await http_request.is_disconnected():
+                    return
+                if mode == "values":
+                    final = chunk
+                else:
+                    yield sse(chunk.pop("event"), chunk)
+            yield sse("result", finish_run(start, final).model_dump())
+        except Exception as e:
+            yield sse("error", {"detail": str(e)})
+        finally:
+            await stream.aclose()  # stops the graph, and its LLM/Qdrant calls, on disconnect
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def run_body(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one batch entry and return its /run response body."""
+    start = await start_run(RunRequest(**body))
+    return finish_run(start, await execute(start)).model_dump()
+
+@app.post("/run/batch")
+async def run_batch(request: BatchRequest) -> Dict[str, Any]:
+    """
+    Start a batch job, or resume it if an earlier attempt left partial output.
+    
+    Results are appended to `<BATCH_DIR>/<job_id>.jsonl` as runs finish, one
+    line per run with its index, prompt and /run response (or `error`).
+    """
+    runs = [run.model_dump() for run in request.runs]
+    job_id = request.job_id or batch.job_id_for(runs)
+    job = batch.JOBS.get(job_id)
+    if job is not None and job.running:
+        return job.status()
+    job = batch.BatchJob(runs, run_body, request.concurrency, job_id)
+    job.start()
+    return job.status()
+
+@app.get("/run/batch/{job_id}")
+def batch_status(job_id: str) -> Dict[str, Any]:
+    """Progress and throughput of a batch job started in this worker."""
+    job = batch.JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown batch job {job_id}")
+    return job.status()
+
+@app.delete("/run/batch/{job_id}")
+def cancel_batch(job_id: str) -> Dict[str, Any]:
+    """Cancel a batch job; submitting it again resumes after its last written run."""
+    job = batch.JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown batch job {job_id}")
+    job.cancel()
+    return job.status()
+
+@app.get("/metrics")
+def metrics() -> Dict[str, Any]:
+    """Counters of the retrieval and LLM caches, gap analyzer decisions, run budgets and checkpoints in this worker."""
+    return {
+        "caches": {name: cache.stats() for name, cache in CACHES.items()},
+        "gap_analyzer": coverage.stats(),
+        "budgets": budget.stats(),
+        "checkpoints": checkpoint.stats(),
+        "llm_cache": llm_cache.stats(),
+    }
@@ -0,0 +1,73 @@
+"""
+Maximal Marginal Relevance selection over retrieved candidates.
+"""
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+
+def mmr_select(relevance: Sequence[float], vectors: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """
+    Pick k candidates that are relevant but not redundant with each other.
+    
+    Each step takes the candidate maximising
+    `lambda_mult * relevance - (1 - lambda_mult) * max similarity to the
+    candidates already picked`. The pairwise cosine similarities are one
+    matrix product up front, and each step is a vectorised update, so a few
+    dozen candidates take well under a millisecond.
+    
+    Args:
+        relevance: Relevance of each candidate, higher is better
+        vectors: Candidate embeddings, one row per candidate
+        k: Number of candidates to pick
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+    
+    Returns:
+        Indices of the picked candidates, in pick order
+    """
+    n = len(relevance)
+    if n <= 1 or k <= 0:
+        return list(range(min(n, max(k, 0))))
+    
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = vectors @ vectors.T
+    relevance = lambda_mult * np.asarray(relevance, dtype=np.float32)
+    
+    first = int(np.argmax(relevance))
+    selected = [first]
+    redundancy = similarity[first].copy()
+    available = np.ones(n, dtype=bool)
+    available[first] = False
+    
+    for _ in range(min(k, n) - 1):
+        scores = np.where(available, relevance - (1 - lambda_mult) * redundancy, -np.inf)
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(redundancy, similarity[pick], out=redundancy)
+    return selected
+
+
+def diversify(hits: List[Dict[str, Any]], k: int, lambda_mult: float) -> List[Dict[str, Any]]:
+    """
+    Reduce over-fetched search hits to a diverse top k.
+    
+    Hit scores are rescaled to [0, 1] before selection, so one lambda works
+    for both cosine scores and fused RRF scores. The `vector` of each hit is
+    dropped from the result.
+    
+    Args:
+        hits: Hits with score, payload and vector, best first
+        k: Number of hits to keep
+        lambda_mult: Relevance/diversity trade-off (see `mmr_select`)
+    
+    Returns:
+        Selected hits without vectors, in pick order
+    """
+    if len(hits) > k:
+        scores = np.array([hit["score"] for hit in hits], dtype=np.float32)
+        spread = scores.max() - scores.min()
+        relevance = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+        vectors = np.array([hit["vector"] for hit in hits], dtype=np.float32)
+        hits = [hits[i] for i in mmr_select(relevance, vectors, k, lambda_mult)]
+    return [{key: value for key, value in hit.items() if key != "vector"} for hit in hits]
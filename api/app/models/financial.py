@@ -0,0 +1,25 @@
+"""
+Typed XBRL-style financial statement drafted by the agent.
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class Fact(BaseModel):
+    """One reported figure, tagged with its XBRL concept."""
+    concept: str = Field(description="us-gaap or ifrs-full concept, e.g. us-gaap:Revenues")
+    value: Optional[float] = Field(description="Reported value in `unit` and `scale`; null when not found in the evidence")
+    source_id: Optional[str] = Field(default=None, description="Evidence chunk the figure was taken from")
+
+
+class FinancialStatement(BaseModel):
+    """Financial statement with the concepts the due diligence run asks for."""
+    entity: str = Field(description="Reporting entity name")
+    period_end: Optional[str] = Field(default=None, description="End of the reporting period, ISO date")
+    unit: str = Field(default="USD", description="ISO 4217 currency code")
+    scale: int = Field(default=0, description="Power of ten the values are expressed in, e.g. 6 for millions")
+    revenue: Fact
+    total_assets: Fact
+    net_income: Fact
+    other_facts: List[Fact] = Field(default_factory=list, description="Further figures present in the evidence")
+    notes: Optional[str] = Field(default=None, description="Gaps or caveats in the evidence")
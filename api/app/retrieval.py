@@ -0,0 +1,283 @@
+"""
+Evidence retrieval with cached query embeddings and search results.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from app import clients
+from app.config import settings
+from app.cache import Cache
+from app.mmr import diversify
+from app.sparse import SPARSE_VECTOR_NAME, query_vector
+
+# Ingest records the time of its last write to the collection here
+META_COLLECTION = f"{settings.collection_name}_meta"
+META_POINT_ID = 0
+
+# Embeddings depend only on the text and model, so they outlive collection updates
+embedding_cache = Cache(
+    "query_embeddings",
+    maxsize=settings.query_embedding_cache_size,
+    redis_url=settings.cache_redis_url,
+    encode=lambda vector: np.asarray(vector, dtype=np.float32).tobytes(),
+    decode=lambda raw: np.frombuffer(raw, dtype=np.float32).tolist()
+)
+result_cache = Cache(
+    "search_results",
+    maxsize=settings.result_cache_size,
+    ttl=settings.result_cache_ttl,
+    redis_url=settings.cache_redis_url,
+    encode=lambda hits: json.dumps(hits).encode("utf-8"),
+    decode=lambda raw: json.loads(raw)
+)
+
+_version_lock = asyncio.Lock()
+_version = {"value": 0, "checked_at": float("-inf")}
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a query: NFKC, lower case, collapsed whitespace."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _key(**parts: Any) -> str:
+    """Stable cache key for a set of key parts."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+async def collection_version() -> int:
+    """
+    Version of the evidence collection, as last written by ingest.
+    
+    The value is re-read at most every `settings.collection_version_ttl`
+    seconds. Result cache keys include it, so a re-ingest invalidates
+    every cached search result.
+    
+    Returns:
+        Version number, 0 if ingest has never recorded one
+    """
+    if time.monotonic() - _version["checked_at"] < settings.collection_version_ttl:
+        return _version["value"]
+    async with _version_lock:
+        # Another request may have refreshed it while this one waited
+        if time.monotonic() - _version["checked_at"] < settings.collection_version_ttl:
+            return _version["value"]
+        try:
+            client = await clients.qdrant()
+            points = await client.retrieve(META_COLLECTION, ids=[META_POINT_ID], with_payload=True)
+            _version["value"] = points[0].payload.get("version", 0) if points else 0
+        except Exception:
+            # No meta collection yet: the collection predates versioning
+            _version["value"] = 0
+        _version["checked_at"] = time.monotonic()
+        return _version["value"]
+
+
+async def embed_query(text: str) -> List[float]:
+    """
+    Embed a query, reusing the embedding of an equivalent earlier query.
+    
+    The normalised form only keys the cache; the model always sees the
+    query as written, so casing cues such as "LCR" or "CET1" survive.
+    
+    Args:
+        text: Query text
+    
+    Returns:
+        Query embedding
+    """
+    key = _key(model=settings.embedding_model, query=normalize_query(text))
+    vector = await embedding_cache.get(key)
+    if vector is None:
+        openai_client = await clients.openai()
+        response = await openai_client.embeddings.create(model=settings.embedding_model, input=text)
+        vector = response.data[0].embedding
+        await embedding_cache.set(key, vector)
+    return vector
+
+
+def build_filter(filters: Optional[Dict[str, Any]]) -> Optional[models.Filter]:
+    """
+    Turn {field: value} pairs into a Qdrant payload filter.
+    
+    `date_from` and `date_to` (ISO dates) bound the document's
+    `published_at`, its publication date rather than the ingest
+    `timestamp`. Chunks without a known publication date are left out
+    of date-filtered searches.
+    
+    Any other key must equal the value, or one of the values if a list
+    is given, e.g. {"source": ["bis", "fsb"], "category": "banking"}.
+    
+    Args:
+        filters: Payload field -> value, or list of accepted values
+    
+    Returns:
+        Filter requiring every condition, or None without filters
+    """
+    if not filters:
+        return None
+    conditions = []
+    for field, value in filters.items():
+        if field in ("date_from", "date_to") or value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            match = models.MatchAny(any=list(value))
+        else:
+            match = models.MatchValue(value=value)
+        conditions.append(models.FieldCondition(key=field, match=match))
+    
+    if filters.get("date_from") or filters.get("date_to"):
+        conditions.append(models.FieldCondition(
+            key="published_at",
+            range=models.DatetimeRange(gte=filters.get("date_from"), lte=filters.get("date_to"))
+        ))
+    return models.Filter(must=conditions) if conditions else None
+
+
+def _hit(point: models.ScoredPoint, score: float) -> Dict[str, Any]:
+    """Plain-dict form of a search hit, with its dense vector if it was fetched."""
+    hit = {"id": str(point.id), "score": score, "payload": point.payload}
+    if point.vector is not None:
+        hit["vector"] = point.vector.get("") if isinstance(point.vector, dict) else point.vector
+    return hit
+
+
+def rrf_fuse(rankings: List[List[models.ScoredPoint]], limit: int, k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Merge rankings with reciprocal rank fusion.
+    
+    Each point scores sum(1 / (k + rank)) over the rankings it appears in,
+    so agreement between dense and keyword search outranks a high position
+    in only one of them, and raw scores on different scales never mix.
+    
+    Args:
+        rankings: Result lists, best first
+        limit: Maximum hits returned
+        k: Fusion constant (default: settings.rrf_k)
+    
+    Returns:
+        Fused hits, best first, with the fused score
+    """
+    k = k or settings.rrf_k
+    scores: Dict[str, float] = {}
+    points: Dict[str, models.ScoredPoint] = {}
+    for ranking in rankings:
+        for rank, point in enumerate(ranking, start=1):
+            key = str(point.id)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            points.setdefault(key, point)
+    best = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [_hit(points[key], scores[key]) for key in best]
+
+
+async def query_collection(client: AsyncQdrantClient,
+                           query: str,
+                           dense: List[float],
+                           query_filter: Optional[models.Filter],
+                           limit: int,
+                           hybrid: bool,
+                           with_vectors: bool = False) -> List[Dict[str, Any]]:
+    """
+    Run a dense or hybrid query against the evidence collection.
+    
+    In hybrid mode the dense and sparse queries go to Qdrant in one
+    batched request and their rankings are fused with `rrf_fuse`.
+    
+    Args:
+        client: AsyncQdrantClient instance
+        query: Query text (for the sparse vector)
+        dense: Query embedding
+        query_filter: Payload filter applied to both queries
+        limit: Maximum hits
+        hybrid: Fuse with BM25 sparse results
+        with_vectors: Include each hit's dense vector under "vector"
+    
+    Returns:
+        Hits as dictionaries with id, score and payload
+    """
+    if not hybrid:
+        response = await client.query_points(
+            collection_name=settings.collection_name,
+            query=dense,
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=True,
+            with_vectors=with_vectors
+        )
+        return [_hit(point, point.score) for point in response.points]
+    
+    candidates = max(limit, settings.hybrid_candidates)
+    indices, values = query_vector(query)
+    # Only the dense vector, by its unnamed slot; the sparse one is not needed
+    vectors = [""] if with_vectors else False
+    requests = [models.QueryRequest(query=dense, filter=query_filter, limit=candidates,
+                                    with_payload=True, with_vector=vectors)]
+    if indices:
+        requests.append(models.QueryRequest(
+            query=models.SparseVector(indices=indices, values=values),
+            using=SPARSE_VECTOR_NAME,
+            filter=query_filter,
+            limit=candidates,
+            with_payload=True,
+            with_vector=vectors
+        ))
+    responses = await client.query_batch_points(collection_name=settings.collection_name, requests=requests)
+    return rrf_fuse([response.points for response in responses], limit)
+
+
+async def search(query: str,
+                 filters: Optional[Dict[str, Any]] = None,
+                 limit: Optional[int] = None,
+                 hybrid: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """
+    Search the evidence collection, serving repeated queries from the result cache.
+    
+    When `settings.mmr_candidates` exceeds the limit, that many hits are
+    fetched with their vectors and reduced to a diverse `limit` with
+    Maximal Marginal Relevance, so near-duplicate chunks of one document
+    do not fill every evidence slot. Only the selected hits are cached.
+    
+    Args:
+        query: Query text
+        filters: Optional payload filters (see `build_filter`)
+        limit: Maximum hits (default: settings.retrieval_limit)
+        hybrid: Fuse dense and sparse results (default: settings.hybrid_search)
+    
+    Returns:
+        Hits as dictionaries with id, score and payload
+    """
+    limit = limit or settings.retrieval_limit
+    hybrid = settings.hybrid_search if hybrid is None else hybrid
+    key = _key(
+        query=normalize_query(query),
+        filters=filters or {},
+        limit=limit,
+        hybrid=hybrid,
+        mmr=(settings.mmr_candidates, settings.mmr_lambda),
+        model=settings.embedding_model,
+        version=await collection_version()
+    )
+    hits = await result_cache.get(key)
+    if hits is not None:
+        return hits
+    
+    client = await clients.qdrant()
+    query_filter = build_filter(filters)
+    dense = await embed_query(query)
+    if settings.mmr_candidates > limit:
+        hits = await query_collection(client, query, dense, query_filter,
+                                      settings.mmr_candidates, hybrid, with_vectors=True)
+        hits = diversify(hits, limit, settings.mmr_lambda)
+    else:
+        hits = await query_collection(client, query, dense, query_filter, limit, hybrid)
+    await result_cache.set(key, hits)
+    return hits
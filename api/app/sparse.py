@@ -0,0 +1,49 @@
+"""
+Sparse (BM25-style) query vectors for hybrid retrieval.
+
+Mirrors the tokenizer and term hashing of
+`packages/ingest/regulasense_ingest/utils/sparse.py`, which writes the
+document side; the two must stay in sync or keyword matches are lost.
+"""
+import re
+import zlib
+from typing import List, Tuple
+
+# Name of the sparse vector in the collection
+SPARSE_VECTOR_NAME = "bm25"
+
+# Words, keeping codes like CET1, UNRATE, Basel-III and 10.5 as single terms
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+# Function words that carry no retrieval signal
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the
+this to was were which will with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-cased terms, dropping stopwords."""
+    return [term for term in _TOKEN.findall(text.lower()) if term not in STOPWORDS]
+
+
+def term_index(term: str) -> int:
+    """Stable 32-bit index of a term."""
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def query_vector(text: str) -> Tuple[List[int], List[float]]:
+    """
+    Sparse vector of a query: each distinct term with weight 1.
+    
+    Qdrant applies IDF to the matching document weights, so rare terms
+    such as "CET1" dominate the score.
+    
+    Args:
+        text: Query text
+    
+    Returns:
+        (indices, values) of the sparse vector
+    """
+    indices = sorted({term_index(term) for term in tokenize(text)})
+    return indices, [1.0] * len(indices)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Throughput of concurrent /run requests against a running API.
+
+Fires batches of identical-shape requests at increasing concurrency and
+reports runs per second and latency percentiles. With the async graph
+nodes, throughput should keep rising with concurrency until Qdrant, the
+OpenAI rate limit or the client pools (QDRANT_POOL_SIZE,
+OPENAI_MAX_CONNECTIONS) saturate, instead of levelling off at the size of
+the worker's thread pool.
+
+Prompts get a numbered suffix so the result cache does not answer them;
+pass --same-prompt to measure the cached path instead.
+
+    cd api && PYTHONPATH=. python benchmarks/concurrent_runs.py --url http://localhost:8000/run --levels 1 8 32
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+import httpx
+
+PROMPT = "Extract revenue, total assets and net income from the latest annual report"
+
+
+async def timed_run(client: httpx.AsyncClient, url: str, body: dict) -> float:
+    """Latency of one /run request in seconds."""
+    start = time.perf_counter()
+    response = await client.post(url, json=body)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def level(url: str, concurrency: int, requests: int, same_prompt: bool, max_iterations: int):
+    """Run `requests` requests with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=None) as client:
+        async def one(i: int) -> float:
+            prompt = PROMPT if same_prompt else f"{PROMPT} (run {concurrency}-{i})"
+            async with semaphore:
+                return await timed_run(client, url, {"prompt": prompt, "max_iterations": max_iterations})
+
+        start = time.perf_counter()
+        latencies: List[float] = await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"concurrency {concurrency:>4}  {requests / elapsed:7.2f} runs/s   "
+          f"p50 {statistics.median(latencies):6.2f} s   "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000/run", help="/run endpoint")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per level")
+    parser.add_argument("--max-iterations", type=int, default=2, help="Retrieve/analyze rounds per run")
+    parser.add_argument("--same-prompt", action="store_true", help="Send one prompt, so repeats hit the caches")
+    args = parser.parse_args()
+
+    for concurrency in args.levels:
+        asyncio.run(level(args.url, concurrency, args.requests, args.same_prompt, args.max_iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Recall and latency of dense-only versus hybrid (dense + BM25, RRF) retrieval.
+
+Builds an in-memory Qdrant collection from a synthetic regulatory corpus in
+which each topic is named by an exact code (LCR, CET1, UNRATE, ...) and
+surrounded by distractor chunks that paraphrase the same subject without
+the code, then asks code-bearing questions and reports recall@k and query
+latency for both modes.
+
+Dense vectors come from an offline hashed-trigram stand-in by default, or
+from the configured OpenAI embedding model with --openai. Sparse vectors
+are built with the ingest package, so it must be installed.
+
+    cd api && PYTHONPATH=. python benchmarks/hybrid_recall.py --k 5 --distractors 40
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+import zlib
+from typing import Dict, List
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from app.config import settings
+from app.retrieval import query_collection
+from app.sparse import SPARSE_VECTOR_NAME
+from regulasense_ingest.utils.sparse import document_vector
+
+# (code, subject) pairs; the subject is shared with the distractors
+TOPICS = [
+    ("LCR", "liquidity coverage ratio high quality liquid assets stressed outflows"),
+    ("NSFR", "net stable funding ratio available stable funding over one year"),
+    ("CET1", "common equity tier one capital ratio risk weighted assets"),
+    ("AT1", "additional tier one instruments loss absorption trigger"),
+    ("TLAC", "total loss absorbing capacity global systemically important banks"),
+    ("MREL", "minimum requirement own funds eligible liabilities resolution"),
+    ("IRRBB", "interest rate risk banking book economic value shocks"),
+    ("FRTB", "fundamental review trading book market risk capital"),
+    ("UNRATE", "civilian unemployment rate monthly labour market"),
+    ("CPIAUCSL", "consumer price index all urban consumers inflation"),
+    ("DGS10", "ten year treasury constant maturity yield"),
+    ("FEDFUNDS", "effective federal funds rate overnight lending"),
+]
+FILLER = ("supervisors banks framework implementation jurisdictions guidance consultation "
+          "report standards monitoring disclosure reporting annual review committee members "
+          "assessment calibration phase transitional arrangements").split()
+
+
+def make_corpus(distractors: int, relevant: int, seed: int = 0):
+    """
+    Synthetic chunks and queries.
+
+    Returns:
+        (chunks, queries) where chunks are (text, source) pairs and queries
+        are (question, set of relevant chunk positions) pairs
+    """
+    rng = random.Random(seed)
+    chunks, queries = [], []
+    for code, subject in TOPICS:
+        words = subject.split()
+        relevant_ids = set()
+        for _ in range(relevant):
+            filler = rng.sample(FILLER, 8)
+            relevant_ids.add(len(chunks))
+            chunks.append((f"The {code} requirement: {' '.join(rng.sample(words, len(words) // 2))} "
+                           f"{' '.join(filler)}.", "bis"))
+        for _ in range(distractors):
+            filler = rng.sample(FILLER, 8)
+            chunks.append((f"{' '.join(rng.sample(words, len(words)))} {' '.join(filler)}.", "fsb"))
+        queries.append((f"What does {code} require?", relevant_ids))
+    return chunks, queries
+
+
+def trigram_embedding(text: str, dimensions: int = 256) -> List[float]:
+    """Offline dense stand-in: normalised counts of hashed character trigrams."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    padded = f"  {text.lower()} "
+    for i in range(len(padded) - 2):
+        vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % dimensions] += 1.0
+    return (vector / (np.linalg.norm(vector) or 1.0)).tolist()
+
+
+def openai_embedding(texts: List[str]) -> List[List[float]]:
+    """Embeddings from the configured OpenAI model."""
+    from openai import OpenAI
+    client = OpenAI(api_key=settings.openai_api_key)
+    vectors = []
+    for start in range(0, len(texts), 256):
+        response = client.embeddings.create(model=settings.embedding_model, input=texts[start:start + 256])
+        vectors.extend(item.embedding for item in response.data)
+    return vectors
+
+
+async def build_collection(chunks, dense: List[List[float]]) -> AsyncQdrantClient:
+    """In-memory collection with named dense and sparse vectors, as ingest creates it."""
+    client = AsyncQdrantClient(":memory:")
+    await client.create_collection(
+        settings.collection_name,
+        vectors_config=models.VectorParams(size=len(dense[0]), distance=models.Distance.COSINE),
+        sparse_vectors_config={SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)}
+    )
+    points = []
+    for position, ((text, source), vector) in enumerate(zip(chunks, dense)):
+        indices, values = document_vector(text)
+        points.append(models.PointStruct(
+            id=str(uuid.UUID(int=position)),
+            vector={"": vector, SPARSE_VECTOR_NAME: models.SparseVector(indices=indices, values=values)},
+            payload={"text": text, "source": source, "position": position}
+        ))
+    await client.upsert(settings.collection_name, points)
+    return client
+
+
+async def run(args):
+    chunks, queries = make_corpus(args.distractors, args.relevant)
+    texts = [text for text, _ in chunks]
+    questions = [question for question, _ in queries]
+    if args.openai:
+        dense = openai_embedding(texts)
+        query_dense = openai_embedding(questions)
+    else:
+        dense = [trigram_embedding(text) for text in texts]
+        query_dense = [trigram_embedding(question) for question in questions]
+    client = await build_collection(chunks, dense)
+    print(f"{len(chunks)} chunks, {len(queries)} queries, "
+          f"{'OpenAI' if args.openai else 'trigram'} embeddings\n")
+
+    modes = [("dense", False, None), ("hybrid", True, None),
+             ("hybrid, source=bis", True, models.Filter(must=[
+                 models.FieldCondition(key="source", match=models.MatchValue(value="bis"))]))]
+    for name, hybrid, query_filter in modes:
+        recalls: List[float] = []
+        latencies: Dict[int, float] = {}
+        for i, ((question, relevant), vector) in enumerate(zip(queries, query_dense)):
+            hits = await query_collection(client, question, vector, query_filter, args.k, hybrid)
+            found = {hit["payload"]["position"] for hit in hits}
+            recalls.append(len(found & relevant) / min(len(relevant), args.k))
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                await query_collection(client, question, vector, query_filter, args.k, hybrid)
+            latencies[i] = (time.perf_counter() - start) / args.repeat * 1000
+        print(f"{name:<20} recall@{args.k} {statistics.mean(recalls):5.2f}   "
+              f"p50 {statistics.median(latencies.values()):6.2f} ms   "
+              f"max {max(latencies.values()):6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=5, help="Hits per query (recall@k)")
+    parser.add_argument("--distractors", type=int, default=40, help="Distractor chunks per topic")
+    parser.add_argument("--relevant", type=int, default=3, help="Relevant chunks per topic")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions of each query")
+    parser.add_argument("--openai", action="store_true", help="Use the configured OpenAI embedding model")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
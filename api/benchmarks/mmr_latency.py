@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Latency of Maximal Marginal Relevance selection over retrieved candidates.
+
+Times `mmr_select` on random unit vectors for a range of candidate counts,
+and shows how many picks come from the same near-duplicate cluster with
+and without MMR.
+
+    cd api && PYTHONPATH=. python benchmarks/mmr_latency.py --dimensions 1536 --k 5
+"""
+import argparse
+import time
+import numpy as np
+
+from app.mmr import mmr_select
+
+
+def clustered(candidates: int, dimensions: int, clusters: int, rng: np.random.Generator):
+    """Candidates drawn around a few centres, best first, as from a document split into similar chunks."""
+    centres = rng.standard_normal((clusters, dimensions), dtype=np.float32)
+    labels = np.sort(rng.integers(0, clusters, candidates))
+    vectors = centres[labels] + 0.1 * rng.standard_normal((candidates, dimensions), dtype=np.float32)
+    relevance = np.linspace(1.0, 0.0, candidates, dtype=np.float32)
+    return relevance, vectors, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dimensions", type=int, default=1536, help="Vector dimensions")
+    parser.add_argument("--k", type=int, default=5, help="Candidates picked")
+    parser.add_argument("--lambda-mult", type=float, default=0.7, help="Relevance/diversity trade-off")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed repetitions")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for candidates in (10, 20, 50, 100, 200):
+        relevance, vectors, labels = clustered(candidates, args.dimensions, 4, rng)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            picked = mmr_select(relevance, vectors, args.k, args.lambda_mult)
+        elapsed = (time.perf_counter() - start) / args.repeat * 1000
+        print(f"{candidates:>4} candidates  {elapsed:6.3f} ms   "
+              f"clusters in top {args.k}: plain {len(set(labels[:args.k]))}, "
+              f"MMR {len(set(labels[picked]))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Pytest configuration for the API: makes the `app` package importable from api/.
+"""
@@ -0,0 +1,67 @@
+"""
+Tests for the local gap analysis scorer.
+"""
+import pytest
+
+from app.coverage import _has_amount, coverage, decide
+
+
+def evidence(*texts):
+    return [{"text": text} for text in texts]
+
+
+@pytest.mark.parametrize("window", [
+    " was $1,234.5 million for the year",
+    " of 450 million",
+    " of EUR 300",
+    " amounted to 12.3 in the period",
+    " (1,204)",
+])
+def test_amounts_count_as_figures(window):
+    assert _has_amount(window)
+
+
+@pytest.mark.parametrize("window", [
+    " grew 12.5% year on year",
+    " of at least 100 per cent of outflows",
+    " (2019)",
+    " under IFRS 15 in millions",
+    " under Basel 3.1",
+    " are covered in paragraph 4.",
+    " of 42 banks",
+])
+def test_references_percentages_and_counts_are_not_figures(window):
+    assert not _has_amount(window)
+
+
+@pytest.mark.parametrize("text", [
+    "Banks must hold high-quality liquid assets of at least 100% under Basel 3 (2019). Revenue recognition "
+    "under IFRS 15 in millions; net income effects are covered in paragraph 4.",
+    "Under IAS 1 paragraph 54, total assets are presented by liquidity. Net income attributable to "
+    "non-controlling interests is disclosed per IFRS 12 in thousands of euros (2024).",
+    "Risk-weighted assets of 8% under Pillar 1; revenue from contracts with customers follows "
+    "ASC 606 for fiscal 2023, and net profit is allocated under Article 9.",
+])
+def test_regulatory_text_is_never_done_locally(text):
+    done, report = decide(evidence(text))
+    assert done is not True
+    assert all(credit < 1.0 for credit in report["concepts"].values())
+
+
+def test_bare_assets_is_not_a_concept():
+    report = coverage(evidence("Liquid assets of USD 4,500 million are held as a buffer."))
+    assert report["concepts"]["assets"] == 0.0
+
+
+def test_reported_figures_are_done_locally():
+    done, report = decide(evidence(
+        "For fiscal 2023, revenue was $12,345.6 million and net income was $1,234 million. "
+        "Total assets of USD 98,765 million as of December 31, 2023."
+    ))
+    assert done is True
+    assert report["concepts"] == {"revenue": 1.0, "assets": 1.0, "net_income": 1.0}
+
+
+def test_concepts_without_figures_continue():
+    done, _ = decide(evidence("Revenue and net income are discussed in the next section."))
+    assert done is False
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Chunker throughput and token utilisation on large documents.
+
+Generates a FRED-like series (one `date: value` line per observation) and a
+long prose document, chunks each with `iter_chunks`, and reports chunks per
+second, the largest chunk and how full chunks are relative to the token limit.
+    
+    python benchmarks/chunker_throughput.py --observations 50000 --max-tokens 512
+"""
+import argparse
+import datetime
+import random
+import time
+
+from regulasense_ingest.utils.embeddings import iter_chunks, count_tokens
+
+SENTENCES = [
+    "The Basel Committee published revised standards for the treatment of credit risk.",
+    "Supervisors should ensure that banks hold sufficient liquidity buffers under stress.",
+    "Counterparty exposures to non-bank financial intermediaries have grown since 2020!",
+    "Does the proposed framework address climate-related financial risks adequately?",
+    "Implementation timelines vary across jurisdictions and remain subject to review.",
+]
+
+
+def fred_document(observations: int) -> str:
+    """Build a FRED-style series document with one observation per line."""
+    start = datetime.date(1950, 1, 1)
+    lines = ["Federal Funds Effective Rate (FEDFUNDS)", "Units: Percent", "", "Data:"]
+    value = 2.0
+    for i in range(observations):
+        value = max(0.0, value + random.uniform(-0.1, 0.1))
+        lines.append(f"{start + datetime.timedelta(days=i)}: {value:.2f}")
+    return "\n".join(lines)
+
+
+def prose_document(paragraphs: int) -> str:
+    """Build a long regulatory-style document of paragraphs of sentences."""
+    return "\n\n".join(
+        " ".join(random.choice(SENTENCES) for _ in range(random.randint(3, 12)))
+        for _ in range(paragraphs)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--observations", type=int, default=50000, help="Lines in the FRED-like document")
+    parser.add_argument("--paragraphs", type=int, default=5000, help="Paragraphs in the prose document")
+    parser.add_argument("--max-tokens", type=int, default=512, help="Maximum tokens per chunk")
+    parser.add_argument("--overlap-tokens", type=int, default=64, help="Tokens shared between chunks")
+    args = parser.parse_args()
+    
+    random.seed(0)
+    documents = [
+        ("fred", fred_document(args.observations)),
+        ("prose", prose_document(args.paragraphs)),
+    ]
+    
+    print(f"{'Document':<8} {'Tokens':>10} {'Chunks':>8} {'Chunks/s':>10} {'Max':>6} {'Mean fill':>10}")
+    for name, text in documents:
+        start = time.perf_counter()
+        sizes = [count_tokens(chunk) for chunk in iter_chunks(text, args.max_tokens, args.overlap_tokens)]
+        elapsed = time.perf_counter() - start
+        
+        fill = sum(sizes) / (len(sizes) * args.max_tokens) if sizes else 0.0
+        print(f"{name:<8} {count_tokens(text):>10} {len(sizes):>8} {len(sizes) / elapsed:>10.1f} "
+              f"{max(sizes, default=0):>6} {fill:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Embedding throughput benchmark against a local fake embedding server.
+
+Compares one request per chunk (the old upload path) with the batched
+`get_embeddings` API. The fake server mimics the OpenAI `/v1/embeddings`
+endpoint and adds a fixed per-request latency to stand in for the network.
+
+    python benchmarks/embedding_throughput.py --chunks 500 --latency-ms 50
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from regulasense_ingest.config import config
+from regulasense_ingest.utils.embeddings import get_embedding, get_embeddings
+
+DIMENSIONS = 1536
+
+
+def make_handler(latency: float):
+    """Build a request handler that answers embedding requests after `latency` seconds."""
+    class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+        requests_served = 0
+        
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            inputs = body["input"]
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            
+            time.sleep(latency)
+            FakeEmbeddingHandler.requests_served += 1
+            
+            payload = json.dumps({
+                "object": "list",
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [0.0] * DIMENSIONS}
+                    for i in range(len(inputs))
+                ],
+                "model": body["model"],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0}
+            }).encode()
+            
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return FakeEmbeddingHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=500, help="Number of chunks to embed")
+    parser.add_argument("--chunk-chars", type=int, default=1000, help="Characters per chunk")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated latency per request")
+    args = parser.parse_args()
+    
+    handler = make_handler(args.latency_ms / 1000)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # Point the embedding utilities at the fake server
+    config.openai_api_key = "sk-benchmark"
+    config.openai_base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    # Measure the network path, not the embedding cache
+    config.embedding_cache_enabled = False
+    
+    texts = [f"chunk {i} " + "x" * args.chunk_chars for i in range(args.chunks)]
+    
+    results = {}
+    for name, run in [
+        ("per-chunk", lambda: [get_embedding(text) for text in texts]),
+        ("batched", lambda: get_embeddings(texts)),
+    ]:
+        handler.requests_served = 0
+        start = time.perf_counter()
+        embeddings = run()
+        elapsed = time.perf_counter() - start
+        assert len(embeddings) == len(texts)
+        results[name] = elapsed
+        print(f"{name:>10}: {elapsed:7.2f}s  {len(texts) / elapsed:9.1f} chunks/s  "
+              f"{handler.requests_served} requests")
+    
+    print(f"\nSpeedup: {results['per-chunk'] / results['batched']:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
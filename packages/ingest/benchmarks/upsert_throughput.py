@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Qdrant upsert throughput: sequential batches versus the pipelined BulkWriter.
+
+Writes random vectors to a scratch collection on a running Qdrant server
+(the collection is dropped afterwards) and reports points per second for
+one blocking request at a time and for several batches in flight, over
+HTTP and optionally gRPC.
+
+    python benchmarks/upsert_throughput.py --points 20000 --url http://localhost:6333 --grpc
+"""
+import argparse
+import time
+import uuid
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from regulasense_ingest.config import config
+from regulasense_ingest.utils.bulk import BulkWriter
+
+COLLECTION = "regulasense-upsert-benchmark"
+
+
+def make_points(count: int, dimensions: int):
+    """Random unit vectors with a payload of typical size."""
+    vectors = np.random.default_rng(0).standard_normal((count, dimensions), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        models.PointStruct(
+            id=str(uuid.uuid4()),
+            vector=vector.tolist(),
+            payload={"source": "benchmark", "source_id": str(i), "text": "x" * 800}
+        )
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def reset(client: QdrantClient, dimensions: int) -> None:
+    """Recreate the scratch collection."""
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        COLLECTION,
+        vectors_config=models.VectorParams(size=dimensions, distance=models.Distance.COSINE)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=config.qdrant_url, help="Qdrant server URL")
+    parser.add_argument("--points", type=int, default=20000, help="Points to write per run")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Vector dimensions")
+    parser.add_argument("--batch-size", type=int, default=config.upsert_batch_size, help="Points per request")
+    parser.add_argument("--parallel", type=int, default=config.upsert_parallel, help="Requests in flight")
+    parser.add_argument("--grpc", action="store_true", help="Also measure over gRPC")
+    args = parser.parse_args()
+    
+    points = make_points(args.points, args.dimensions)
+    transports = [("http", False)] + ([("grpc", True)] if args.grpc else [])
+    
+    for transport, prefer_grpc in transports:
+        client = QdrantClient(url=args.url, prefer_grpc=prefer_grpc, grpc_port=config.qdrant_grpc_port)
+        
+        runs = [
+            ("sequential, batch 100", dict(batch_size=100, parallel=1, wait=True)),
+            (f"bulk, batch {args.batch_size} x{args.parallel}, wait=False",
+             dict(batch_size=args.batch_size, parallel=args.parallel, wait=False)),
+        ]
+        for name, options in runs:
+            reset(client, args.dimensions)
+            start = time.perf_counter()
+            with BulkWriter(client, collection_name=COLLECTION, **options) as writer:
+                writer.add(points)
+            elapsed = time.perf_counter() - start
+            assert client.count(COLLECTION, exact=True).count == args.points
+            print(f"{transport:>4} {name:<40} {elapsed:7.2f}s  {args.points / elapsed:9.0f} points/s")
+        
+        client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Command-line interface for RegulaSense data ingestion.
 import os
 import sys
 import json
+import time
 from pathlib import Path
 from typing import List, Optional
 import click
@@ -12,7 +13,12 @@ from .config import config
 from .sources.fred import FredSource
 from .sources.bis import BisSource
 from .sources.fsb import FsbSource
-from .utils.qdrant import upload_items
+from .sources.snapshot import SnapshotSource
+from .pipeline import run_pipeline, format_summary
+from .utils.vector_snapshot import upload_vector_snapshot
+from .utils.cache import get_cache, EmbeddingCache
+from .utils.http import get_http_cache
+from .utils.qdrant import collection_drift, apply_collection_profile, get_qdrant_client
 
 SOURCES = {
     "fred": FredSource,
@@ -29,17 +35,60 @@ def cli():
 @cli.command()
 @click.argument("sources", nargs=-1)
 @click.option("--snapshot", type=click.Path(), help="Save data to directory instead of uploading to Qdrant")
-@click.option("--max-items", type=int, default=50, help="Maximum items to fetch per source")
-def ingest(sources: List[str], snapshot: Optional[str], max_items: int):
+@click.option("--with-vectors", is_flag=True, help="With --snapshot, also save precomputed embeddings")
+@click.option("--from-snapshot", type=click.Path(exists=True, file_okay=False),
+              help="Upload a snapshot directory to Qdrant instead of contacting the sources")
+@click.option("--max-items", type=int, default=None,
+              help="Maximum items to fetch per source (default: 50; all items with --from-snapshot)")
+@click.option("--parallel", is_flag=True, help="Fetch all sources concurrently")
+@click.option("--force", is_flag=True, help="Re-upload items even if unchanged since the last run")
+def ingest(sources: List[str], 
+           snapshot: Optional[str], 
+           with_vectors: bool,
+           from_snapshot: Optional[str], 
+           max_items: Optional[int], 
+           parallel: bool, 
+           force: bool):
     """
     Ingest data from specified sources.
     
-    SOURCES: One or more of [fred, bis, fsb]
+    SOURCES: One or more of [fred, bis, fsb]. With --from-snapshot, the
+    sources to replay (default: every source in the snapshot).
     """
+    if from_snapshot:
+        if snapshot:
+            print("Error: --snapshot and --from-snapshot cannot be combined")
+            sys.exit(1)
+        
+        snapshot_sources = SnapshotSource.discover(Path(from_snapshot), list(sources))
+        if not snapshot_sources:
+            print(f"Error: No snapshots found in {from_snapshot}")
+            sys.exit(1)
+        
+        print(f"Uploading snapshots to Qdrant collection '{config.collection_name}'...")
+        started = time.perf_counter()
+        
+        # Snapshots with precomputed embeddings load directly; the rest are re-embedded
+        to_embed = []
+        for source in snapshot_sources:
+            if source.vectors_path is not None and max_items is None:
+                upload_vector_snapshot(source.vectors_path)
+            else:
+                to_embed.append((source, {"max_items": max_items}))
+        
+        if to_embed:
+            stats = run_pipeline(to_embed, parallel=parallel, force=force)
+            print(f"\n{format_summary(stats)}")
+        print(f"Total time: {time.perf_counter() - started:.1f}s")
+        print("\nData ingestion completed!")
+        return
+    
     if not sources:
         print("Error: No sources specified. Choose from: fred, bis, fsb")
         sys.exit(1)
     
+    max_items = max_items or 50
+    
     # Validate sources
     invalid_sources = [s for s in sources if s not in SOURCES]
     if invalid_sources:
@@ -53,37 +102,123 @@ def ingest(sources: List[str], snapshot: Optional[str], max_items: int):
         os.makedirs(snapshot_dir, exist_ok=True)
         print(f"Will save snapshots to {snapshot_dir}")
     
-    # Process each source
-    for source_name in sources:
-        try:
-            print(f"\nProcessing source: {source_name}")
-            
-            # Create source instance
-            source_class = SOURCES[source_name]
-            source = source_class()
-            
-            if snapshot_dir:
+    if snapshot_dir:
+        # Process each source
+        for source_name in sources:
+            try:
+                print(f"\nProcessing source: {source_name}")
+                source = SOURCES[source_name]()
+                
                 # Save snapshot
-                output_file = source.snapshot(snapshot_dir, max_items=max_items)
+                output_file = source.snapshot(snapshot_dir, with_vectors=with_vectors, max_items=max_items)
                 print(f"Saved snapshot to {output_file}")
-            else:
-                # Fetch and upload to Qdrant
-                print(f"Fetching data from {source_name}...")
-                items = list(source.fetch(max_items=max_items))
-                print(f"Fetched {len(items)} items from {source_name}")
-                
-                if items:
-                    print(f"Uploading to Qdrant collection '{config.collection_name}'...")
-                    upload_items(items)
-                    print(f"Successfully uploaded {len(items)} items from {source_name} to Qdrant")
-                else:
-                    print(f"No items to upload from {source_name}")
+            
+            except Exception as e:
+                print(f"Error processing source {source_name}: {e}")
+    else:
+        # Stream every source through the fetch -> chunk -> embed -> upsert pipeline
+        pipeline_sources = []
+        for source_name in sources:
+            try:
+                pipeline_sources.append((SOURCES[source_name](), {"max_items": max_items}))
+            except Exception as e:
+                print(f"Error processing source {source_name}: {e}")
         
-        except Exception as e:
-            print(f"Error processing source {source_name}: {e}")
+        print(f"Uploading to Qdrant collection '{config.collection_name}'...")
+        started = time.perf_counter()
+        stats = run_pipeline(pipeline_sources, parallel=parallel, force=force)
+        print(f"\n{format_summary(stats)}")
+        print(f"Total time: {time.perf_counter() - started:.1f}s")
+    
+    embedding_cache = get_cache()
+    if embedding_cache is not None and (embedding_cache.hits or embedding_cache.misses):
+        print(f"\nEmbedding cache: {embedding_cache.hits} hits, {embedding_cache.misses} misses")
+    
+    http_cache = get_http_cache()
+    if http_cache is not None and http_cache.requests:
+        stats = http_cache.stats()
+        print(f"HTTP cache: {stats['not_modified']}/{stats['requests']} pages not modified "
+              f"({stats['hit_rate']:.1%})")
     
     print("\nData ingestion completed!")
 
+@cli.group()
+def cache():
+    """Inspect and prune the on-disk embedding cache."""
+    pass
+
+def _open_cache() -> EmbeddingCache:
+    """Open the configured embedding cache without pruning it."""
+    return EmbeddingCache(
+        config.state_dir / "embeddings.sqlite",
+        max_bytes=config.embedding_cache_max_mb * 1024 * 1024,
+        max_age_days=config.embedding_cache_max_age_days
+    )
+
+@cache.command("stats")
+def cache_stats():
+    """Show embedding cache size and hit/miss counters."""
+    stats = _open_cache().stats()
+    print(f"Embedding cache: {stats['path']}")
+    print(f"  Entries:   {stats['entries']}")
+    print(f"  Size:      {stats['size_bytes'] / (1024 * 1024):.1f} MB")
+    for model, count in stats["models"].items():
+        print(f"  Model:     {model} ({count} entries)")
+    print(f"  Hits:      {stats['total_hits']}")
+    print(f"  Misses:    {stats['total_misses']}")
+    print(f"  Hit rate:  {stats['hit_rate']:.1%}")
+
+@cache.command("prune")
+@click.option("--max-mb", type=int, default=None, help="Size budget in MB (default: EMBEDDING_CACHE_MAX_MB)")
+@click.option("--max-age-days", type=float, default=None, help="Age limit in days (default: EMBEDDING_CACHE_MAX_AGE_DAYS)")
+@click.option("--all", "clear_all", is_flag=True, help="Remove every entry")
+def cache_prune(max_mb: Optional[int], max_age_days: Optional[float], clear_all: bool):
+    """Evict old or least recently used embeddings."""
+    embedding_cache = _open_cache()
+    if clear_all:
+        removed = embedding_cache.clear()
+    else:
+        removed = embedding_cache.prune(
+            max_bytes=max_mb * 1024 * 1024 if max_mb is not None else None,
+            max_age_days=max_age_days
+        )
+    print(f"Removed {removed} cached embeddings")
+
+@cli.group()
+def collection():
+    """Inspect and apply the Qdrant collection profile."""
+    pass
+
+def _print_drift(drift) -> None:
+    """Print collection settings that differ from the profile."""
+    if not drift:
+        print("Collection matches the profile")
+        return
+    for setting, (current, wanted) in drift.items():
+        print(f"  {setting:<28} {str(current):>12} -> {wanted}")
+
+@collection.command("show")
+def collection_show():
+    """Show the collection profile and any drift from it."""
+    print(f"Collection: {config.collection_name}")
+    for setting, value in config.collection.model_dump().items():
+        print(f"  {setting:<28} {value}")
+    
+    client = get_qdrant_client()
+    if not client.collection_exists(config.collection_name):
+        print("\nCollection does not exist yet; it will be created from the profile")
+        return
+    print("\nDrift (current -> profile):")
+    _print_drift(collection_drift(client))
+
+@collection.command("apply")
+def collection_apply():
+    """Create the collection or update it to match the profile."""
+    remaining = apply_collection_profile()
+    if remaining:
+        print("\nDrift that requires recreating the collection (current -> profile):")
+    _print_drift(remaining)
+
 def main():
     """Entry point for the CLI."""
     cli()
@@ -10,6 +10,62 @@ from pydantic import BaseModel, Field
 # Load environment variables
 load_dotenv()
 
+def _payload_indexes() -> Dict[str, str]:
+    """Parse PAYLOAD_INDEXES ("field:type,field:type") into a field -> schema type map."""
+    spec = os.getenv("PAYLOAD_INDEXES", "source:keyword,source_id:keyword,category:keyword,timestamp:datetime,published_at:datetime")
+    return dict(entry.strip().split(":", 1) for entry in spec.split(",") if entry.strip())
+
+class CollectionProfile(BaseModel):
+    """Declarative layout of the Qdrant collection."""
+    vector_size: int = Field(
+        default=int(os.getenv("EMBEDDING_DIMENSIONS", "1536")),
+        description="Embedding dimensions"
+    )
+    distance: str = Field(
+        default=os.getenv("COLLECTION_DISTANCE", "Cosine"),
+        description="Vector distance: Cosine, Dot, Euclid or Manhattan"
+    )
+    hnsw_m: int = Field(
+        default=int(os.getenv("HNSW_M", "16")),
+        description="HNSW edges per node; higher improves recall at the cost of memory"
+    )
+    hnsw_ef_construct: int = Field(
+        default=int(os.getenv("HNSW_EF_CONSTRUCT", "100")),
+        description="HNSW candidate list size while building the index"
+    )
+    quantization: str = Field(
+        default=os.getenv("QUANTIZATION", "none"),
+        description="Vector quantization: none, scalar (int8) or binary"
+    )
+    quantization_always_ram: bool = Field(
+        default=os.getenv("QUANTIZATION_ALWAYS_RAM", "1") not in ("0", "false", "no"),
+        description="Keep quantized vectors in RAM even when originals are on disk"
+    )
+    vectors_on_disk: bool = Field(
+        default=os.getenv("VECTORS_ON_DISK", "0") not in ("0", "false", "no"),
+        description="Store original vectors on disk (memory-mapped) instead of in RAM"
+    )
+    payload_on_disk: bool = Field(
+        default=os.getenv("PAYLOAD_ON_DISK", "0") not in ("0", "false", "no"),
+        description="Store payloads on disk instead of in RAM"
+    )
+    shard_number: int = Field(
+        default=int(os.getenv("SHARD_NUMBER", "1")),
+        description="Number of shards (fixed at creation)"
+    )
+    replication_factor: int = Field(
+        default=int(os.getenv("REPLICATION_FACTOR", "1")),
+        description="Copies of each shard across a cluster"
+    )
+    sparse_vectors: bool = Field(
+        default=os.getenv("SPARSE_VECTORS", "0") not in ("0", "false", "no"),
+        description="Also store BM25-style sparse vectors for hybrid search (fixed at creation)"
+    )
+    payload_indexes: Dict[str, str] = Field(
+        default_factory=_payload_indexes,
+        description="Payload field -> index type (keyword, integer, float, bool, datetime, text)"
+    )
+
 class IngestConfig(BaseModel):
     """Configuration for the data ingestion module."""
     # Qdrant configuration
@@ -21,6 +77,10 @@ class IngestConfig(BaseModel):
         default=os.getenv("COLLECTION_NAME", "regulasense-evidence"),
         description="Name of the Qdrant collection to store data in"
     )
+    collection: CollectionProfile = Field(
+        default_factory=CollectionProfile,
+        description="HNSW, quantization, storage and payload index settings of the collection"
+    )
     
     # API keys
     openai_api_key: Optional[str] = Field(
@@ -37,11 +97,79 @@ class IngestConfig(BaseModel):
         default=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
         description="OpenAI embedding model to use"
     )
-    
+    openai_base_url: Optional[str] = Field(
+        default=os.getenv("OPENAI_BASE_URL"),
+        description="Override for the OpenAI API base URL (e.g. a local proxy)"
+    )
+    embedding_batch_size: int = Field(
+        default=int(os.getenv("EMBEDDING_BATCH_SIZE", "256")),
+        description="Maximum number of texts sent in one embedding request"
+    )
+    embedding_batch_tokens: int = Field(
+        default=int(os.getenv("EMBEDDING_BATCH_TOKENS", "100000")),
+        description="Maximum total tokens sent in one embedding request"
+    )
+    embedding_cache_enabled: bool = Field(
+        default=os.getenv("EMBEDDING_CACHE", "1") not in ("0", "false", "no"),
+        description="Reuse embeddings of unchanged chunks from the on-disk cache"
+    )
+    embedding_cache_max_mb: int = Field(
+        default=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "2048")),
+        description="Maximum size of cached vectors before least recently used entries are evicted"
+    )
+    embedding_cache_max_age_days: float = Field(
+        default=float(os.getenv("EMBEDDING_CACHE_MAX_AGE_DAYS", "90")),
+        description="Maximum age of a cached embedding before it is evicted"
+    )
+
     # Chunking configuration
-    chunk_size: int = Field(
-        default=int(os.getenv("CHUNK_SIZE", "1000")),
-        description="Size of text chunks for embedding"
+    chunk_max_tokens: int = Field(
+        default=int(os.getenv("CHUNK_MAX_TOKENS", "512")),
+        description="Maximum embedding-model tokens per text chunk"
+    )
+    chunk_overlap_tokens: int = Field(
+        default=int(os.getenv("CHUNK_OVERLAP_TOKENS", "64")),
+        description="Tokens of trailing context repeated at the start of the next chunk"
+    )
+    sparse_avg_doc_length: float = Field(
+        default=float(os.getenv("SPARSE_AVG_DOC_LENGTH", "250")),
+        description="Average chunk length in terms, for BM25 length normalisation of sparse vectors"
+    )
+    
+    # Pipeline configuration
+    pipeline_queue_size: int = Field(
+        default=int(os.getenv("PIPELINE_QUEUE_SIZE", "64")),
+        description="Maximum entries buffered between two pipeline stages"
+    )
+    pipeline_chunk_workers: int = Field(
+        default=int(os.getenv("PIPELINE_CHUNK_WORKERS", "2")),
+        description="Number of concurrent chunking workers"
+    )
+    pipeline_embed_workers: int = Field(
+        default=int(os.getenv("PIPELINE_EMBED_WORKERS", "4")),
+        description="Number of concurrent embedding requests"
+    )
+    
+    # Qdrant write configuration
+    qdrant_prefer_grpc: bool = Field(
+        default=os.getenv("QDRANT_PREFER_GRPC", "0") not in ("0", "false", "no"),
+        description="Talk to Qdrant over gRPC instead of HTTP/JSON"
+    )
+    qdrant_grpc_port: int = Field(
+        default=int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+        description="Qdrant gRPC port"
+    )
+    upsert_batch_size: int = Field(
+        default=int(os.getenv("UPSERT_BATCH_SIZE", "256")),
+        description="Points per Qdrant upsert request"
+    )
+    upsert_parallel: int = Field(
+        default=int(os.getenv("UPSERT_PARALLEL", "4")),
+        description="Qdrant upsert requests in flight at once"
+    )
+    upsert_wait: bool = Field(
+        default=os.getenv("UPSERT_WAIT", "0") not in ("0", "false", "no"),
+        description="Wait for every upsert to be applied instead of only for the final batch"
     )
     
     # Source specific configurations
@@ -49,6 +177,22 @@ class IngestConfig(BaseModel):
         default=["GDP", "UNRATE", "CPIAUCSL", "DFF", "SP500"],
         description="Default FRED data series to ingest"
     )
+    fred_max_workers: int = Field(
+        default=int(os.getenv("FRED_MAX_WORKERS", "4")),
+        description="Number of FRED series fetched at once"
+    )
+    fred_rate: float = Field(
+        default=float(os.getenv("FRED_RATE", "2.0")),
+        description="Sustained FRED API requests per second (the API allows 120 per minute)"
+    )
+    fred_history_years: int = Field(
+        default=int(os.getenv("FRED_HISTORY_YEARS", "5")),
+        description="Years of observations fetched for a series on its first sync"
+    )
+    fred_revision_days: int = Field(
+        default=int(os.getenv("FRED_REVISION_DAYS", "365")),
+        description="Days before the sync watermark re-requested to pick up revised observations"
+    )
     
     bis_categories: list[str] = Field(
         default=["banking", "statistics", "regulation"],
@@ -60,11 +204,76 @@ class IngestConfig(BaseModel):
         description="FSB document types to ingest"
     )
 
+    # Crawler configuration (BIS, FSB)
+    crawl_concurrency: int = Field(
+        default=int(os.getenv("CRAWL_CONCURRENCY", "4")),
+        description="Number of pages fetched at once by the crawler"
+    )
+    crawl_rate_per_host: float = Field(
+        default=float(os.getenv("CRAWL_RATE_PER_HOST", "2.0")),
+        description="Sustained requests per second allowed per host"
+    )
+    crawl_burst: int = Field(
+        default=int(os.getenv("CRAWL_BURST", "4")),
+        description="Requests allowed in a burst per host"
+    )
+    crawl_max_retries: int = Field(
+        default=int(os.getenv("CRAWL_MAX_RETRIES", "5")),
+        description="Retries on connection errors, 429 and 5xx responses"
+    )
+    crawl_backoff: float = Field(
+        default=float(os.getenv("CRAWL_BACKOFF", "0.5")),
+        description="Base delay in seconds for exponential retry backoff"
+    )
+    crawl_timeout: float = Field(
+        default=float(os.getenv("CRAWL_TIMEOUT", "30")),
+        description="HTTP request timeout in seconds"
+    )
+    
+    http_cache_enabled: bool = Field(
+        default=os.getenv("HTTP_CACHE", "1") not in ("0", "false", "no"),
+        description="Revalidate scraped pages against an on-disk HTTP cache"
+    )
+    http_cache_dir: Optional[Path] = Field(
+        default=Path(os.environ["HTTP_CACHE_DIR"]) if os.getenv("HTTP_CACHE_DIR") else None,
+        description="Directory for cached HTTP responses (default: <state_dir>/http)"
+    )
+    http_cache_max_mb: int = Field(
+        default=int(os.getenv("HTTP_CACHE_MAX_MB", "512")),
+        description="Maximum size of cached HTTP responses"
+    )
+    
+    # Local state (caches, manifests)
+    state_dir: Path = Field(
+        default=Path(os.getenv("INGEST_STATE_DIR", "./.ingest_state")),
+        description="Directory for persistent ingestion state such as caches"
+    )
+    timeseries_dir: Optional[Path] = Field(
+        default=Path(os.environ["TIMESERIES_DIR"]) if os.getenv("TIMESERIES_DIR") else None,
+        description="Directory of the numeric time-series store (default: <state_dir>/timeseries)"
+    )
+
     # Snapshot configuration
     default_snapshot_dir: Path = Field(
         default=Path("./sample_data"),
         description="Default directory for snapshot output"
     )
+    snapshot_compression: str = Field(
+        default=os.getenv("SNAPSHOT_COMPRESSION", "gzip"),
+        description="Snapshot file compression: gzip, zstd or none"
+    )
+    snapshot_vector_dtype: str = Field(
+        default=os.getenv("SNAPSHOT_VECTOR_DTYPE", "float32"),
+        description="Storage dtype of precomputed snapshot vectors: float32 or float16"
+    )
+    snapshot_upload_batch_size: int = Field(
+        default=int(os.getenv("SNAPSHOT_UPLOAD_BATCH_SIZE", "1024")),
+        description="Points per upload request when loading a vector snapshot"
+    )
+    snapshot_upload_parallel: int = Field(
+        default=int(os.getenv("SNAPSHOT_UPLOAD_PARALLEL", "2")),
+        description="Concurrent upload workers when loading a vector snapshot"
+    )
     
     def __str__(self) -> str:
         """String representation of the configuration."""
@@ -73,7 +282,8 @@ class IngestConfig(BaseModel):
             f"  - qdrant_url: {self.qdrant_url}\n"
             f"  - collection_name: {self.collection_name}\n"
             f"  - embedding_model: {self.embedding_model}\n"
-            f"  - chunk_size: {self.chunk_size}\n"
+            f"  - chunk_max_tokens: {self.chunk_max_tokens}\n"
+            f"  - chunk_overlap_tokens: {self.chunk_overlap_tokens}\n"
             f"  - FRED API key: {'set' if self.fred_api_key else 'not set'}\n"
             f"  - OpenAI API key: {'set' if self.openai_api_key else 'not set'}"
         )
@@ -0,0 +1,378 @@
+"""
+Streaming, stage-pipelined ingestion engine.
+
+Items flow through four stages connected by bounded asyncio queues:
+
+    fetch -> chunk -> embed -> upsert
+
+Each stage runs its blocking work (HTTP requests, tokenisation, Qdrant
+calls) in worker threads, so network-bound stages overlap and memory is
+bounded by the queue depth rather than by the size of the crawl.
+"""
+import asyncio
+import time
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from qdrant_client import QdrantClient
+
+from .config import config
+from .sources.base import BaseSource, DataItem
+from .utils.embeddings import get_embeddings, chunk_text
+from .utils.qdrant import ensure_collection_exists, build_point, delete_points, sync_manifest, get_qdrant_client, bump_collection_version
+from .utils.bulk import BulkWriter
+from .utils.manifest import get_manifest, content_hash, stale_point_ids
+
+# Marks the end of a queue for one downstream worker
+_DONE = object()
+
+# Stale point IDs collected before issuing a delete request
+DELETE_BATCH_SIZE = 500
+
+
+class SourceStats:
+    """Per-source counters collected while a pipeline runs."""
+    
+    def __init__(self, name: str):
+        """
+        Initialize counters for a source.
+        
+        Args:
+            name: Source name
+        """
+        self.name = name
+        self.items = 0
+        self.chunks = 0
+        self.points = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.failures = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds between the first fetch and the last upsert for this source."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+    
+    def __str__(self) -> str:
+        return (f"SourceStats(source={self.name}, items={self.items}, chunks={self.chunks}, "
+                f"points={self.points}, skipped={self.skipped}, deleted={self.deleted}, "
+                f"failures={self.failures}, elapsed={self.elapsed:.1f}s)")
+
+
+class _InFlightItem:
+    """Progress of an item whose chunks are moving through the pipeline."""
+    
+    def __init__(self, item_hash: str, chunk_count: int):
+        self.item_hash = item_hash
+        self.chunk_count = chunk_count
+        self.remaining = chunk_count
+        self.failed = False
+
+
+class IngestPipeline:
+    """Bounded-queue pipeline from data sources to a Qdrant collection."""
+    
+    def __init__(self,
+                 client: Optional[QdrantClient] = None,
+                 queue_size: Optional[int] = None,
+                 chunk_workers: Optional[int] = None,
+                 embed_workers: Optional[int] = None,
+                 upsert_parallel: Optional[int] = None,
+                 force: bool = False):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            client: Optional QdrantClient instance
+            queue_size: Maximum entries held between two stages
+            chunk_workers: Concurrent chunking workers
+            embed_workers: Concurrent embedding requests
+            upsert_parallel: Qdrant upsert requests in flight
+            force: Re-upload items even if the manifest says they are unchanged
+        """
+        self.client = client or get_qdrant_client()
+        self.queue_size = queue_size or config.pipeline_queue_size
+        self.chunk_workers = chunk_workers or config.pipeline_chunk_workers
+        self.embed_workers = embed_workers or config.pipeline_embed_workers
+        self.upsert_parallel = upsert_parallel or config.upsert_parallel
+        self.force = force
+        self.stats: Dict[str, SourceStats] = {}
+        self.writer: Optional[BulkWriter] = None
+        self.manifest = get_manifest()
+        # Items with chunks still being embedded or upserted, by id(item)
+        self._in_flight: Dict[int, _InFlightItem] = {}
+        self._stale_ids: List[str] = []
+    
+    async def run(self, 
+                  sources: Iterable[Tuple[BaseSource, Dict[str, Any]]],
+                  parallel: bool = False) -> Dict[str, SourceStats]:
+        """
+        Fetch, chunk, embed and upsert everything the given sources yield.
+        
+        Args:
+            sources: Pairs of (source, fetch keyword arguments)
+            parallel: Fetch all sources concurrently, each in its own worker,
+                instead of one after another. All workers feed the same
+                chunk/embed/upsert stages.
+        
+        Returns:
+            Per-source statistics keyed by source name
+        """
+        await asyncio.to_thread(ensure_collection_exists, self.client)
+        await asyncio.to_thread(sync_manifest, self.client, self.manifest)
+        self.writer = BulkWriter(self.client, parallel=self.upsert_parallel)
+        
+        items: asyncio.Queue = asyncio.Queue(self.queue_size)
+        chunks: asyncio.Queue = asyncio.Queue(self.queue_size)
+        batches: asyncio.Queue = asyncio.Queue(self.queue_size)
+        
+        chunkers = [asyncio.create_task(self._chunk(items, chunks)) for _ in range(self.chunk_workers)]
+        embedders = [asyncio.create_task(self._embed(chunks, batches)) for _ in range(self.embed_workers)]
+        # One task feeds the bulk writer, which keeps several upserts in flight itself
+        upserters = [asyncio.create_task(self._upsert(batches))]
+        stages = [(items, chunkers), (chunks, embedders), (batches, upserters)]
+        
+        feeder = asyncio.create_task(self._feed(sources, parallel, items, stages))
+        await _supervise([feeder, *chunkers, *embedders, *upserters])
+        await asyncio.to_thread(self.writer.close)
+        print(self.writer)
+        await self._delete_stale()
+        
+        if any(stats.points or stats.deleted for stats in self.stats.values()):
+            await asyncio.to_thread(bump_collection_version, self.client)
+        return self.stats
+    
+    async def _feed(self,
+                    sources: Iterable[Tuple[BaseSource, Dict[str, Any]]],
+                    parallel: bool,
+                    items: asyncio.Queue,
+                    stages: List[Tuple[asyncio.Queue, List[asyncio.Task]]]) -> None:
+        """Fetch every source into the first queue, then drain the stages in order."""
+        if parallel:
+            await asyncio.gather(*[
+                self._fetch(source, fetch_kwargs, items, progress=True)
+                for source, fetch_kwargs in sources
+            ])
+        else:
+            for source, fetch_kwargs in sources:
+                await self._fetch(source, fetch_kwargs, items)
+        
+        # One end marker per downstream worker
+        for queue, workers in stages:
+            for _ in workers:
+                await queue.put(_DONE)
+            await asyncio.gather(*workers)
+    
+    def _stats_for(self, name: str) -> SourceStats:
+        """Get the counters for a source, creating them on first use."""
+        if name not in self.stats:
+            self.stats[name] = SourceStats(name)
+        return self.stats[name]
+    
+    async def _fetch(self, 
+                     source: BaseSource, 
+                     fetch_kwargs: Dict[str, Any], 
+                     items: asyncio.Queue,
+                     progress: bool = False) -> None:
+        """Pull items from a source's generator in a worker thread."""
+        stats = self._stats_for(source.name)
+        stats.started_at = time.perf_counter()
+        
+        iterator = source.fetch(**fetch_kwargs)
+        while True:
+            try:
+                item = await asyncio.to_thread(next, iterator, _DONE)
+            except Exception as e:
+                print(f"Error fetching from {source.name}: {e}")
+                stats.failures += 1
+                break
+            if item is _DONE:
+                break
+            stats.items += 1
+            await items.put(item)
+            if progress and stats.items % 10 == 0:
+                print(f"[{source.name}] fetched {stats.items} items")
+        
+        stats.finished_at = time.perf_counter()
+        print(f"Fetched {stats.items} items from {source.name}")
+    
+    async def _delete_stale(self) -> None:
+        """Delete the points of chunks that re-ingested items no longer have."""
+        stale_ids, self._stale_ids = self._stale_ids, []
+        if not stale_ids:
+            return
+        try:
+            await asyncio.to_thread(delete_points, self.client, stale_ids, DELETE_BATCH_SIZE)
+        except Exception as e:
+            print(f"Error deleting {len(stale_ids)} stale points: {e}")
+    
+    def _chunk_done(self, item: DataItem, ok: bool) -> None:
+        """Account for a finished chunk; record the item once all of its chunks are written."""
+        key = id(item)
+        entry = self._in_flight[key]
+        entry.remaining -= 1
+        entry.failed = entry.failed or not ok
+        if entry.remaining == 0:
+            del self._in_flight[key]
+            if not entry.failed:
+                self.manifest.record(item, entry.item_hash, entry.chunk_count)
+    
+    async def _chunk(self, items: asyncio.Queue, chunks: asyncio.Queue) -> None:
+        """Split changed items into chunks and delete points for chunks they lost."""
+        while True:
+            item = await items.get()
+            if item is _DONE:
+                return
+            stats = self._stats_for(item.source)
+            
+            # Skip items whose content has not changed since the last run
+            item_hash = content_hash(item)
+            recorded = self.manifest.lookup(item)
+            if recorded is not None and recorded[0] == item_hash and not self.force:
+                stats.skipped += 1
+                continue
+            
+            try:
+                item_chunks = await asyncio.to_thread(chunk_text, item.content)
+            except Exception as e:
+                print(f"Error chunking {item}: {e}")
+                stats.failures += 1
+                continue
+            
+            if recorded is not None:
+                stale_ids = stale_point_ids(item, recorded[1], len(item_chunks))
+                stats.deleted += len(stale_ids)
+                self._stale_ids.extend(stale_ids)
+                if len(self._stale_ids) >= DELETE_BATCH_SIZE:
+                    await self._delete_stale()
+            
+            if not item_chunks:
+                self.manifest.record(item, item_hash, 0)
+                continue
+            
+            self._in_flight[id(item)] = _InFlightItem(item_hash, len(item_chunks))
+            stats.chunks += len(item_chunks)
+            for chunk_idx, chunk in enumerate(item_chunks):
+                await chunks.put((item, chunk_idx, len(item_chunks), chunk))
+    
+    async def _embed(self, chunks: asyncio.Queue, batches: asyncio.Queue) -> None:
+        """Embed chunks in request-sized batches and turn them into points."""
+        done = False
+        while not done:
+            # Block for the first chunk, then take whatever else is already queued
+            pending = []
+            entry = await chunks.get()
+            while entry is not _DONE:
+                pending.append(entry)
+                if len(pending) >= config.embedding_batch_size or chunks.empty():
+                    break
+                entry = chunks.get_nowait()
+            done = entry is _DONE
+            if not pending:
+                continue
+            
+            try:
+                embeddings = await asyncio.to_thread(
+                    get_embeddings, [chunk for _, _, _, chunk in pending]
+                )
+            except Exception as e:
+                print(f"Error embedding batch of {len(pending)} chunks: {e}")
+                for item, _, _, _ in pending:
+                    self._stats_for(item.source).failures += 1
+                    self._chunk_done(item, ok=False)
+                continue
+            
+            points = [
+                (item, build_point(item, chunk_idx, total_chunks, chunk, embedding))
+                for (item, chunk_idx, total_chunks, chunk), embedding in zip(pending, embeddings)
+            ]
+            await batches.put(points)
+    
+    async def _upsert(self, batches: asyncio.Queue) -> None:
+        """Hand batches of points to the bulk writer."""
+        loop = asyncio.get_running_loop()
+        while True:
+            points = await batches.get()
+            if points is _DONE:
+                return
+            
+            def written(ok: bool, points=points) -> None:
+                loop.call_soon_threadsafe(self._points_written, points, ok)
+            
+            # Blocks while the writer has its maximum number of requests in flight
+            await asyncio.to_thread(self.writer.add, [point for _, point in points], written)
+    
+    def _points_written(self, points: List[Tuple[DataItem, Any]], ok: bool) -> None:
+        """Update counters and the manifest once the writer has settled a batch."""
+        finished = time.perf_counter()
+        for item, _ in points:
+            stats = self._stats_for(item.source)
+            if ok:
+                stats.points += 1
+                stats.finished_at = finished
+            else:
+                stats.failures += 1
+            self._chunk_done(item, ok=ok)
+
+
+async def _supervise(tasks: List[asyncio.Task]) -> None:
+    """
+    Wait for the pipeline tasks, failing fast.
+    
+    A stage that dies leaves its upstream blocked on a full queue forever,
+    so the first task to raise cancels all the others and its exception
+    is re-raised.
+    
+    Args:
+        tasks: Feeder and stage worker tasks
+    """
+    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    failed = [task for task in done if not task.cancelled() and task.exception() is not None]
+    if failed:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise failed[0].exception()
+
+
+def run_pipeline(sources: Iterable[Tuple[BaseSource, Dict[str, Any]]],
+                 client: Optional[QdrantClient] = None,
+                 parallel: bool = False,
+                 force: bool = False) -> Dict[str, SourceStats]:
+    """
+    Run the ingestion pipeline to completion.
+    
+    Args:
+        sources: Pairs of (source, fetch keyword arguments)
+        client: Optional QdrantClient instance
+        parallel: Fetch all sources concurrently
+        force: Re-upload items even if the manifest says they are unchanged
+    
+    Returns:
+        Per-source statistics keyed by source name
+    """
+    return asyncio.run(IngestPipeline(client, force=force).run(sources, parallel=parallel))
+
+
+def format_summary(stats: Dict[str, SourceStats]) -> str:
+    """
+    Render per-source statistics as a plain-text table.
+    
+    Args:
+        stats: Per-source statistics as returned by run_pipeline
+    
+    Returns:
+        Table with one row per source
+    """
+    header = (f"{'Source':<10} {'Items':>8} {'Skipped':>8} {'Chunks':>8} {'Points':>8} "
+              f"{'Deleted':>8} {'Failures':>9} {'Time':>9}")
+    lines = [header, "-" * len(header)]
+    for source_stats in stats.values():
+        lines.append(
+            f"{source_stats.name:<10} {source_stats.items:>8} {source_stats.skipped:>8} "
+            f"{source_stats.chunks:>8} {source_stats.points:>8} {source_stats.deleted:>8} "
+            f"{source_stats.failures:>9} {source_stats.elapsed:>8.1f}s"
+        )
+    return "\n".join(lines)
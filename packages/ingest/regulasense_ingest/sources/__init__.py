@@ -1,15 +1,18 @@
 """
 RegulaSense data sources package.
 """
-from .base import BaseSource, DataItem
+from .base import BaseSource, DataItem, read_snapshot
 from .fred import FredSource
 from .bis import BisSource
 from .fsb import FsbSource
+from .snapshot import SnapshotSource
 
 __all__ = [
     'BaseSource',
     'DataItem',
     'FredSource',
     'BisSource',
-    'FsbSource'
+    'FsbSource',
+    'SnapshotSource',
+    'read_snapshot'
 ]
@@ -2,11 +2,111 @@
 Base classes for data sources in the RegulaSense ingestion system.
 """
 import os
+import io
+import gzip
 import json
+import hashlib
 import datetime
 from pathlib import Path
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Generator, Optional
+from typing import List, Dict, Any, Generator, Optional, IO
+from urllib.parse import urlparse
+
+from ..config import config
+
+# File suffix for each snapshot compression
+SNAPSHOT_SUFFIXES = {
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst",
+    "none": ".jsonl",
+}
+
+
+def open_snapshot(path: Path, mode: str = "r") -> IO[str]:
+    """
+    Open a JSONL snapshot file as text, picking the codec from its suffix.
+    
+    Args:
+        path: Snapshot file path (.jsonl, .jsonl.gz or .jsonl.zst)
+        mode: "r" to read or "w" to write
+        
+    Returns:
+        Text file object
+    """
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd snapshots require the 'zstandard' package (pip install zstandard)")
+        raw = open(path, mode + "b")
+        if mode == "w":
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def vector_snapshot_path(snapshot_file: Path) -> Path:
+    """
+    Directory holding the precomputed embeddings for a snapshot file.
+    
+    Args:
+        snapshot_file: JSONL snapshot file
+        
+    Returns:
+        Sibling directory named `<snapshot name>.vectors`
+    """
+    snapshot_file = Path(snapshot_file)
+    name = snapshot_file.name.split(".")[0]
+    return snapshot_file.with_name(f"{name}.vectors")
+
+
+def url_source_id(url: str) -> str:
+    """
+    Stable source ID for a scraped document, derived from its URL alone.
+    
+    The last path segment is used when there is one (e.g. `bcbs189.htm`),
+    otherwise a hash of the URL, so the ID never depends on where the
+    document appeared in a listing.
+    
+    Args:
+        url: Document URL
+        
+    Returns:
+        Source ID
+    """
+    segment = urlparse(url).path.rstrip("/").split("/")[-1]
+    return segment or hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def read_snapshot(path: Path) -> Generator['DataItem', None, None]:
+    """
+    Stream the items of a snapshot file.
+    
+    Reads JSONL snapshots (plain, gzip or zstd) one line at a time, and
+    also accepts the older single-array `.json` format.
+    
+    Args:
+        path: Snapshot file path
+        
+    Yields:
+        DataItem objects in the order they were written
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path) as f:
+            for data in json.load(f):
+                yield DataItem.from_dict(data)
+        return
+    
+    with open_snapshot(path) as f:
+        for line in f:
+            if line.strip():
+                yield DataItem.from_dict(json.loads(line))
 
 class DataItem:
     """Representation of a single data item for ingestion."""
@@ -31,15 +131,17 @@ class DataItem:
         self.metadata = metadata or {}
         self.timestamp = datetime.datetime.now().isoformat()
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, include_timestamp: bool = True) -> Dict[str, Any]:
         """Convert to a dictionary representation."""
-        return {
+        data = {
             "content": self.content,
             "source": self.source,
             "source_id": self.source_id,
-            "metadata": self.metadata,
-            "timestamp": self.timestamp
+            "metadata": self.metadata
         }
+        if include_timestamp:
+            data["timestamp"] = self.timestamp
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'DataItem':
@@ -82,31 +184,55 @@ class BaseSource(ABC):
         """
         pass
         
-    def snapshot(self, output_dir: Path, **kwargs) -> Path:
+    def snapshot(self, output_dir: Path, with_vectors: bool = False, **kwargs) -> Path:
         """
         Save a snapshot of the source data to disk.
         
+        Items are streamed to a JSONL file (compressed according to
+        `config.snapshot_compression`) as they are fetched, so memory use
+        does not grow with the crawl. With `with_vectors`, the items are
+        also chunked and embedded into a vector snapshot directory next to
+        the file (see `utils.vector_snapshot`).
+        
         Args:
             output_dir: Directory to write snapshot files
+            with_vectors: Also write precomputed embeddings
             **kwargs: Source-specific parameters
             
         Returns:
-            Path to the output directory with snapshot files
+            Path to the snapshot file
         """
         # Create source-specific directory
         source_dir = output_dir / self.name
         os.makedirs(source_dir, exist_ok=True)
         
-        # Save each item as a JSON file
+        compression = config.snapshot_compression
+        if compression not in SNAPSHOT_SUFFIXES:
+            raise ValueError(f"Unknown snapshot compression '{compression}'. "
+                             f"Choose from: {', '.join(SNAPSHOT_SUFFIXES)}")
+        
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = source_dir / f"{self.name}_{timestamp}.json"
+        output_file = source_dir / f"{self.name}_{timestamp}{SNAPSHOT_SUFFIXES[compression]}"
+        
+        vector_writer = None
+        if with_vectors:
+            # Imported here: the utils package depends on this module
+            from ..utils.vector_snapshot import VectorSnapshotWriter
+            vector_writer = VectorSnapshotWriter(vector_snapshot_path(output_file))
         
-        # Collect items
-        items = list(self.fetch(**kwargs))
+        # Write items one JSON line at a time as they are fetched
+        count = 0
+        with open_snapshot(output_file, "w") as f:
+            for item in self.fetch(**kwargs):
+                f.write(json.dumps(item.to_dict()))
+                f.write("\n")
+                if vector_writer is not None:
+                    vector_writer.add(item)
+                count += 1
         
-        # Write to file
-        with open(output_file, 'w') as f:
-            json.dump([item.to_dict() for item in items], f, indent=2)
+        if vector_writer is not None:
+            vector_dir = vector_writer.close()
+            print(f"Saved {vector_writer.count} embedded chunks to {vector_dir}")
         
-        print(f"Saved {len(items)} items from {self.name} to {output_file}")
-        return output_file 
\ No newline at end of file
+        print(f"Saved {count} items from {self.name} to {output_file}")
+        return output_file
@@ -2,12 +2,15 @@
 Bank for International Settlements (BIS) source for RegulaSense.
 """
 from typing import List, Dict, Any, Generator, Optional
-import requests
 from bs4 import BeautifulSoup
-import time
 
 from ..config import config
-from .base import BaseSource, DataItem
+from ..utils.dates import publication_date
+from ..utils.http import Crawler
+from .base import BaseSource, DataItem, url_source_id
+
+# Version of the cached `_parse_document` output; bump when it changes
+DOCUMENT_PARSE_VERSION = "3"
 
 class BisSource(BaseSource):
     """Source for Bank for International Settlements (BIS) documents."""
@@ -17,6 +20,7 @@ class BisSource(BaseSource):
         super().__init__("bis")
         self.base_url = "https://www.bis.org"
         self.publications_url = f"{self.base_url}/publications"
+        self.crawler = Crawler()
     
     def fetch(self, 
               categories: Optional[List[str]] = None, 
@@ -43,95 +47,138 @@ class BisSource(BaseSource):
                 category_url = f"{self.publications_url}/{category}"
                 print(f"Fetching BIS documents from {category_url}")
                 
-                # Get the publication list
-                response = requests.get(category_url)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Find document links - adjust selectors based on actual BIS site structure
-                document_links = soup.select(".publication-list .publication-item a")
-                if not document_links:
-                    # Try alternative selectors based on BIS site structure
-                    document_links = soup.select("a[href*='/publications/']")
+                # Get the publication list; unchanged lists are not re-parsed
+                page = self.crawler.get(category_url)
+                titles = self.crawler.parse(page, self._parse_listing)
                 
-                # Process each document
-                for link in document_links:
+                # Fetch document pages concurrently, within the per-host rate limit
+                for doc_url, doc_page, error in self.crawler.fetch_many(titles):
                     if item_count >= max_items:
                         break
                     
-                    # Get document URL
-                    href = link.get('href')
-                    if not href:
+                    if error is not None:
+                        print(f"Error processing BIS document {doc_url}: {error}")
                         continue
                     
-                    # Normalize URL
-                    if href.startswith('/'):
-                        doc_url = f"{self.base_url}{href}"
-                    elif href.startswith('http'):
-                        doc_url = href
-                    else:
-                        doc_url = f"{self.base_url}/{href}"
-                    
                     try:
-                        # Get document title
-                        title = link.get_text().strip()
-                        if not title:
-                            title = f"BIS Document {doc_url.split('/')[-1]}"
-                        
-                        # Get document content
-                        doc_response = requests.get(doc_url)
-                        doc_response.raise_for_status()
-                        doc_soup = BeautifulSoup(doc_response.text, 'html.parser')
-                        
-                        # Extract content - adjust selectors based on actual BIS site structure
-                        content_div = doc_soup.select_one(".content-wrapper")
-                        if not content_div:
-                            content_div = doc_soup.select_one("article") or doc_soup.select_one("main")
-                        
-                        # If we found content, process it
-                        if content_div:
-                            # Extract text
-                            paragraphs = content_div.find_all('p')
-                            content_text = "\n\n".join([p.get_text().strip() for p in paragraphs])
-                            
-                            # Create a complete document with title
-                            document_content = f"""
-                            {title}
-                            
-                            Source: Bank for International Settlements
-                            Category: {category}
-                            URL: {doc_url}
-                            
-                            {content_text}
-                            """
-                            
-                            # Create metadata
-                            metadata = {
-                                "title": title,
-                                "category": category,
-                                "url": doc_url
-                            }
-                            
-                            # Create a unique ID
-                            doc_id = doc_url.split('/')[-1]
-                            if not doc_id or doc_id == "":
-                                doc_id = f"bis_{category}_{item_count}"
-                            
-                            # Yield the data item
-                            yield DataItem(
-                                content=document_content.strip(),
-                                source="bis",
-                                source_id=doc_id,
-                                metadata=metadata
-                            )
-                            
+                        page_fields = self.crawler.parse(doc_page, self._parse_document, DOCUMENT_PARSE_VERSION)
+                        if page_fields is not None:
+                            yield self._make_item(doc_url, titles[doc_url], category, page_fields)
                             item_count += 1
-                            
-                            # Be nice to the server
-                            time.sleep(1)
-                        
+                    
                     except Exception as e:
                         print(f"Error processing BIS document {doc_url}: {e}")
                 
             except Exception as e:
-                print(f"Error fetching BIS category {category}: {e}") 
\ No newline at end of file
+                print(f"Error fetching BIS category {category}: {e}")
+
+    
+    def _parse_listing(self, html: str) -> Dict[str, str]:
+        """
+        Extract document links from a BIS publication list.
+        
+        Args:
+            html: Publication list HTML
+            
+        Returns:
+            Mapping of document URL to title, in page order
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Find document links - adjust selectors based on actual BIS site structure
+        document_links = soup.select(".publication-list .publication-item a")
+        if not document_links:
+            # Try alternative selectors based on BIS site structure
+            document_links = soup.select("a[href*='/publications/']")
+        
+        # Collect document URLs and titles
+        titles = {}
+        for link in document_links:
+            # Get document URL
+            href = link.get('href')
+            if not href:
+                continue
+            
+            # Normalize URL
+            if href.startswith('/'):
+                doc_url = f"{self.base_url}{href}"
+            elif href.startswith('http'):
+                doc_url = href
+            else:
+                doc_url = f"{self.base_url}/{href}"
+            
+            # Get document title
+            title = link.get_text().strip()
+            if not title:
+                title = f"BIS Document {doc_url.split('/')[-1]}"
+            titles.setdefault(doc_url, title)
+        
+        return titles
+    
+    def _parse_document(self, html: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract the fields of a BIS document page that depend only on its HTML.
+        
+        Args:
+            html: Page HTML
+            
+        Returns:
+            Dictionary with the page "text" and "published" date (None if
+            the page shows none), cached with the page, or None if the page
+            has no recognisable content
+        """
+        doc_soup = BeautifulSoup(html, 'html.parser')
+        
+        # Extract content - adjust selectors based on actual BIS site structure
+        content_div = doc_soup.select_one(".content-wrapper")
+        if not content_div:
+            content_div = doc_soup.select_one("article") or doc_soup.select_one("main")
+        
+        if not content_div:
+            return None
+        
+        # Extract text
+        paragraphs = content_div.find_all('p')
+        return {"text": "\n\n".join([p.get_text().strip() for p in paragraphs]),
+                "published": publication_date(doc_soup)}
+    
+    def _make_item(self, doc_url: str, title: str, category: str, page_fields: Dict[str, Any]) -> DataItem:
+        """
+        Build the DataItem for a parsed BIS document.
+        
+        Args:
+            doc_url: URL of the document page
+            title: Title taken from the publication list
+            category: BIS category the document was listed under
+            page_fields: Result of `_parse_document`
+            
+        Returns:
+            DataItem with an ID derived from the URL
+        """
+        content_text = page_fields["text"]
+        
+        # Create a complete document with title
+        document_content = f"""
+        {title}
+        
+        Source: Bank for International Settlements
+        Category: {category}
+        URL: {doc_url}
+        
+        {content_text}
+        """
+        
+        # Create metadata
+        metadata = {
+            "title": title,
+            "category": category,
+            "url": doc_url,
+            "published_at": page_fields.get("published")
+        }
+        
+        return DataItem(
+            content=document_content.strip(),
+            source="bis",
+            source_id=url_source_id(doc_url),
+            metadata=metadata
+        )
@@ -1,12 +1,19 @@
 """
 Federal Reserve Economic Data (FRED) source for RegulaSense.
 """
-from typing import List, Dict, Any, Generator, Optional
+from typing import List, Dict, Any, Generator, Optional, Tuple
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from fredapi import Fred
 
 from ..config import config
+from ..utils.dates import parse_date
+from ..utils.http import TokenBucket
+from ..utils.fred_state import get_fred_state
+from ..utils.timeseries import get_timeseries_store, summarize
 from .base import BaseSource, DataItem
 
 class FredSource(BaseSource):
@@ -18,99 +25,205 @@ class FredSource(BaseSource):
         if not config.fred_api_key:
             raise ValueError("FRED_API_KEY not set in environment variables")
         self.fred = Fred(api_key=config.fred_api_key)
+        self.state = get_fred_state()
+        self.store = get_timeseries_store()
+        # FRED allows 120 requests per minute per key
+        self._bucket = TokenBucket(config.fred_rate, config.fred_max_workers)
+        self._lock = threading.Lock()
+        self.up_to_date = 0
+        self.synced = 0
+        self.observations_downloaded = 0
     
     def fetch(self, 
               series_ids: Optional[List[str]] = None, 
               start_date: Optional[str] = None,
               end_date: Optional[str] = None,
+              max_items: Optional[int] = None,
               **kwargs) -> Generator[DataItem, None, None]:
         """
         Fetch data from FRED.
         
+        Series are synced concurrently by up to `config.fred_max_workers`
+        threads. Observations are kept in the time-series store, so each run
+        only downloads observations newer than the latest stored date (minus
+        `config.fred_revision_days` for revisions), and none at all when
+        the series' `last_updated` stamp has not changed. Items carry a short
+        description and summary statistics rather than the raw observations.
+        
         Args:
             series_ids: List of FRED series IDs to fetch (e.g., 'GDP', 'UNRATE')
-            start_date: Start date in YYYY-MM-DD format (default: 5 years ago)
+            start_date: Start date in YYYY-MM-DD format (default: config.fred_history_years ago)
             end_date: End date in YYYY-MM-DD format (default: today)
-            **kwargs: Additional parameters to pass to FRED.get_series
-            
+            max_items: Maximum number of series to fetch
+            **kwargs: Additional parameters to pass to FRED.get_series. These
+                change the returned values (e.g. `units`), so such requests
+                bypass the sync state and download the full range.
+        
         Yields:
-            DataItem for each series with its description and data
+            DataItem for each series with its description and summary
         """
         # Use default series if none provided
-        series_ids = series_ids or config.fred_series
+        series_ids = list(series_ids or config.fred_series)
+        if max_items is not None:
+            series_ids = series_ids[:max_items]
         
         # Set default date range if not provided
         if not start_date:
-            start_date = (datetime.datetime.now() - datetime.timedelta(days=5*365)).strftime('%Y-%m-%d')
+            start_date = (datetime.datetime.now() - datetime.timedelta(days=config.fred_history_years*365)).strftime('%Y-%m-%d')
         if not end_date:
             end_date = datetime.datetime.now().strftime('%Y-%m-%d')
         
-        # Fetch each series
-        for series_id in series_ids:
+        def sync(series_id: str) -> Optional[DataItem]:
             try:
-                # Get series info
-                series_info = self.fred.get_series_info(series_id)
-                title = series_info.get('title', f'Series {series_id}')
-                notes = series_info.get('notes', '')
-                units = series_info.get('units', '')
-                frequency = series_info.get('frequency', '')
-                
-                # Get series data
-                data = self.fred.get_series(
-                    series_id,
-                    observation_start=start_date,
-                    observation_end=end_date,
-                    **kwargs
-                )
-                
-                # Skip empty series
-                if data is None or len(data) == 0:
-                    print(f"No data found for FRED series {series_id}")
-                    continue
-                
-                # Convert to string representation
-                if isinstance(data, pd.Series):
-                    # Format the time series data
-                    data_str = "\n".join([
-                        f"{date.strftime('%Y-%m-%d')}: {value}" 
-                        for date, value in data.items()
-                    ])
-                else:
-                    data_str = str(data)
-                
-                # Create a descriptive text document
-                content = f"""
-                {title}
-                Series ID: {series_id}
-                
-                Description:
-                {notes}
-                
-                Units: {units}
-                Frequency: {frequency}
-                
-                Data:
-                {data_str}
-                """
-                
-                # Create metadata
-                metadata = {
-                    "title": title,
-                    "series_id": series_id,
-                    "units": units,
-                    "frequency": frequency,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "observation_count": len(data) if hasattr(data, "__len__") else 0
-                }
-                
-                # Yield the data item
-                yield DataItem(
-                    content=content.strip(),
-                    source="fred",
-                    source_id=series_id,
-                    metadata=metadata
-                )
-                
+                return self._sync_series(series_id, start_date, end_date, kwargs)
             except Exception as e:
-                print(f"Error fetching FRED series {series_id}: {e}") 
\ No newline at end of file
+                print(f"Error fetching FRED series {series_id}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=config.fred_max_workers) as executor:
+            # Keep a bounded window of series in flight so callers can stop early
+            pending = []
+            for series_id in series_ids:
+                pending.append(executor.submit(sync, series_id))
+                if len(pending) >= config.fred_max_workers:
+                    item = pending.pop(0).result()
+                    if item is not None:
+                        yield item
+            for future in pending:
+                item = future.result()
+                if item is not None:
+                    yield item
+        
+        print(f"FRED: {self.up_to_date} series up to date, {self.synced} synced, "
+              f"{self.observations_downloaded} observations downloaded")
+    
+    def _sync_series(self, 
+                     series_id: str, 
+                     start_date: str, 
+                     end_date: str, 
+                     kwargs: Dict[str, Any]) -> Optional[DataItem]:
+        """
+        Bring one series up to date and build its DataItem.
+        
+        Args:
+            series_id: FRED series ID
+            start_date: First observation date included in the item
+            end_date: Last observation date included in the item
+            kwargs: Additional parameters for FRED.get_series
+        
+        Returns:
+            DataItem for the series, or None if it has no data
+        """
+        # Get series info
+        self._bucket.acquire()
+        series_info = dict(self.fred.get_series_info(series_id))
+        
+        if kwargs:
+            # Transformed values cannot be merged with the stored observations
+            self._bucket.acquire()
+            data = self.fred.get_series(series_id, observation_start=start_date, observation_end=end_date, **kwargs)
+            dates, values = _to_arrays(data)
+            with self._lock:
+                self.synced += 1
+                self.observations_downloaded += len(dates)
+            stats = summarize(dates, values)
+        else:
+            stored = self.state.series(series_id)
+            watermark = self.store.latest_date(series_id)
+            if stored is not None and watermark is not None and stored[0] == series_info.get('last_updated'):
+                # Nothing published or revised since the last sync
+                with self._lock:
+                    self.up_to_date += 1
+            else:
+                observation_start = start_date
+                if watermark is not None:
+                    observation_start = str(watermark - np.timedelta64(config.fred_revision_days, 'D'))
+                
+                # Get new and revised observations
+                self._bucket.acquire()
+                data = self.fred.get_series(series_id, observation_start=observation_start)
+                dates, values = _to_arrays(data)
+                if len(dates):
+                    self.store.merge(series_id, dates, values)
+                self.state.update(series_id, series_info)
+                with self._lock:
+                    self.synced += 1
+                    self.observations_downloaded += len(dates)
+            
+            stats = self.store.summary(series_id, start_date, end_date)
+        
+        # Skip empty series
+        if not stats["count"]:
+            print(f"No data found for FRED series {series_id}")
+            return None
+        
+        return _build_item(series_id, series_info, stats)
+
+
+def _to_arrays(data: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert a FRED series to (datetime64[D] dates, float64 values) arrays."""
+    if data is None or not isinstance(data, pd.Series):
+        return np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=np.float64)
+    return (data.index.values.astype("datetime64[D]"), 
+            data.to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def _build_item(series_id: str, 
+                series_info: Dict[str, Any], 
+                stats: Dict[str, Any]) -> DataItem:
+    """
+    Describe a series and summarise its observations as a DataItem.
+    
+    Only the summary is embedded; the observations stay in the time-series
+    store, where range and aggregate queries can read them directly. The
+    metadata is derived from the data alone: the requested window defaults
+    to one ending today, and putting it in the item would change the
+    item's content hash, and re-ingest it, every day.
+    """
+    title = series_info.get('title', f'Series {series_id}')
+    notes = series_info.get('notes', '')
+    units = series_info.get('units', '')
+    frequency = series_info.get('frequency', '')
+    
+    # Create a descriptive text document
+    content = "\n".join([
+        title,
+        f"Series ID: {series_id}",
+        "",
+        "Description:",
+        notes,
+        "",
+        f"Units: {units}",
+        f"Frequency: {frequency}",
+        "",
+        f"Summary ({stats['start']} to {stats['end']}, {stats['count']} observations):",
+        f"Latest: {stats['last']:g} on {stats['end']}",
+        f"Change over period: {stats['change']:+g} (from {stats['first']:g})",
+        f"Range: {stats['min']:g} to {stats['max']:g}, mean {stats['mean']:g}",
+    ])
+    
+    # Create metadata
+    metadata = {
+        "title": title,
+        "series_id": series_id,
+        "units": units,
+        "frequency": frequency,
+        "start_date": stats["start"],
+        "end_date": stats["end"],
+        "last_updated": series_info.get('last_updated'),
+        # The latest revision's release date stands in for a publication date
+        "published_at": parse_date(str(series_info.get('last_updated') or "")),
+        "observation_count": stats["count"],
+        "latest_date": stats["end"],
+        "latest_value": stats["last"],
+        "min_value": stats["min"],
+        "max_value": stats["max"],
+        "mean_value": stats["mean"]
+    }
+    
+    return DataItem(
+        content=content.strip(),
+        source="fred",
+        source_id=series_id,
+        metadata=metadata
+    )
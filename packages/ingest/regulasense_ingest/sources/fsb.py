@@ -2,12 +2,16 @@
 Financial Stability Board (FSB) source for RegulaSense.
 """
 from typing import List, Dict, Any, Generator, Optional
-import requests
 from bs4 import BeautifulSoup
-import time
 
 from ..config import config
-from .base import BaseSource, DataItem
+from ..utils.dates import publication_date
+from ..utils.http import Crawler
+from .base import BaseSource, DataItem, url_source_id
+
+# Versions of the cached parser outputs; bump when they change
+LISTING_PARSE_VERSION = "2"
+DOCUMENT_PARSE_VERSION = "3"
 
 class FsbSource(BaseSource):
     """Source for Financial Stability Board (FSB) documents."""
@@ -17,6 +21,7 @@ class FsbSource(BaseSource):
         super().__init__("fsb")
         self.base_url = "https://www.fsb.org"
         self.publications_url = f"{self.base_url}/publications"
+        self.crawler = Crawler()
     
     def fetch(self, 
               document_types: Optional[List[str]] = None, 
@@ -39,113 +44,155 @@ class FsbSource(BaseSource):
         # Get main publications page
         try:
             print(f"Fetching FSB publications from {self.publications_url}")
-            response = requests.get(self.publications_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Get all publication URLs - adjust selectors based on actual FSB site structure
-            all_links = soup.find_all('a')
-            publication_links = []
-            
-            # Filter links to get relevant publications
-            for link in all_links:
-                href = link.get('href', '')
-                text = link.get_text().strip().lower()
-                
-                # Check if the link is likely a publication
-                is_publication = False
-                for doc_type in document_types:
-                    if doc_type.lower() in text or doc_type.lower() in href.lower():
-                        is_publication = True
-                        break
-                
-                if is_publication and href and '/publications/' in href:
-                    # Normalize URL
-                    if href.startswith('/'):
-                        full_url = f"{self.base_url}{href}"
-                    elif href.startswith('http'):
-                        full_url = href
-                    else:
-                        full_url = f"{self.base_url}/{href}"
-                    
-                    publication_links.append((full_url, text))
+            page = self.crawler.get(self.publications_url)
+            publication_links = self.crawler.parse(page, self._parse_listing, LISTING_PARSE_VERSION)
             
             # Keep track of documents processed
             processed_count = 0
-            processed_urls = set()
             
-            # Process each publication
+            # Keep the requested document types, dropping duplicate URLs (first title wins)
+            titles = {}
             for pub_url, pub_title in publication_links:
-                if processed_count >= max_items or pub_url in processed_urls:
+                if self._matches(pub_url, pub_title, document_types):
+                    titles.setdefault(pub_url, pub_title)
+            
+            # Fetch publication pages concurrently, within the per-host rate limit
+            for pub_url, pub_page, error in self.crawler.fetch_many(titles):
+                if processed_count >= max_items:
+                    break
+                
+                if error is not None:
+                    print(f"Error processing FSB document {pub_url}: {error}")
                     continue
                 
                 try:
-                    # Add to processed set to avoid duplicates
-                    processed_urls.add(pub_url)
-                    
-                    # Get publication page
-                    pub_response = requests.get(pub_url)
-                    pub_response.raise_for_status()
-                    pub_soup = BeautifulSoup(pub_response.text, 'html.parser')
-                    
-                    # Extract title
-                    title_elem = pub_soup.find('h1') or pub_soup.find('h2')
-                    title = title_elem.get_text().strip() if title_elem else pub_title
-                    
-                    # Extract content - adjust selectors based on actual FSB site structure
-                    content_div = pub_soup.select_one(".publication-content") or pub_soup.select_one("article") 
-                    if not content_div:
-                        content_div = pub_soup.select_one("main") or pub_soup
-                    
-                    # Extract text content from paragraphs
-                    paragraphs = content_div.find_all('p')
-                    content_text = "\n\n".join([p.get_text().strip() for p in paragraphs])
-                    
-                    # Try to determine document type
-                    doc_type = "Unknown"
-                    for dt in document_types:
-                        if dt.lower() in pub_url.lower() or dt.lower() in title.lower():
-                            doc_type = dt
-                            break
-                    
-                    # Create a complete document
-                    document_content = f"""
-                    {title}
-                    
-                    Source: Financial Stability Board
-                    Type: {doc_type}
-                    URL: {pub_url}
-                    
-                    {content_text}
-                    """
-                    
-                    # Create metadata
-                    metadata = {
-                        "title": title,
-                        "type": doc_type,
-                        "url": pub_url
-                    }
-                    
-                    # Create a unique ID
-                    doc_id = pub_url.split('/')[-1]
-                    if not doc_id or doc_id == "":
-                        doc_id = f"fsb_{doc_type}_{processed_count}"
-                    
-                    # Yield the data item
-                    yield DataItem(
-                        content=document_content.strip(),
-                        source="fsb",
-                        source_id=doc_id,
-                        metadata=metadata
-                    )
-                    
+                    page_fields = self.crawler.parse(pub_page, self._parse_document, DOCUMENT_PARSE_VERSION)
+                    yield self._make_item(pub_url, titles[pub_url], document_types, page_fields)
                     processed_count += 1
-                    
-                    # Be nice to the server
-                    time.sleep(1)
                 
                 except Exception as e:
                     print(f"Error processing FSB document {pub_url}: {e}")
         
         except Exception as e:
-            print(f"Error fetching FSB publications: {e}") 
\ No newline at end of file
+            print(f"Error fetching FSB publications: {e}")
+
+    
+    def _matches(self, url: str, text: str, document_types: List[str]) -> bool:
+        """Whether a publication link belongs to one of the document types."""
+        return any(doc_type.lower() in text or doc_type.lower() in url.lower() for doc_type in document_types)
+    
+    def _parse_listing(self, html: str) -> List[List[str]]:
+        """
+        Extract publication links from the FSB publications page.
+        
+        Args:
+            html: Publications page HTML
+            
+        Returns:
+            List of [url, lower-cased link text] pairs, in page order; callers
+            select document types with `_matches`
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Get all publication URLs - adjust selectors based on actual FSB site structure
+        all_links = soup.find_all('a')
+        publication_links = []
+        
+        for link in all_links:
+            href = link.get('href', '')
+            text = link.get_text().strip().lower()
+            
+            if href and '/publications/' in href:
+                # Normalize URL
+                if href.startswith('/'):
+                    full_url = f"{self.base_url}{href}"
+                elif href.startswith('http'):
+                    full_url = href
+                else:
+                    full_url = f"{self.base_url}/{href}"
+                
+                publication_links.append([full_url, text])
+        
+        return publication_links
+    
+    def _parse_document(self, html: str) -> Dict[str, Any]:
+        """
+        Extract the fields of an FSB publication page that depend only on its HTML.
+        
+        Args:
+            html: Page HTML
+            
+        Returns:
+            Dictionary with the page "title" (None without a heading),
+            "text" and "published" date (None if the page shows none),
+            cached with the page
+        """
+        pub_soup = BeautifulSoup(html, 'html.parser')
+        
+        # Extract title
+        title_elem = pub_soup.find('h1') or pub_soup.find('h2')
+        title = title_elem.get_text().strip() if title_elem else None
+        
+        # Extract content - adjust selectors based on actual FSB site structure
+        content_div = pub_soup.select_one(".publication-content") or pub_soup.select_one("article") 
+        if not content_div:
+            content_div = pub_soup.select_one("main") or pub_soup
+        
+        # Extract text content from paragraphs
+        paragraphs = content_div.find_all('p')
+        return {"title": title,
+                "text": "\n\n".join([p.get_text().strip() for p in paragraphs]),
+                "published": publication_date(pub_soup)}
+    
+    def _make_item(self,
+                   pub_url: str,
+                   pub_title: str,
+                   document_types: List[str],
+                   page_fields: Dict[str, Any]) -> DataItem:
+        """
+        Build the DataItem for a parsed FSB publication.
+        
+        Args:
+            pub_url: URL of the publication page
+            pub_title: Link text from the publications list
+            document_types: Document types used to classify the publication
+            page_fields: Result of `_parse_document`
+            
+        Returns:
+            DataItem with an ID derived from the URL
+        """
+        title = page_fields["title"] or pub_title
+        content_text = page_fields["text"]
+        
+        # Try to determine document type
+        doc_type = "Unknown"
+        for dt in document_types:
+            if dt.lower() in pub_url.lower() or dt.lower() in title.lower():
+                doc_type = dt
+                break
+        
+        # Create a complete document
+        document_content = f"""
+        {title}
+        
+        Source: Financial Stability Board
+        Type: {doc_type}
+        URL: {pub_url}
+        
+        {content_text}
+        """
+        
+        # Create metadata
+        metadata = {
+            "title": title,
+            "type": doc_type,
+            "url": pub_url,
+            "published_at": page_fields.get("published")
+        }
+        
+        return DataItem(
+            content=document_content.strip(),
+            source="fsb",
+            source_id=url_source_id(pub_url),
+            metadata=metadata
+        )
@@ -0,0 +1,76 @@
+"""
+Snapshot replay source for RegulaSense.
+"""
+from pathlib import Path
+from typing import List, Dict, Any, Generator, Optional
+
+from .base import BaseSource, DataItem, SNAPSHOT_SUFFIXES, read_snapshot, vector_snapshot_path
+
+# Snapshot formats, newest first; `.json` is the legacy single-array format
+SNAPSHOT_PATTERNS = [f"*{suffix}" for suffix in SNAPSHOT_SUFFIXES.values()] + ["*.json"]
+
+class SnapshotSource(BaseSource):
+    """Source that replays a snapshot written by `BaseSource.snapshot`."""
+    
+    def __init__(self, name: str, path: Path):
+        """
+        Initialize the snapshot source.
+        
+        Args:
+            name: Name of the source the snapshot was taken from (e.g., 'fred')
+            path: Snapshot file to replay
+        """
+        super().__init__(name)
+        self.path = Path(path)
+    
+    @property
+    def vectors_path(self) -> Optional[Path]:
+        """Vector snapshot taken alongside this snapshot, if there is one."""
+        path = vector_snapshot_path(self.path)
+        return path if (path / "snapshot.json").exists() else None
+    
+    @classmethod
+    def discover(cls, 
+                 snapshot_dir: Path, 
+                 sources: Optional[List[str]] = None) -> List['SnapshotSource']:
+        """
+        Find the latest snapshot of each source under a snapshot directory.
+        
+        Args:
+            snapshot_dir: Directory passed to `ingest --snapshot`
+            sources: Only include these source names (default: all found)
+            
+        Returns:
+            One SnapshotSource per source directory containing a snapshot
+        """
+        found = []
+        for source_dir in sorted(Path(snapshot_dir).iterdir()):
+            if not source_dir.is_dir() or (sources and source_dir.name not in sources):
+                continue
+            
+            files = [path for pattern in SNAPSHOT_PATTERNS for path in source_dir.glob(pattern)]
+            if not files:
+                continue
+            
+            # File names embed a sortable timestamp; take the newest
+            latest = max(files, key=lambda path: path.name)
+            found.append(cls(source_dir.name, latest))
+        
+        return found
+    
+    def fetch(self, max_items: Optional[int] = None, **kwargs) -> Generator[DataItem, None, None]:
+        """
+        Stream items from the snapshot file.
+        
+        Args:
+            max_items: Maximum number of items to yield (default: all)
+            **kwargs: Additional parameters (unused)
+            
+        Yields:
+            DataItem for each snapshot entry
+        """
+        print(f"Reading {self.name} snapshot from {self.path}")
+        for count, item in enumerate(read_snapshot(self.path)):
+            if max_items is not None and count >= max_items:
+                break
+            yield item
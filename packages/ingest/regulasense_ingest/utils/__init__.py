@@ -1,12 +1,25 @@
 """
 RegulaSense utilities package.
 """
-from .embeddings import get_embedding, chunk_text
+from .embeddings import get_embedding, get_embeddings, chunk_text, iter_chunks, count_tokens
+from .cache import EmbeddingCache, get_cache
 from .qdrant import ensure_collection_exists, upload_items
+from .manifest import IngestManifest, get_manifest, point_id
+from .timeseries import TimeSeriesStore, get_timeseries_store
 
 __all__ = [
     'get_embedding',
+    'get_embeddings',
     'chunk_text',
+    'iter_chunks',
+    'count_tokens',
+    'EmbeddingCache',
+    'get_cache',
     'ensure_collection_exists',
-    'upload_items'
+    'upload_items',
+    'IngestManifest',
+    'get_manifest',
+    'point_id',
+    'TimeSeriesStore',
+    'get_timeseries_store'
 ]
@@ -0,0 +1,202 @@
+"""
+Pipelined bulk writes to Qdrant.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Optional, Iterable, Callable, Tuple
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from ..config import config
+
+
+class _Callback:
+    """Completion tracking for the points of one `add` call."""
+    
+    def __init__(self, callback: Callable[[bool], None], remaining: int):
+        self.callback = callback
+        self.remaining = remaining
+        self.ok = True
+
+
+class BulkWriter:
+    """
+    Upsert points in fixed-size batches with several requests in flight.
+    
+    Points are buffered until a batch is full and then sent from a thread
+    pool, so building the next batch overlaps with the previous requests.
+    At most `parallel` batches are in flight; `add` blocks beyond that,
+    which bounds memory. With `wait=False`, Qdrant acknowledges a batch as
+    soon as it is written to its log; `close` then sends the last batch
+    with `wait=True` once every earlier batch is acknowledged, so all
+    writes are applied when it returns.
+    
+    That barrier only holds on a single shard: a `wait=True` upsert waits
+    for the shards its own points land on, not for the others. On a
+    collection with more than one shard every batch is therefore sent with
+    `wait=True`; the requests in flight still overlap.
+    """
+    
+    def __init__(self,
+                 client: QdrantClient,
+                 collection_name: Optional[str] = None,
+                 batch_size: Optional[int] = None,
+                 parallel: Optional[int] = None,
+                 wait: Optional[bool] = None):
+        """
+        Initialize the writer.
+        
+        Args:
+            client: QdrantClient instance
+            collection_name: Target collection (default: config.collection_name)
+            batch_size: Points per upsert request (default: config.upsert_batch_size)
+            parallel: Upsert requests in flight (default: config.upsert_parallel)
+            wait: Wait for each batch to be applied (default: config.upsert_wait;
+                forced on for collections with more than one shard)
+        """
+        self.client = client
+        self.collection_name = collection_name or config.collection_name
+        self.batch_size = batch_size or config.upsert_batch_size
+        self.parallel = parallel or config.upsert_parallel
+        self.wait = config.upsert_wait if wait is None else wait
+        if not self.wait and self._shard_number() > 1:
+            self.wait = True
+        
+        self.points = 0
+        self.batches = 0
+        self.failed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.parallel)
+        self._slots = threading.Semaphore(self.parallel)
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self._buffer: List[Tuple[models.PointStruct, Optional[_Callback]]] = []
+        self._last_batch: List[models.PointStruct] = []
+    
+    def _shard_number(self) -> int:
+        """Shards of the target collection (the configured profile's if it cannot be read)."""
+        try:
+            info = self.client.get_collection(self.collection_name)
+            return info.config.params.shard_number or 1
+        except Exception:
+            return config.collection.shard_number
+    
+    def add(self,
+            points: Iterable[models.PointStruct],
+            callback: Optional[Callable[[bool], None]] = None) -> None:
+        """
+        Queue points for upsert.
+        
+        Args:
+            points: Points to write
+            callback: Called once with True when every point of this call has
+                been acknowledged, or False if any of their batches failed.
+                Runs on a writer thread.
+        """
+        points = list(points)
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        if not points:
+            if callback is not None:
+                callback(True)
+            return
+        
+        tracker = _Callback(callback, len(points)) if callback is not None else None
+        for point in points:
+            self._buffer.append((point, tracker))
+            if len(self._buffer) >= self.batch_size:
+                self._submit(self._buffer, self.wait)
+                self._buffer = []
+    
+    def _submit(self, batch: List[Tuple[models.PointStruct, Optional[_Callback]]], wait: bool) -> None:
+        """Send a batch from the pool once a slot is free."""
+        self._slots.acquire()
+        future = self._executor.submit(self._send, batch, wait)
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()]
+            self._futures.append(future)
+    
+    def _send(self, batch: List[Tuple[models.PointStruct, Optional[_Callback]]], wait: bool) -> None:
+        """Upsert one batch and settle the callbacks of its points."""
+        points = [point for point, _ in batch]
+        try:
+            self.client.upsert(collection_name=self.collection_name, points=points, wait=wait)
+            ok = True
+        except Exception as e:
+            print(f"Error upserting batch of {len(points)} points: {e}")
+            ok = False
+        finally:
+            self._slots.release()
+        
+        counts: Dict[int, List[Any]] = {}
+        with self._lock:
+            self.batches += 1
+            if ok:
+                self.points += len(points)
+                self._last_batch = points
+            else:
+                self.failed += len(points)
+            for _, tracker in batch:
+                if tracker is not None:
+                    entry = counts.setdefault(id(tracker), [tracker, 0])
+                    entry[1] += 1
+            
+            finished = []
+            for tracker, count in counts.values():
+                tracker.remaining -= count
+                tracker.ok = tracker.ok and ok
+                if tracker.remaining == 0:
+                    finished.append(tracker)
+        
+        for tracker in finished:
+            tracker.callback(tracker.ok)
+    
+    def flush(self) -> None:
+        """Send buffered points and wait for every batch in flight."""
+        if self._buffer:
+            self._submit(self._buffer, self.wait)
+            self._buffer = []
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+    
+    def close(self) -> None:
+        """Write everything, apply a consistency barrier and stop the pool."""
+        # Hold the remainder back as the barrier batch
+        remainder, self._buffer = self._buffer, []
+        self.flush()
+        if remainder:
+            self._submit(remainder, True)
+            self.flush()
+        elif not self.wait and self._last_batch:
+            # Re-upserting is idempotent; waiting for it waits for everything queued before it
+            self.client.upsert(collection_name=self.collection_name, points=self._last_batch, wait=True)
+        self._executor.shutdown()
+        self.finished_at = time.perf_counter()
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds from the first `add` to `close` (or now)."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+    
+    @property
+    def points_per_second(self) -> float:
+        """Write throughput over `elapsed`."""
+        return self.points / self.elapsed if self.elapsed else 0.0
+    
+    def __str__(self) -> str:
+        return (f"Upserted {self.points} points in {self.batches} batches, "
+                f"{self.elapsed:.1f}s ({self.points_per_second:.0f} points/s)"
+                + (f", {self.failed} failed" if self.failed else ""))
+    
+    def __enter__(self) -> "BulkWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
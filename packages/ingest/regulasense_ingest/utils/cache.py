@@ -0,0 +1,275 @@
+"""
+Persistent, content-addressed cache for text embeddings.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence
+
+from ..config import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings (accessed_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    """Return the SHA-256 hex digest used as the cache key for a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed embedding cache keyed by (embedding model, sha256 of text).
+    
+    Vectors are stored as float32 blobs in SQLite. Entries are evicted when
+    they are older than `max_age_days` or, least recently used first, when
+    the cache grows beyond `max_bytes`.
+    """
+    
+    def __init__(self, 
+                 path: Path, 
+                 max_bytes: Optional[int] = None, 
+                 max_age_days: Optional[float] = None):
+        """
+        Open (or create) an embedding cache.
+        
+        Args:
+            path: Path to the SQLite database file
+            max_bytes: Maximum total size of stored vectors
+            max_age_days: Maximum age of an entry before it is evicted
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+    
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings.
+        
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+            
+        Returns:
+            List aligned with texts holding the cached embedding or None
+        """
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), _QUERY_BATCH):
+                batch = unique[start:start + _QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+                
+                # Touch hits so size-based eviction drops the least recently used
+                self._conn.execute(
+                    f"UPDATE embeddings SET accessed_at = ? "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [now, model, *batch]
+                )
+            
+            results = [found.get(key) for key in hashes]
+            hits = sum(1 for result in results if result is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+            self._increment(hits=hits, misses=len(results) - hits)
+            self._conn.commit()
+        
+        return results
+    
+    def put_many(self, model: str, texts: Sequence[str], embeddings: Sequence[List[float]]) -> None:
+        """
+        Store embeddings in the cache.
+        
+        Args:
+            model: Embedding model name
+            texts: Texts that were embedded
+            embeddings: Embeddings aligned with texts
+        """
+        now = time.time()
+        rows = [
+            (model, text_hash(text), array("f", embedding).tobytes(), now, now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, text_hash, vector, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+    
+    def prune(self, 
+              max_bytes: Optional[int] = None, 
+              max_age_days: Optional[float] = None) -> int:
+        """
+        Evict entries by age and then by size.
+        
+        Args:
+            max_bytes: Size budget (default: the cache's max_bytes)
+            max_age_days: Age limit (default: the cache's max_age_days)
+            
+        Returns:
+            Number of entries removed
+        """
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        max_age_days = max_age_days if max_age_days is not None else self.max_age_days
+        removed = 0
+        
+        with self._lock:
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                removed += self._conn.execute(
+                    "DELETE FROM embeddings WHERE created_at < ?", (cutoff,)
+                ).rowcount
+            
+            if max_bytes is not None:
+                total = self._conn.execute(
+                    "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+                ).fetchone()[0]
+                if total > max_bytes:
+                    # Walk entries from least recently used until under budget
+                    excess = total - max_bytes
+                    victims = []
+                    for model, key, size in self._conn.execute(
+                        "SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY accessed_at"
+                    ):
+                        if excess <= 0:
+                            break
+                        victims.append((model, key))
+                        excess -= size
+                    self._conn.executemany(
+                        "DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims
+                    )
+                    removed += len(victims)
+            
+            self._conn.commit()
+        
+        if removed:
+            with self._lock:
+                self._conn.execute("VACUUM")
+        return removed
+    
+    def clear(self) -> int:
+        """
+        Remove every entry and reset the counters.
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM embeddings").rowcount
+            self._conn.execute("DELETE FROM counters")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+        self.hits = self.misses = 0
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarise the cache contents and hit/miss counters.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            entries, size, oldest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0), MIN(created_at) FROM embeddings"
+            ).fetchone()
+            models = dict(self._conn.execute(
+                "SELECT model, COUNT(*) FROM embeddings GROUP BY model"
+            ).fetchall())
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        
+        total_hits = counters.get("hits", 0)
+        total_lookups = total_hits + counters.get("misses", 0)
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "size_bytes": size,
+            "oldest_entry": oldest,
+            "models": models,
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+            "total_hits": total_hits,
+            "total_misses": counters.get("misses", 0),
+            "hit_rate": total_hits / total_lookups if total_lookups else 0.0,
+        }
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def _increment(self, **deltas: int) -> None:
+        """Add to the persistent counters (caller holds the lock)."""
+        self._conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(deltas.items())
+        )
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[EmbeddingCache]:
+    """
+    Get the shared embedding cache for the current configuration.
+    
+    The cache is pruned once when it is first opened in a process.
+    
+    Returns:
+        EmbeddingCache instance, or None if caching is disabled
+    """
+    global _cache
+    if not config.embedding_cache_enabled:
+        return None
+    
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(
+                config.state_dir / "embeddings.sqlite",
+                max_bytes=config.embedding_cache_max_mb * 1024 * 1024,
+                max_age_days=config.embedding_cache_max_age_days
+            )
+            _cache.prune()
+    return _cache
@@ -0,0 +1,107 @@
+"""
+Publication dates of scraped documents and series, normalised for Qdrant.
+"""
+import datetime
+import re
+from typing import Optional
+from bs4 import BeautifulSoup
+
+# Meta tags publishers use for the publication date, most specific first
+_META_NAMES = (
+    "citation_publication_date",
+    "dc.date",
+    "dc.date.issued",
+    "dcterms.issued",
+    "article:published_time",
+    "date",
+    "publication_date",
+)
+
+_MONTHS = {name: number for number, name in enumerate(
+    ["january", "february", "march", "april", "may", "june", "july",
+     "august", "september", "october", "november", "december"], start=1)}
+_MONTH = "|".join(_MONTHS)
+
+_ISO = re.compile(r"\b((?:19|20)\d{2})[-/](\d{1,2})[-/](\d{1,2})\b")
+_DAY_MONTH_YEAR = re.compile(rf"\b(\d{{1,2}})\s+({_MONTH})\s+((?:19|20)\d{{2}})\b", re.IGNORECASE)
+_MONTH_DAY_YEAR = re.compile(rf"\b({_MONTH})\s+(\d{{1,2}}),?\s+((?:19|20)\d{{2}})\b", re.IGNORECASE)
+
+# Characters of page text searched for a date when no tag carries one
+_TEXT_WINDOW = 2000
+
+
+def _iso(year: int, month: int, day: int) -> Optional[str]:
+    """RFC 3339 timestamp at midnight UTC, or None for an impossible date."""
+    try:
+        return datetime.date(year, month, day).strftime("%Y-%m-%dT00:00:00Z")
+    except ValueError:
+        return None
+
+
+def parse_date(text: Optional[str]) -> Optional[str]:
+    """
+    Find the first date in a string.
+
+    Understands ISO dates (`2024-10-16`, also with a time, as FRED's
+    `last_updated`), `16 October 2024` and `October 16, 2024`.
+
+    Args:
+        text: Text that may contain a date
+
+    Returns:
+        RFC 3339 timestamp (the time is dropped), or None if there is no date
+    """
+    if not text:
+        return None
+    candidates = []
+    for pattern, order in ((_ISO, "ymd"), (_DAY_MONTH_YEAR, "dmy"), (_MONTH_DAY_YEAR, "mdy")):
+        match = pattern.search(text)
+        if match:
+            candidates.append((match.start(), order, match.groups()))
+    for _, order, groups in sorted(candidates):
+        if order == "ymd":
+            year, month, day = (int(value) for value in groups)
+        elif order == "dmy":
+            day, month, year = int(groups[0]), _MONTHS[groups[1].lower()], int(groups[2])
+        else:
+            month, day, year = _MONTHS[groups[0].lower()], int(groups[1]), int(groups[2])
+        value = _iso(year, month, day)
+        if value is not None:
+            return value
+    return None
+
+
+def publication_date(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Publication date of an HTML page.
+
+    Looks at publication-date meta tags, then `<time datetime>` elements,
+    then elements whose class mentions a date, then the start of the page
+    text.
+
+    Args:
+        soup: Parsed page
+
+    Returns:
+        RFC 3339 timestamp, or None if the page shows no date
+    """
+    meta = {}
+    for tag in soup.find_all("meta"):
+        name = (tag.get("name") or tag.get("property") or "").lower()
+        meta.setdefault(name, tag.get("content"))
+    for name in _META_NAMES:
+        value = parse_date(meta.get(name))
+        if value:
+            return value
+
+    for tag in soup.find_all("time"):
+        value = parse_date(tag.get("datetime") or tag.get_text())
+        if value:
+            return value
+
+    for tag in soup.select("[class*='date']"):
+        value = parse_date(tag.get_text(" "))
+        if value:
+            return value
+
+    return parse_date(soup.get_text(" ")[:_TEXT_WINDOW])
@@ -1,10 +1,161 @@
 """
 Utilities for generating embeddings from text.
 """
-from typing import List, Dict, Any
+import re
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Sequence, Generator, Tuple, Deque
 import openai
 
 from ..config import config
+from .cache import get_cache
+
+
+@lru_cache(maxsize=4)
+def _build_client(api_key: str, base_url: Optional[str]) -> openai.Client:
+    """Build an OpenAI client; cached so connections are pooled across calls."""
+    return openai.Client(api_key=api_key, base_url=base_url)
+
+
+def get_client() -> openai.Client:
+    """
+    Get the shared OpenAI client for the current configuration.
+    
+    Returns:
+        OpenAI client instance, reused between calls
+    """
+    if not config.openai_api_key:
+        raise ValueError("OPENAI_API_KEY not set in environment variables")
+    
+    return _build_client(config.openai_api_key, config.openai_base_url)
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(model: str):
+    """Load the tiktoken encoding for a model, or None if it is unavailable."""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # tiktoken missing or its BPE files could not be downloaded
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens in a text for the given embedding model.
+    
+    Falls back to an estimate of four characters per token when tiktoken
+    is not available.
+    
+    Args:
+        text: Text to measure
+        model: Embedding model name (default: configured embedding model)
+        
+    Returns:
+        Number of tokens
+    """
+    encoding = _get_encoding(model or config.embedding_model)
+    if encoding is None:
+        return max(1, (len(text) + 3) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _batches(texts: Sequence[str], 
+             batch_tokens: int, 
+             batch_size: int) -> List[List[int]]:
+    """
+    Pack text indices into request batches bounded by tokens and inputs.
+    
+    Args:
+        texts: Texts to pack
+        batch_tokens: Maximum total tokens per request
+        batch_size: Maximum number of inputs per request
+        
+    Returns:
+        List of batches, each a list of indices into texts
+    """
+    batches = []
+    current: List[int] = []
+    current_tokens = 0
+    
+    for idx, text in enumerate(texts):
+        tokens = count_tokens(text)
+        
+        # Start a new request if this input would overflow the current one
+        if current and (current_tokens + tokens > batch_tokens or len(current) >= batch_size):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        
+        current.append(idx)
+        current_tokens += tokens
+    
+    if current:
+        batches.append(current)
+    
+    return batches
+
+
+def get_embeddings(texts: Sequence[str],
+                   batch_tokens: Optional[int] = None,
+                   batch_size: Optional[int] = None,
+                   use_cache: bool = True) -> List[List[float]]:
+    """
+    Generate embeddings for many texts with as few API requests as possible.
+    
+    Texts already in the embedding cache are served from disk. The rest are
+    packed into requests bounded by a token budget and an input count;
+    results are returned in the same order as the input.
+    
+    Args:
+        texts: Texts to embed
+        batch_tokens: Maximum tokens per request (default: config.embedding_batch_tokens)
+        batch_size: Maximum inputs per request (default: config.embedding_batch_size)
+        use_cache: Whether to read from and write to the embedding cache
+        
+    Returns:
+        List of embeddings, one per input text
+    """
+    if not texts:
+        return []
+    
+    batch_tokens = batch_tokens or config.embedding_batch_tokens
+    batch_size = batch_size or config.embedding_batch_size
+    cache = get_cache() if use_cache else None
+    
+    if cache is not None:
+        embeddings = cache.get_many(config.embedding_model, texts)
+    else:
+        embeddings = [None] * len(texts)
+    
+    missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+    if not missing:
+        return embeddings
+    
+    client = get_client()
+    missing_texts = [texts[idx] for idx in missing]
+    for batch in _batches(missing_texts, batch_tokens, batch_size):
+        batch_texts = [missing_texts[pos] for pos in batch]
+        response = client.embeddings.create(
+            input=batch_texts,
+            model=config.embedding_model
+        )
+        # The API tags each result with its position in the request
+        batch_embeddings = [None] * len(batch)
+        for data in response.data:
+            batch_embeddings[data.index] = data.embedding
+        for pos, embedding in zip(batch, batch_embeddings):
+            embeddings[missing[pos]] = embedding
+        
+        if cache is not None:
+            cache.put_many(config.embedding_model, batch_texts, batch_embeddings)
+    
+    return embeddings
+
 
 def get_embedding(text: str) -> List[float]:
     """
@@ -16,54 +167,116 @@ def get_embedding(text: str) -> List[float]:
     Returns:
         List of embedding values
     """
-    if not config.openai_api_key:
-        raise ValueError("OPENAI_API_KEY not set in environment variables")
+    return get_embeddings([text])[0]
+
+
+# Sentences end at ., ! or ? followed by whitespace (the whitespace stays with the sentence)
+_SENTENCE = re.compile(r".+?(?:[.!?]+(?:\s+|$)|$)", re.DOTALL)
+_WORD = re.compile(r"\S+\s*|\s+")
+
+
+def _units(text: str, max_tokens: int) -> Generator[Tuple[str, int], None, None]:
+    """
+    Split text into pieces no longer than max_tokens, preferring large boundaries.
     
-    client = openai.Client(api_key=config.openai_api_key)
-    response = client.embeddings.create(
-        input=text,
-        model=config.embedding_model
-    )
-    return response.data[0].embedding
+    Lines are kept whole when they fit; longer lines are split into
+    sentences, then words, and a single oversized word is cut by characters.
+    
+    Args:
+        text: Text to split
+        max_tokens: Maximum tokens per piece
+        
+    Yields:
+        (piece, token count) tuples that concatenate back to the text
+    """
+    for line in text.splitlines(keepends=True):
+        tokens = count_tokens(line)
+        if tokens <= max_tokens:
+            yield line, tokens
+            continue
+        
+        for sentence in _SENTENCE.findall(line):
+            tokens = count_tokens(sentence)
+            if tokens <= max_tokens:
+                yield sentence, tokens
+                continue
+            
+            for word in _WORD.findall(sentence):
+                tokens = count_tokens(word)
+                if tokens <= max_tokens:
+                    yield word, tokens
+                    continue
+                
+                # Pathological run without whitespace (e.g. an inline data blob)
+                step = max(1, len(word) * max_tokens // tokens)
+                for start in range(0, len(word), step):
+                    piece = word[start:start + step]
+                    yield piece, count_tokens(piece)
 
 
-def chunk_text(text: str, chunk_size: int = None) -> List[str]:
+def iter_chunks(text: str, 
+                max_tokens: Optional[int] = None, 
+                overlap_tokens: Optional[int] = None) -> Generator[str, None, None]:
     """
-    Split text into chunks of approximately equal size.
+    Lazily split text into chunks bounded by embedding-model tokens.
+    
+    Chunks are packed from whole lines where possible (so `date: value`
+    series split on line boundaries), falling back to sentences and words
+    for long lines. Consecutive chunks share up to `overlap_tokens` tokens
+    of trailing context. Token counts are summed per piece, which can differ
+    slightly from the count of the joined chunk.
     
     Args:
         text: Text to split
-        chunk_size: Target size for each chunk (in characters)
+        max_tokens: Maximum tokens per chunk (default: config.chunk_max_tokens)
+        overlap_tokens: Tokens repeated from the end of the previous chunk
+            (default: config.chunk_overlap_tokens)
         
-    Returns:
-        List of text chunks
+    Yields:
+        Text chunks
     """
-    chunk_size = chunk_size or config.chunk_size
+    max_tokens = max_tokens or config.chunk_max_tokens
+    overlap_tokens = config.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+    # Overlap must leave room for new content in every chunk
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
     
-    # Split by sentences to preserve context
-    sentences = text.replace('\n', ' ').split('. ')
-    chunks = []
-    current_chunk = []
-    current_size = 0
+    window: Deque[Tuple[str, int]] = deque()
+    window_tokens = 0
+    has_new = False
     
-    for sentence in sentences:
-        # Add period back except for the last sentence if it doesn't end with one
-        if sentence and not sentence.endswith('.'):
-            sentence = sentence + '.'
+    for piece, tokens in _units(text, max_tokens):
+        if window_tokens + tokens > max_tokens and has_new:
+            chunk = "".join(piece for piece, _ in window).strip()
+            if chunk:
+                yield chunk
             
-        # If adding this sentence would exceed chunk size and we already have content,
-        # complete the current chunk and start a new one
-        if current_size + len(sentence) > chunk_size and current_chunk:
-            chunks.append(' '.join(current_chunk))
-            current_chunk = []
-            current_size = 0
+            # Keep a tail of the window as overlap for the next chunk
+            while window and (window_tokens > overlap_tokens or window_tokens + tokens > max_tokens):
+                window_tokens -= window.popleft()[1]
+            has_new = False
         
-        # If a single sentence is longer than chunk_size, we still keep it as one chunk
-        current_chunk.append(sentence)
-        current_size += len(sentence) + 1  # +1 for space
+        window.append((piece, tokens))
+        window_tokens += tokens
+        has_new = has_new or bool(piece.strip())
     
-    # Add the last chunk if there's anything left
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
+    if has_new:
+        chunk = "".join(piece for piece, _ in window).strip()
+        if chunk:
+            yield chunk
+
+
+def chunk_text(text: str, 
+               max_tokens: Optional[int] = None, 
+               overlap_tokens: Optional[int] = None) -> List[str]:
+    """
+    Split text into token-bounded chunks (see `iter_chunks`).
     
-    return chunks 
\ No newline at end of file
+    Args:
+        text: Text to split
+        max_tokens: Maximum tokens per chunk (default: config.chunk_max_tokens)
+        overlap_tokens: Tokens shared with the previous chunk (default: config.chunk_overlap_tokens)
+        
+    Returns:
+        List of text chunks
+    """
+    return list(iter_chunks(text, max_tokens, overlap_tokens))
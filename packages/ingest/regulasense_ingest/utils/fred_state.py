@@ -0,0 +1,96 @@
+"""
+Local sync state for FRED series.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from ..config import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    series_id TEXT PRIMARY KEY,
+    last_updated TEXT,
+    info TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+class FredSyncState:
+    """
+    Series metadata last downloaded from FRED.
+    
+    For every series the state keeps the metadata returned by the series
+    endpoint, keyed by its `last_updated` stamp, so a run can tell whether a
+    series changed since the last sync. The observations themselves live in
+    the time-series store, whose latest date is the sync watermark.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Open (or create) the sync state.
+        
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = Path(path)
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+    
+    def series(self, series_id: str) -> Optional[Tuple[Optional[str], Dict[str, Any]]]:
+        """
+        Get the stored metadata of a series.
+        
+        Args:
+            series_id: FRED series ID
+        
+        Returns:
+            (last_updated, info) tuple, or None if never synced
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_updated, info FROM series WHERE series_id = ?",
+                (series_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+    
+    def update(self, series_id: str, info: Dict[str, Any]) -> None:
+        """
+        Record the metadata of a freshly synced series.
+        
+        Args:
+            series_id: FRED series ID
+            info: Series metadata, including `last_updated`
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO series (series_id, last_updated, info, synced_at) "
+                "VALUES (?, ?, ?, ?)",
+                (series_id, info.get("last_updated"), json.dumps(info, default=str), time.time())
+            )
+            self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def get_fred_state() -> FredSyncState:
+    """
+    Open the FRED sync state in the configured state directory.
+    
+    Returns:
+        FredSyncState instance
+    """
+    return FredSyncState(config.state_dir / "fred.sqlite")
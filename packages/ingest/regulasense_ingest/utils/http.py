@@ -0,0 +1,259 @@
+"""
+Shared HTTP crawler for scraped sources.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Callable
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config import config
+from .http_cache import HttpCache
+
+USER_AGENT = "RegulaSense Ingest/0.1 (+https://github.com/lucianareynaud/regulasense-langgraph)"
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second with bursts up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full token bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens held
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Page:
+    """A fetched page, either freshly downloaded or revalidated from the HTTP cache."""
+    
+    def __init__(self, url: str, content: bytes, encoding: Optional[str], not_modified: bool = False):
+        """
+        Initialize a page.
+        
+        Args:
+            url: Requested URL
+            content: Response body
+            encoding: Text encoding of the body
+            not_modified: Whether the server answered 304 and the body came from the cache
+        """
+        self.url = url
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.not_modified = not_modified
+    
+    @property
+    def text(self) -> str:
+        """Decoded response body."""
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class Crawler:
+    """
+    Pooled, rate-limited HTTP client for crawling publication pages.
+    
+    All requests share one `requests.Session` with a connection pool, so
+    TLS connections are reused. Each host gets its own token bucket, and
+    429/5xx responses are retried with exponential backoff (honouring
+    `Retry-After`). With an HTTP cache, pages are revalidated with
+    conditional requests and unchanged pages are not downloaded again.
+    """
+    
+    def __init__(self,
+                 concurrency: Optional[int] = None,
+                 rate_per_host: Optional[float] = None,
+                 burst: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 backoff: Optional[float] = None,
+                 timeout: Optional[float] = None,
+                 cache: Optional[HttpCache] = None):
+        """
+        Initialize the crawler.
+        
+        Args:
+            concurrency: Number of pages fetched at once
+            rate_per_host: Sustained requests per second allowed per host
+            burst: Requests allowed in a burst per host
+            max_retries: Retries on connection errors, 429 and 5xx responses
+            backoff: Base delay in seconds for exponential backoff
+            timeout: Request timeout in seconds
+            cache: HTTP cache (default: the configured cache, if enabled)
+        """
+        self.concurrency = concurrency or config.crawl_concurrency
+        self.rate_per_host = rate_per_host or config.crawl_rate_per_host
+        self.burst = burst or config.crawl_burst
+        self.timeout = timeout or config.crawl_timeout
+        self.cache = cache or get_http_cache()
+        
+        retry = Retry(
+            total=max_retries if max_retries is not None else config.crawl_max_retries,
+            backoff_factor=backoff if backoff is not None else config.crawl_backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=self.concurrency,
+            pool_maxsize=self.concurrency
+        )
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+    
+    def _bucket(self, url: str) -> TokenBucket:
+        """Get the token bucket for the URL's host."""
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+            return self._buckets[host]
+    
+    def get(self, url: str, **kwargs) -> Page:
+        """
+        Fetch a URL, waiting for the host's rate limit first.
+        
+        Args:
+            url: URL to fetch
+            **kwargs: Additional arguments for `requests.Session.get`
+        
+        Returns:
+            Fetched page
+        
+        Raises:
+            requests.HTTPError: If the final response has an error status
+        """
+        self._bucket(url).acquire()
+        kwargs.setdefault("timeout", self.timeout)
+        headers = kwargs.pop("headers", {})
+        conditional = self.cache.validators(url) if self.cache is not None else {}
+        
+        response = self.session.get(url, headers={**conditional, **headers}, **kwargs)
+        response.raise_for_status()
+        
+        if self.cache is None:
+            return Page(url, response.content, response.encoding)
+        if response.status_code == 304:
+            body = self.cache.revalidated(url)
+            if body is not None:
+                return Page(url, body, response.encoding, not_modified=True)
+            # Evicted while the request was in flight: fetch the page again without validators
+            self._bucket(url).acquire()
+            response = self.session.get(url, headers=headers, **kwargs)
+            response.raise_for_status()
+        
+        self.cache.store(url, response.content, response.headers)
+        return Page(url, response.content, response.encoding)
+    
+    def parse(self, page: Page, parser: Callable[[str], Any], version: str = "1") -> Any:
+        """
+        Parse a page, reusing the stored result if the page was not modified.
+        
+        The result is cached per URL, so the parser must depend on the page
+        HTML alone: anything taken from the caller's context (category,
+        position in a listing) belongs outside it.
+        
+        Args:
+            page: Page returned by `get` or `fetch_many`
+            parser: Function from page HTML to a JSON-serialisable result
+            version: Parser output version; results stored under another version are ignored
+        
+        Returns:
+            Parse result
+        """
+        if self.cache is None:
+            return parser(page.text)
+        
+        if page.not_modified:
+            cached = self.cache.get_parsed(page.url, version)
+            if cached is not None:
+                return cached["value"]
+        
+        value = parser(page.text)
+        self.cache.store_parsed(page.url, value, version)
+        return value
+    
+    def fetch_many(self, urls: Iterable[str]) -> Iterator[Tuple[str, Optional[Page], Optional[Exception]]]:
+        """
+        Fetch several URLs concurrently.
+        
+        Results are yielded in input order as they become available, and at
+        most `concurrency` requests are in flight at once.
+        
+        Args:
+            urls: URLs to fetch
+        
+        Yields:
+            (url, page, error) tuples; exactly one of page and error is set
+        """
+        def fetch(url: str) -> Tuple[str, Optional[Page], Optional[Exception]]:
+            try:
+                return url, self.get(url), None
+            except Exception as e:
+                return url, None, e
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # Keep a bounded window of requests in flight so callers can stop early
+            pending = []
+            for url in urls:
+                pending.append(executor.submit(fetch, url))
+                if len(pending) >= self.concurrency:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+    
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+
+
+_http_cache: Optional[HttpCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """
+    Get the shared HTTP cache for the current configuration.
+    
+    Returns:
+        HttpCache instance, or None if HTTP caching is disabled
+    """
+    global _http_cache
+    if not config.http_cache_enabled:
+        return None
+    
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(
+                config.http_cache_dir or config.state_dir / "http",
+                max_bytes=config.http_cache_max_mb * 1024 * 1024
+            )
+    return _http_cache
@@ -0,0 +1,218 @@
+"""
+On-disk HTTP response cache with conditional GET support.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class HttpCache:
+    """
+    Disk cache of HTTP response bodies and validators.
+    
+    Each URL is stored as a body file plus a JSON metadata file holding its
+    `ETag`/`Last-Modified` validators and, optionally, the result of parsing
+    the body. A later request can revalidate with `If-None-Match` /
+    `If-Modified-Since`; on a 304 the stored parse result is reused, so the
+    page is neither downloaded nor parsed again.
+    """
+    
+    def __init__(self, directory: Path, max_bytes: Optional[int] = None):
+        """
+        Open (or create) an HTTP cache.
+        
+        Args:
+            directory: Directory holding cached responses
+            max_bytes: Maximum total size of cached bodies
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.requests = 0
+        self.not_modified = 0
+        self.downloads = 0
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(path.stat().st_size for path in self.directory.glob("*.body"))
+    
+    def _paths(self, url: str):
+        """Return the (body, metadata) paths for a URL."""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.body", self.directory / f"{key}.json"
+    
+    def _read_meta(self, meta_path: Path) -> Optional[Dict[str, Any]]:
+        """Read a metadata file, treating unreadable files as missing."""
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_meta(self, meta_path: Path, meta: Dict[str, Any]) -> None:
+        """Atomically replace a metadata file."""
+        tmp_path = meta_path.with_name(meta_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+    
+    def validators(self, url: str) -> Dict[str, str]:
+        """
+        Build conditional request headers for a URL.
+        
+        Args:
+            url: URL about to be requested
+        
+        Returns:
+            `If-None-Match` / `If-Modified-Since` headers, empty if the URL is not cached
+        """
+        body_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        if meta is None or not body_path.exists():
+            return {}
+        
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+    
+    def store(self, url: str, body: bytes, headers: Dict[str, str]) -> None:
+        """
+        Store a freshly downloaded response.
+        
+        Responses without validators are not cached, since they could never
+        be revalidated.
+        
+        Args:
+            url: Requested URL
+            body: Response body
+            headers: Response headers
+        """
+        with self._lock:
+            self.requests += 1
+            self.downloads += 1
+        
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        
+        body_path, meta_path = self._paths(url)
+        with self._lock:
+            if body_path.exists():
+                self._size -= body_path.stat().st_size
+            tmp_path = body_path.with_name(body_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+            self._size += len(body)
+            
+            now = time.time()
+            self._write_meta(meta_path, {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "stored_at": now,
+                "accessed_at": now,
+            })
+            
+            if self.max_bytes is not None and self._size > self.max_bytes:
+                self._evict()
+    
+    def revalidated(self, url: str) -> Optional[bytes]:
+        """
+        Record a 304 response and return the cached body.
+        
+        Another thread may have evicted the entry between sending the
+        validators and receiving the 304; the caller must then fetch the
+        page unconditionally.
+        
+        Args:
+            url: Requested URL
+        
+        Returns:
+            Cached response body, or None if it is no longer cached
+        """
+        body_path, meta_path = self._paths(url)
+        with self._lock:
+            try:
+                body = body_path.read_bytes()
+            except FileNotFoundError:
+                return None
+            self.requests += 1
+            self.not_modified += 1
+            meta = self._read_meta(meta_path) or {"url": url}
+            meta["accessed_at"] = time.time()
+            self._write_meta(meta_path, meta)
+            return body
+    
+    def get_parsed(self, url: str, version: str = "1") -> Optional[Dict[str, Any]]:
+        """
+        Look up the stored parse result for a URL.
+        
+        Args:
+            url: Page URL
+            version: Parser output version the result must have been stored under
+        
+        Returns:
+            Dictionary with a "value" key, or None if nothing was stored
+        """
+        meta = self._read_meta(self._paths(url)[1])
+        if meta is None or "parsed" not in meta or meta.get("parsed_version", "1") != version:
+            return None
+        return {"value": meta["parsed"]}
+    
+    def store_parsed(self, url: str, value: Any, version: str = "1") -> None:
+        """
+        Store the parse result for a cached page.
+        
+        Args:
+            url: Page URL
+            value: JSON-serialisable parse result
+            version: Parser output version
+        """
+        _, meta_path = self._paths(url)
+        with self._lock:
+            meta = self._read_meta(meta_path)
+            if meta is None:
+                return
+            meta["parsed"] = value
+            meta["parsed_version"] = version
+            self._write_meta(meta_path, meta)
+    
+    def _evict(self) -> None:
+        """Drop least recently used entries until under budget (caller holds the lock)."""
+        entries = []
+        for meta_path in self.directory.glob("*.json"):
+            meta = self._read_meta(meta_path) or {}
+            entries.append((meta.get("accessed_at", 0), meta_path))
+        
+        for _, meta_path in sorted(entries, key=lambda entry: entry[0]):
+            if self._size <= self.max_bytes:
+                break
+            body_path = meta_path.with_suffix(".body")
+            if body_path.exists():
+                self._size -= body_path.stat().st_size
+                body_path.unlink()
+            meta_path.unlink()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarise cache usage for this process.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        return {
+            "directory": str(self.directory),
+            "size_bytes": self._size,
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "downloads": self.downloads,
+            "hit_rate": self.not_modified / self.requests if self.requests else 0.0,
+        }
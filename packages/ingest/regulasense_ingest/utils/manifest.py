@@ -0,0 +1,208 @@
+"""
+Incremental ingestion manifest for a Qdrant collection.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from ..config import config
+from ..sources.base import DataItem
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    source TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    chunk_count INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, source_id)
+);
+"""
+
+# Namespace for deterministic point IDs; changing it orphans every existing point
+POINT_NAMESPACE = uuid.UUID("6f1c3a52-8e0b-5d0e-9a5c-2f4b7e3d1c90")
+
+
+def point_id(source: str, source_id: str, chunk_idx: int) -> str:
+    """
+    Deterministic Qdrant point ID for one chunk of an item.
+    
+    Args:
+        source: Source identifier
+        source_id: Item identifier within the source
+        chunk_idx: Position of the chunk within the item
+    
+    Returns:
+        UUIDv5 string, stable across runs
+    """
+    return str(uuid.uuid5(POINT_NAMESPACE, f"{source}/{source_id}/{chunk_idx}"))
+
+
+def content_hash(item: DataItem) -> str:
+    """
+    Hash everything that determines an item's points.
+    
+    Covers the content, the metadata copied into every payload, and the
+    chunking and embedding settings, so changing any of them re-ingests
+    the item.
+    
+    Args:
+        item: DataItem to hash
+    
+    Returns:
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "content": item.content,
+        "metadata": item.metadata,
+        "chunk_max_tokens": config.chunk_max_tokens,
+        "chunk_overlap_tokens": config.chunk_overlap_tokens,
+        "embedding_model": config.embedding_model,
+    }, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """
+    Record of what has been ingested into a collection.
+    
+    For every DataItem the manifest keeps the content hash and the number
+    of chunks written, so unchanged items can be skipped and the points of
+    chunks that no longer exist can be deleted.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Open (or create) a manifest.
+        
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = Path(path)
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+    
+    def lookup(self, item: DataItem) -> Optional[Tuple[str, int]]:
+        """
+        Get the recorded state of an item.
+        
+        Args:
+            item: DataItem to look up
+        
+        Returns:
+            (content_hash, chunk_count) tuple, or None if never ingested
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT content_hash, chunk_count FROM items WHERE source = ? AND source_id = ?",
+                (item.source, item.source_id)
+            ).fetchone()
+    
+    def chunk_counts(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        """
+        Get the recorded chunk counts of several items.
+        
+        Args:
+            keys: (source, source_id) pairs
+        
+        Returns:
+            Chunk count per (source, source_id), for the items ingested before
+        """
+        counts = {}
+        with self._lock:
+            for source, source_id in keys:
+                row = self._conn.execute(
+                    "SELECT chunk_count FROM items WHERE source = ? AND source_id = ?",
+                    (source, source_id)
+                ).fetchone()
+                if row is not None:
+                    counts[(source, source_id)] = row[0]
+        return counts
+    
+    def record(self, item: DataItem, item_hash: str, chunk_count: int) -> None:
+        """
+        Record that an item's points are fully written.
+        
+        Args:
+            item: Ingested DataItem
+            item_hash: Content hash of the item
+            chunk_count: Number of chunks written
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO items (source, source_id, content_hash, chunk_count, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (item.source, item.source_id, item_hash, chunk_count, time.time())
+            )
+            self._conn.commit()
+    
+    def record_many(self, entries: Iterable[Tuple[str, str, str, int]]) -> None:
+        """
+        Record several fully written items at once.
+        
+        Args:
+            entries: (source, source_id, content_hash, chunk_count) tuples
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO items (source, source_id, content_hash, chunk_count, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(*entry, now) for entry in entries]
+            )
+            self._conn.commit()
+    
+    def count(self) -> int:
+        """Number of items recorded."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    
+    def clear(self) -> None:
+        """Forget every recorded item."""
+        with self._lock:
+            self._conn.execute("DELETE FROM items")
+            self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def stale_point_ids(item: DataItem, old_count: int, new_count: int) -> List[str]:
+    """
+    Point IDs of chunks an item had before but no longer has.
+    
+    Args:
+        item: DataItem being re-ingested
+        old_count: Chunk count recorded in the manifest
+        new_count: Chunk count after re-chunking
+    
+    Returns:
+        List of point IDs to delete
+    """
+    return [point_id(item.source, item.source_id, idx) for idx in range(new_count, old_count)]
+
+
+def get_manifest(collection_name: Optional[str] = None) -> IngestManifest:
+    """
+    Open the manifest for a collection.
+    
+    Args:
+        collection_name: Qdrant collection (default: config.collection_name)
+    
+    Returns:
+        IngestManifest instance
+    """
+    collection_name = collection_name or config.collection_name
+    return IngestManifest(config.state_dir / f"manifest-{collection_name}.sqlite")
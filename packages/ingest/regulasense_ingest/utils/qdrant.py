@@ -1,46 +1,191 @@
 """
 Utilities for interacting with Qdrant vector database.
 """
-from typing import List, Dict, Any, Optional
+import datetime
+import time
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from tqdm import tqdm
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 
-from ..config import config
+from ..config import config, CollectionProfile
 from ..sources.base import DataItem
-from .embeddings import get_embedding, chunk_text
+from .bulk import BulkWriter
+from .embeddings import get_embeddings, chunk_text
+from .sparse import SPARSE_VECTOR_NAME, document_vector
+from .manifest import IngestManifest, get_manifest, point_id, content_hash, stale_point_ids
 
-def ensure_collection_exists(client: Optional[QdrantClient] = None) -> QdrantClient:
+def get_qdrant_client() -> QdrantClient:
     """
-    Ensure the Qdrant collection exists, creating it if necessary.
+    Create a Qdrant client for the configured server.
+    
+    Returns:
+        QdrantClient using gRPC if `config.qdrant_prefer_grpc` is set
+    """
+    return QdrantClient(
+        url=config.qdrant_url,
+        prefer_grpc=config.qdrant_prefer_grpc,
+        grpc_port=config.qdrant_grpc_port
+    )
+
+
+# Suffix of the collection holding the collection version
+META_SUFFIX = "_meta"
+
+# Settings that update_collection can change on an existing collection
+MUTABLE_SETTINGS = {"hnsw_m", "hnsw_ef_construct", "quantization", "vectors_on_disk",
+                    "payload_on_disk", "replication_factor"}
+
+
+def _quantization_config(profile: CollectionProfile) -> Optional[models.QuantizationConfig]:
+    """Build the quantization config for a profile, or None for unquantized vectors."""
+    if profile.quantization == "scalar":
+        return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8,
+            quantile=0.99,
+            always_ram=profile.quantization_always_ram
+        ))
+    if profile.quantization == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(
+            always_ram=profile.quantization_always_ram
+        ))
+    if profile.quantization != "none":
+        raise ValueError(f"Unknown quantization {profile.quantization!r}, expected none, scalar or binary")
+    return None
+
+
+def _quantization_name(quantization: Any) -> str:
+    """Name the kind of a quantization config returned by Qdrant."""
+    if isinstance(quantization, models.ScalarQuantization):
+        return "scalar"
+    if isinstance(quantization, models.BinaryQuantization):
+        return "binary"
+    if isinstance(quantization, models.ProductQuantization):
+        return "product"
+    return "none"
+
+
+def collection_drift(client: QdrantClient, 
+                     profile: Optional[CollectionProfile] = None) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Compare an existing collection with a profile.
+    
+    Args:
+        client: QdrantClient instance
+        profile: Desired layout (default: config.collection)
+        
+    Returns:
+        Mapping of setting -> (current value, profile value) for every
+        setting that differs, including missing or mistyped payload indexes
+    """
+    profile = profile or config.collection
+    info = client.get_collection(config.collection_name)
+    params = info.config.params
+    vectors = params.vectors.get("") if isinstance(params.vectors, dict) else params.vectors
+    
+    current = {
+        "vector_size": vectors.size if vectors else None,
+        "distance": vectors.distance.value if vectors else None,
+        "hnsw_m": info.config.hnsw_config.m,
+        "hnsw_ef_construct": info.config.hnsw_config.ef_construct,
+        "quantization": _quantization_name((vectors and vectors.quantization_config) or info.config.quantization_config),
+        "vectors_on_disk": bool(vectors and vectors.on_disk),
+        "payload_on_disk": bool(params.on_disk_payload),
+        "shard_number": params.shard_number or 1,
+        "replication_factor": params.replication_factor or 1,
+        "sparse_vectors": SPARSE_VECTOR_NAME in (params.sparse_vectors or {}),
+    }
+    drift = {
+        setting: (value, getattr(profile, setting))
+        for setting, value in current.items()
+        if value != getattr(profile, setting)
+    }
+    
+    for field, schema_type in profile.payload_indexes.items():
+        index = info.payload_schema.get(field)
+        indexed = index.data_type.value if index is not None else None
+        if indexed != schema_type:
+            drift[f"payload_index.{field}"] = (indexed, schema_type)
+    
+    return drift
+
+
+def _create_payload_indexes(client: QdrantClient, 
+                            profile: CollectionProfile,
+                            drift: Dict[str, Tuple[Any, Any]]) -> None:
+    """Create the profile's payload indexes that are missing or have the wrong type."""
+    for field, schema_type in profile.payload_indexes.items():
+        if f"payload_index.{field}" not in drift:
+            continue
+        if drift[f"payload_index.{field}"][0] is not None:
+            client.delete_payload_index(config.collection_name, field)
+        client.create_payload_index(
+            collection_name=config.collection_name,
+            field_name=field,
+            field_schema=models.PayloadSchemaType(schema_type),
+            wait=True
+        )
+        print(f"Created {schema_type} payload index on {field}")
+
+
+def ensure_collection_exists(client: Optional[QdrantClient] = None,
+                             profile: Optional[CollectionProfile] = None) -> QdrantClient:
+    """
+    Ensure the Qdrant collection exists, creating it from the profile if necessary.
+    
+    Missing payload indexes are created on every call. Other differences
+    between an existing collection and the profile are reported but left
+    alone; use `apply_collection_profile` to change them.
     
     Args:
         client: Optional QdrantClient instance
+        profile: Desired layout (default: config.collection)
         
     Returns:
         QdrantClient instance
     """
+    profile = profile or config.collection
+    
     # Create client if not provided
     if client is None:
-        client = QdrantClient(url=config.qdrant_url)
+        client = get_qdrant_client()
     
     # Check if collection exists
     try:
-        collections = client.get_collections().collections
-        collection_names = [c.name for c in collections]
-        
-        if config.collection_name not in collection_names:
+        if not client.collection_exists(config.collection_name):
             # Create collection
             client.create_collection(
                 collection_name=config.collection_name,
                 vectors_config=models.VectorParams(
-                    size=1536,  # OpenAI embedding dimension
-                    distance=models.Distance.COSINE
-                )
+                    size=profile.vector_size,
+                    distance=models.Distance(profile.distance),
+                    on_disk=profile.vectors_on_disk
+                ),
+                hnsw_config=models.HnswConfigDiff(
+                    m=profile.hnsw_m,
+                    ef_construct=profile.hnsw_ef_construct
+                ),
+                sparse_vectors_config={
+                    SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)
+                } if profile.sparse_vectors else None,
+                quantization_config=_quantization_config(profile),
+                on_disk_payload=profile.payload_on_disk,
+                shard_number=profile.shard_number,
+                replication_factor=profile.replication_factor
             )
             print(f"Created collection {config.collection_name}")
+            drift = {
+                f"payload_index.{field}": (None, schema_type)
+                for field, schema_type in profile.payload_indexes.items()
+            }
         else:
             print(f"Collection {config.collection_name} already exists")
+            drift = collection_drift(client, profile)
+            for setting, (current, wanted) in drift.items():
+                if not setting.startswith("payload_index."):
+                    print(f"  Drift: {setting} is {current}, profile wants {wanted}")
+        
+        _create_payload_indexes(client, profile, drift)
     
     except Exception as e:
         print(f"Error ensuring collection exists: {e}")
@@ -49,81 +194,295 @@ def ensure_collection_exists(client: Optional[QdrantClient] = None) -> QdrantCli
     return client
 
 
-def upload_items(items: List[DataItem], client: Optional[QdrantClient] = None) -> int:
+def apply_collection_profile(client: Optional[QdrantClient] = None,
+                             profile: Optional[CollectionProfile] = None) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Bring an existing collection in line with the profile where Qdrant allows it.
+    
+    HNSW, quantization, on-disk storage and replication are updated in
+    place (Qdrant rebuilds indexes in the background); the vector size,
+    distance, shard count and sparse vectors can only change by recreating
+    the collection.
+    
+    Args:
+        client: Optional QdrantClient instance
+        profile: Desired layout (default: config.collection)
+        
+    Returns:
+        Remaining drift that could not be applied
+    """
+    profile = profile or config.collection
+    client = ensure_collection_exists(client, profile)
+    drift = collection_drift(client, profile)
+    changes = {setting for setting in drift if setting in MUTABLE_SETTINGS}
+    if not changes:
+        return drift
+    
+    kwargs: Dict[str, Any] = {}
+    if changes & {"hnsw_m", "hnsw_ef_construct"}:
+        kwargs["hnsw_config"] = models.HnswConfigDiff(m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct)
+    if "quantization" in changes:
+        kwargs["quantization_config"] = _quantization_config(profile) or models.Disabled.DISABLED
+    if "vectors_on_disk" in changes:
+        kwargs["vectors_config"] = {"": models.VectorParamsDiff(on_disk=profile.vectors_on_disk)}
+    if changes & {"payload_on_disk", "replication_factor"}:
+        kwargs["collection_params"] = models.CollectionParamsDiff(
+            on_disk_payload=profile.payload_on_disk,
+            replication_factor=profile.replication_factor
+        )
+    
+    client.update_collection(collection_name=config.collection_name, **kwargs)
+    print(f"Updated {', '.join(sorted(changes))} on collection {config.collection_name}")
+    return {setting: values for setting, values in drift.items() if setting not in changes}
+
+
+def bump_collection_version(client: QdrantClient) -> int:
+    """
+    Record that the collection's contents changed.
+    
+    The version lives in a one-point `<collection>_meta` collection; the API
+    includes it in its search result cache keys, so cached results are
+    invalidated after every ingest that writes or deletes points.
+    
+    Args:
+        client: QdrantClient instance
+        
+    Returns:
+        New version (nanoseconds since the epoch, so concurrent ingests never collide)
+    """
+    meta_collection = f"{config.collection_name}{META_SUFFIX}"
+    if not client.collection_exists(meta_collection):
+        client.create_collection(
+            collection_name=meta_collection,
+            vectors_config=models.VectorParams(size=1, distance=models.Distance.DOT)
+        )
+    
+    version = time.time_ns()
+    client.upsert(
+        collection_name=meta_collection,
+        points=[models.PointStruct(id=0, vector=[1.0], payload={
+            "version": version,
+            "updated_at": datetime.datetime.now().isoformat(),
+        })]
+    )
+    return version
+
+
+def chunk_payload(item: DataItem, chunk_idx: int, total_chunks: int, chunk: str) -> Dict[str, Any]:
+    """
+    Build the Qdrant payload for one chunk of a data item.
+    
+    Args:
+        item: DataItem the chunk belongs to
+        chunk_idx: Position of the chunk within the item
+        total_chunks: Number of chunks in the item
+        chunk: Chunk text
+        
+    Returns:
+        Payload dictionary
+    """
+    # Combine item metadata with chunk info
+    return {
+        **item.metadata,
+        "source": item.source,
+        "source_id": item.source_id,
+        "chunk_index": chunk_idx,
+        "total_chunks": total_chunks,
+        "timestamp": item.timestamp,
+        "text": chunk
+    }
+
+
+def point_vectors(chunk: str, embedding: List[float]) -> Any:
+    """
+    Vectors of one point: the dense embedding, plus a BM25 sparse vector
+    when the collection profile enables hybrid search.
+    
+    Args:
+        chunk: Chunk text
+        embedding: Dense embedding of the chunk
+        
+    Returns:
+        Dense vector, or a {name: vector} mapping with the sparse vector
+    """
+    if not config.collection.sparse_vectors:
+        return embedding
+    indices, values = document_vector(chunk)
+    return {"": embedding, SPARSE_VECTOR_NAME: models.SparseVector(indices=indices, values=values)}
+
+
+def build_point(item: DataItem, 
+                chunk_idx: int, 
+                total_chunks: int, 
+                chunk: str, 
+                embedding: List[float]) -> models.PointStruct:
+    """
+    Build the Qdrant point for one chunk of a data item.
+    
+    Args:
+        item: DataItem the chunk belongs to
+        chunk_idx: Position of the chunk within the item
+        total_chunks: Number of chunks in the item
+        chunk: Chunk text
+        embedding: Embedding of the chunk
+        
+    Returns:
+        PointStruct ready for upsert
+    """
+    return models.PointStruct(
+        id=point_id(item.source, item.source_id, chunk_idx),
+        vector=point_vectors(chunk, embedding),
+        payload=chunk_payload(item, chunk_idx, total_chunks, chunk)
+    )
+
+
+def delete_points(client: QdrantClient, ids: List[str], batch_size: int = 500) -> int:
+    """
+    Delete points by ID in batches.
+    
+    Args:
+        client: QdrantClient instance
+        ids: Point IDs to delete
+        batch_size: Maximum IDs per delete request
+        
+    Returns:
+        Number of point IDs submitted for deletion
+    """
+    for start in range(0, len(ids), batch_size):
+        client.delete(
+            collection_name=config.collection_name,
+            points_selector=models.PointIdsList(points=ids[start:start + batch_size])
+        )
+    return len(ids)
+
+
+def sync_manifest(client: QdrantClient, manifest: IngestManifest) -> None:
+    """
+    Forget the manifest if the collection has been emptied or recreated.
+    
+    Args:
+        client: QdrantClient instance
+        manifest: Manifest for the collection
+    """
+    if manifest.count() and client.count(collection_name=config.collection_name, exact=False).count == 0:
+        print(f"Collection {config.collection_name} is empty; re-ingesting everything")
+        manifest.clear()
+
+
+def _embed_and_upsert(pending: List[tuple], 
+                      writer: BulkWriter, 
+                      callback: Callable[[bool], None]) -> int:
+    """
+    Embed a batch of pending chunks and queue the resulting points for upsert.
+    
+    Args:
+        pending: List of (item, chunk_idx, total_chunks, chunk) tuples
+        writer: BulkWriter for the collection
+        callback: Called with the outcome once the points are written
+        
+    Returns:
+        Number of points queued
+    """
+    try:
+        embeddings = get_embeddings([chunk for _, _, _, chunk in pending])
+    except Exception as e:
+        print(f"Error embedding batch of {len(pending)} chunks: {e}")
+        return 0
+    
+    writer.add([
+        build_point(item, chunk_idx, total_chunks, chunk, embedding)
+        for (item, chunk_idx, total_chunks, chunk), embedding in zip(pending, embeddings)
+    ], callback)
+    return len(pending)
+
+
+def upload_items(items: List[DataItem], 
+                 client: Optional[QdrantClient] = None,
+                 force: bool = False) -> int:
     """
     Upload items to Qdrant.
     
+    Chunks are embedded with batched requests (see `get_embeddings`) rather
+    than one request per chunk, and points are written by a `BulkWriter`
+    with several upserts in flight. Items whose content hash matches the
+    collection's ingest manifest are skipped, and points for chunks that a
+    changed item no longer has are deleted.
+    
     Args:
         items: List of DataItem objects to upload
         client: Optional QdrantClient instance
+        force: Re-upload items even if the manifest says they are unchanged
         
     Returns:
         Number of points uploaded
     """
     # Create client if not provided
     if client is None:
-        client = QdrantClient(url=config.qdrant_url)
+        client = get_qdrant_client()
     
     # Ensure collection exists
     client = ensure_collection_exists(client)
+    manifest = get_manifest()
+    sync_manifest(client, manifest)
+    
+    # Chunks waiting to be embedded, flushed once a full request batch is queued.
+    # Flushes happen between items, so every item is written by a single flush.
+    pending = []
+    pending_items = []
+    stale_ids = []
+    skipped = 0
     
-    # Prepare points for upload
-    points_to_upload = []
-    points_processed = 0
+    writer = BulkWriter(client)
+    
+    def flush() -> None:
+        entries = list(pending_items)
+        
+        def written(ok: bool) -> None:
+            if ok:
+                manifest.record_many(
+                    (item.source, item.source_id, item_hash, chunk_count)
+                    for item, item_hash, chunk_count in entries
+                )
+        
+        if pending:
+            _embed_and_upsert(pending, writer, written)
+        else:
+            written(True)
     
     # Process each item
     print(f"Processing {len(items)} items for upload to Qdrant...")
-    for item_idx, item in enumerate(tqdm(items)):
+    for item in tqdm(items):
+        item_hash = content_hash(item)
+        recorded = manifest.lookup(item)
+        if recorded is not None and recorded[0] == item_hash and not force:
+            skipped += 1
+            continue
+        
         # Chunk the content
         chunks = chunk_text(item.content)
         
-        # Process each chunk
         for chunk_idx, chunk in enumerate(chunks):
-            try:
-                # Generate embedding
-                embedding = get_embedding(chunk)
-                
-                # Create a unique ID for this chunk
-                point_id = f"{item.source}_{item.source_id}_{chunk_idx}"
-                
-                # Create metadata for this chunk, combining item metadata with chunk info
-                metadata = {
-                    **item.metadata,
-                    "source": item.source,
-                    "source_id": item.source_id,
-                    "chunk_index": chunk_idx,
-                    "total_chunks": len(chunks),
-                    "timestamp": item.timestamp,
-                    "text": chunk
-                }
-                
-                # Create point
-                point = models.PointStruct(
-                    id=point_id,
-                    vector=embedding,
-                    payload=metadata
-                )
-                
-                points_to_upload.append(point)
-                points_processed += 1
-                
-                # Upload in batches of 100 to avoid memory issues
-                if len(points_to_upload) >= 100:
-                    client.upsert(
-                        collection_name=config.collection_name,
-                        points=points_to_upload
-                    )
-                    points_to_upload = []
-            
-            except Exception as e:
-                print(f"Error processing chunk {chunk_idx} of item {item_idx}: {e}")
+            pending.append((item, chunk_idx, len(chunks), chunk))
+        pending_items.append((item, item_hash, len(chunks)))
+        if recorded is not None:
+            stale_ids.extend(stale_point_ids(item, recorded[1], len(chunks)))
+        
+        if len(pending) >= config.embedding_batch_size:
+            flush()
+            pending = []
+            pending_items = []
     
     # Upload any remaining points
-    if points_to_upload:
-        client.upsert(
-            collection_name=config.collection_name,
-            points=points_to_upload
-        )
+    flush()
+    writer.close()
+    print(writer)
+    
+    # Remove chunks that changed items no longer have
+    if stale_ids:
+        delete_points(client, stale_ids)
+    if writer.points or stale_ids:
+        bump_collection_version(client)
     
-    print(f"Uploaded {points_processed} points to Qdrant")
-    return points_processed 
\ No newline at end of file
+    print(f"Uploaded {writer.points} points to Qdrant "
+          f"({skipped} unchanged items skipped, {len(stale_ids)} stale points deleted)")
+    return writer.points
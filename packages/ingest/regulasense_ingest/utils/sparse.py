@@ -0,0 +1,88 @@
+"""
+BM25-style sparse vectors for keyword matching in Qdrant.
+
+Documents get BM25 term-frequency weights; the IDF part is applied by Qdrant
+(the sparse vector is configured with `modifier=IDF`), so no corpus
+statistics need to be kept at ingest time. Terms are hashed to 32-bit
+indices, so there is no vocabulary to store or ship either.
+
+The API computes query vectors with the same tokenizer and hashing
+(`api/app/sparse.py`); the two must stay in sync.
+"""
+import re
+import zlib
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from ..config import config
+
+# Name of the sparse vector in the collection
+SPARSE_VECTOR_NAME = "bm25"
+
+# BM25 saturation and length normalisation
+K1 = 1.2
+B = 0.75
+
+# Words, keeping codes like CET1, UNRATE, Basel-III and 10.5 as single terms
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+# Function words that carry no retrieval signal
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the
+this to was were which will with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lower-cased terms, dropping stopwords.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List of terms in order
+    """
+    return [term for term in _TOKEN.findall(text.lower()) if term not in STOPWORDS]
+
+
+def term_index(term: str) -> int:
+    """Stable 32-bit index of a term."""
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def document_vector(text: str, avg_doc_length: Optional[float] = None) -> Tuple[List[int], List[float]]:
+    """
+    BM25 term weights of a document.
+    
+    Args:
+        text: Document (chunk) text
+        avg_doc_length: Average document length in terms (default: config.sparse_avg_doc_length)
+    
+    Returns:
+        (indices, values) of the sparse vector
+    """
+    avg_doc_length = avg_doc_length or config.sparse_avg_doc_length
+    terms = tokenize(text)
+    norm = K1 * (1 - B + B * len(terms) / avg_doc_length)
+    
+    weights = {}
+    for term, tf in Counter(terms).items():
+        index = term_index(term)
+        # Hash collisions are merged rather than duplicated; Qdrant rejects repeated indices
+        weights[index] = weights.get(index, 0.0) + tf * (K1 + 1) / (tf + norm)
+    return list(weights), list(weights.values())
+
+
+def query_vector(text: str) -> Tuple[List[int], List[float]]:
+    """
+    Sparse vector of a query: each distinct term with weight 1.
+    
+    Args:
+        text: Query text
+    
+    Returns:
+        (indices, values) of the sparse vector
+    """
+    indices = sorted({term_index(term) for term in tokenize(text)})
+    return indices, [1.0] * len(indices)
@@ -0,0 +1,284 @@
+"""
+Columnar store for numeric time series.
+
+Each series is a directory holding two aligned NumPy arrays:
+
+    dates.npy    sorted observation dates, datetime64[D]
+    values.npy   observation values, float64 (NaN marks a missing value)
+
+Arrays are memory-mapped on read, so range and aggregate queries touch only
+the pages they need and never parse text.
+"""
+import os
+import re
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Union
+import numpy as np
+
+from ..config import config
+
+DateLike = Union[str, np.datetime64, None]
+
+# Period keys for aggregate(); quarter is derived from the month
+FREQUENCIES = ("month", "quarter", "year")
+
+
+def _day(value: DateLike) -> Optional[np.datetime64]:
+    """Convert a date-like value to datetime64[D]."""
+    if value is None:
+        return None
+    return np.datetime64(value, "D")
+
+
+def summarize(dates: np.ndarray, values: np.ndarray) -> Dict[str, Any]:
+    """
+    Summary statistics of observations, ignoring missing values.
+    
+    Args:
+        dates: Sorted observation dates
+        values: Observation values aligned with dates
+    
+    Returns:
+        Dictionary with count, first/last date and value, min, max, mean and
+        change; statistics are None when there are no values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    dates, values = np.asarray(dates)[present], values[present]
+    if not len(values):
+        return {"count": 0, "start": None, "end": None, "first": None, "last": None,
+                "min": None, "max": None, "mean": None, "change": None}
+    
+    return {
+        "count": int(len(values)),
+        "start": str(dates[0]),
+        "end": str(dates[-1]),
+        "first": float(values[0]),
+        "last": float(values[-1]),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+        "change": float(values[-1] - values[0]),
+    }
+
+
+class TimeSeriesStore:
+    """Memory-mapped observation store keyed by series ID."""
+    
+    def __init__(self, directory: Path):
+        """
+        Open (or create) a time-series store.
+        
+        Args:
+            directory: Directory holding one subdirectory per series
+        """
+        self.directory = Path(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+    
+    def _path(self, series_id: str) -> Path:
+        """Directory of a series; IDs are restricted to safe path characters."""
+        if not re.fullmatch(r"[A-Za-z0-9_.\-]+", series_id):
+            raise ValueError(f"Invalid series ID: {series_id!r}")
+        return self.directory / series_id
+    
+    def series_ids(self) -> List[str]:
+        """IDs of every stored series."""
+        return sorted(path.name for path in self.directory.iterdir() if (path / "values.npy").exists())
+    
+    def read(self, series_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get all observations of a series.
+        
+        Args:
+            series_id: Series ID
+        
+        Returns:
+            (dates, values) memory-mapped arrays; empty arrays if the series is not stored
+        """
+        path = self._path(series_id)
+        if not (path / "values.npy").exists():
+            return np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=np.float64)
+        with self._lock:
+            return (np.load(path / "dates.npy", mmap_mode="r"),
+                    np.load(path / "values.npy", mmap_mode="r"))
+    
+    def write(self, series_id: str, dates: np.ndarray, values: np.ndarray) -> None:
+        """
+        Replace the observations of a series.
+        
+        Args:
+            series_id: Series ID
+            dates: Observation dates (any datetime64 resolution or ISO strings)
+            values: Observation values aligned with dates
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        values = np.asarray(values, dtype=np.float64)
+        if dates.shape != values.shape:
+            raise ValueError(f"dates and values differ in shape: {dates.shape} != {values.shape}")
+        order = np.argsort(dates, kind="stable")
+        
+        path = self._path(series_id)
+        os.makedirs(path, exist_ok=True)
+        # Write both files before swapping either in, so readers never see a torn series
+        for name, array in [("dates", dates[order]), ("values", values[order])]:
+            with open(path / f"{name}.npy.tmp", "wb") as f:
+                np.save(f, array)
+        with self._lock:
+            os.replace(path / "dates.npy.tmp", path / "dates.npy")
+            os.replace(path / "values.npy.tmp", path / "values.npy")
+    
+    def merge(self, series_id: str, dates: np.ndarray, values: np.ndarray) -> int:
+        """
+        Add observations to a series, replacing stored values for the same dates.
+        
+        Args:
+            series_id: Series ID
+            dates: Observation dates
+            values: Observation values aligned with dates
+        
+        Returns:
+            Number of observations stored after the merge
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        values = np.asarray(values, dtype=np.float64)
+        old_dates, old_values = self.read(series_id)
+        
+        # New observations come first so np.unique keeps them over revised ones
+        all_dates = np.concatenate([dates, old_dates])
+        all_values = np.concatenate([values, old_values])
+        merged_dates, first = np.unique(all_dates, return_index=True)
+        self.write(series_id, merged_dates, all_values[first])
+        return len(merged_dates)
+    
+    def latest_date(self, series_id: str) -> Optional[np.datetime64]:
+        """
+        Date of the most recent stored observation.
+        
+        Args:
+            series_id: Series ID
+        
+        Returns:
+            datetime64[D], or None if the series is not stored
+        """
+        dates, _ = self.read(series_id)
+        return dates[-1] if len(dates) else None
+    
+    def range(self,
+              series_id: str,
+              start: DateLike = None,
+              end: DateLike = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Observations between two dates, inclusive.
+        
+        Args:
+            series_id: Series ID
+            start: First date (default: first observation)
+            end: Last date (default: last observation)
+        
+        Returns:
+            (dates, values) views into the memory-mapped arrays
+        """
+        dates, values = self.read(series_id)
+        lo = 0 if start is None else np.searchsorted(dates, _day(start), side="left")
+        hi = len(dates) if end is None else np.searchsorted(dates, _day(end), side="right")
+        return dates[lo:hi], values[lo:hi]
+    
+    def summary(self,
+                series_id: str,
+                start: DateLike = None,
+                end: DateLike = None) -> Dict[str, Any]:
+        """
+        Summary statistics of a series over a date range, ignoring missing values.
+        
+        Args:
+            series_id: Series ID
+            start: First date (default: first observation)
+            end: Last date (default: last observation)
+        
+        Returns:
+            Dictionary of statistics as returned by `summarize`
+        """
+        return summarize(*self.range(series_id, start, end))
+    
+    def aggregate(self,
+                  series_id: str,
+                  freq: str = "year",
+                  how: str = "mean",
+                  start: DateLike = None,
+                  end: DateLike = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Aggregate a series into calendar periods.
+        
+        Args:
+            series_id: Series ID
+            freq: Period length: "month", "quarter" or "year"
+            how: Aggregation: "mean", "sum", "min", "max", "last" or "count"
+            start: First date (default: first observation)
+            end: Last date (default: last observation)
+        
+        Returns:
+            (period labels, aggregated values); missing values are ignored
+        """
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency {freq!r}, expected one of {FREQUENCIES}")
+        
+        dates, values = self.range(series_id, start, end)
+        present = ~np.isnan(values)
+        dates, values = dates[present], np.asarray(values[present])
+        if not len(values):
+            return [], np.empty(0)
+        
+        months = dates.astype("datetime64[M]")
+        if freq == "month":
+            keys = months.astype(np.int64)
+        elif freq == "quarter":
+            keys = months.astype(np.int64) // 3
+        else:
+            keys = dates.astype("datetime64[Y]").astype(np.int64)
+        
+        # Dates are sorted, so each period is one contiguous run
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        counts = np.diff(np.r_[starts, len(values)])
+        if how == "mean":
+            result = np.add.reduceat(values, starts) / counts
+        elif how == "sum":
+            result = np.add.reduceat(values, starts)
+        elif how == "min":
+            result = np.minimum.reduceat(values, starts)
+        elif how == "max":
+            result = np.maximum.reduceat(values, starts)
+        elif how == "last":
+            result = values[starts + counts - 1]
+        elif how == "count":
+            result = counts.astype(np.float64)
+        else:
+            raise ValueError(f"Unknown aggregation {how!r}")
+        
+        period_keys = keys[starts]
+        if freq == "month":
+            labels = [str(key) for key in period_keys.astype("datetime64[M]")]
+        elif freq == "quarter":
+            labels = [f"{1970 + key // 4}-Q{key % 4 + 1}" for key in period_keys.tolist()]
+        else:
+            labels = [str(key) for key in period_keys.astype("datetime64[Y]")]
+        return labels, result
+
+
+_store: Optional[TimeSeriesStore] = None
+_store_lock = threading.Lock()
+
+
+def get_timeseries_store() -> TimeSeriesStore:
+    """
+    Get the shared time-series store for the current configuration.
+    
+    Returns:
+        TimeSeriesStore instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TimeSeriesStore(config.timeseries_dir or config.state_dir / "timeseries")
+    return _store
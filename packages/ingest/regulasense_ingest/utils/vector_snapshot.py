@@ -0,0 +1,248 @@
+"""
+Columnar snapshots with precomputed embeddings.
+
+A vector snapshot is a directory holding:
+
+    points.parquet   one row per chunk: point ID, payload fields, item hash
+    vectors.npy      contiguous float32/float16 matrix, row i = point i
+    snapshot.json    embedding model, dimensions, dtype and point count
+
+Loading memory-maps the vectors and streams them into Qdrant in large
+batches, so rebuilding a collection needs no embedding API calls.
+"""
+import io
+import json
+import os
+import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from qdrant_client import QdrantClient
+
+from ..config import config
+from ..sources.base import DataItem
+from .embeddings import get_embeddings, chunk_text
+from .manifest import get_manifest, point_id, content_hash
+from .qdrant import (ensure_collection_exists, sync_manifest, get_qdrant_client, bump_collection_version,
+                     point_vectors, delete_points)
+
+# Bytes reserved for the .npy header, which is written once the row count is known
+NPY_HEADER_BYTES = 128
+
+SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("item_hash", pa.string()),
+    ("source", pa.string()),
+    ("source_id", pa.string()),
+    ("chunk_index", pa.int32()),
+    ("total_chunks", pa.int32()),
+    ("timestamp", pa.string()),
+    ("text", pa.string()),
+    ("metadata", pa.string()),
+])
+
+
+class VectorSnapshotWriter:
+    """Chunk, embed and append items to a vector snapshot directory."""
+    
+    def __init__(self, path: Path, dtype: Optional[str] = None):
+        """
+        Create a vector snapshot directory.
+        
+        Args:
+            path: Directory to write
+            dtype: Vector dtype, "float32" or "float16" (default: config.snapshot_vector_dtype)
+        """
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype or config.snapshot_vector_dtype)
+        self.count = 0
+        self.dimensions: Optional[int] = None
+        os.makedirs(self.path, exist_ok=True)
+        
+        self._pending: List[Dict[str, Any]] = []
+        self._vectors = open(self.path / "vectors.npy", "wb")
+        self._vectors.write(b"\0" * NPY_HEADER_BYTES)
+        self._points = pq.ParquetWriter(str(self.path / "points.parquet"), SCHEMA)
+    
+    def add(self, item: DataItem) -> None:
+        """
+        Chunk an item and queue its chunks for embedding.
+        
+        Args:
+            item: DataItem to add
+        """
+        item_hash = content_hash(item)
+        metadata = json.dumps(item.metadata, default=str)
+        chunks = chunk_text(item.content)
+        for chunk_idx, chunk in enumerate(chunks):
+            self._pending.append({
+                "id": point_id(item.source, item.source_id, chunk_idx),
+                "item_hash": item_hash,
+                "source": item.source,
+                "source_id": item.source_id,
+                "chunk_index": chunk_idx,
+                "total_chunks": len(chunks),
+                "timestamp": item.timestamp,
+                "text": chunk,
+                "metadata": metadata,
+            })
+        
+        if len(self._pending) >= config.embedding_batch_size:
+            self._flush()
+    
+    def _flush(self) -> None:
+        """Embed queued chunks and append them to both files."""
+        if not self._pending:
+            return
+        
+        embeddings = np.asarray(get_embeddings([row["text"] for row in self._pending]), dtype=self.dtype)
+        if self.dimensions is None:
+            self.dimensions = embeddings.shape[1]
+        self._vectors.write(embeddings.tobytes())
+        self._points.write_table(pa.Table.from_pylist(self._pending, schema=SCHEMA))
+        
+        self.count += len(self._pending)
+        self._pending = []
+    
+    def close(self) -> Path:
+        """
+        Flush remaining chunks and finalise the snapshot.
+        
+        Returns:
+            Path to the snapshot directory
+        """
+        self._flush()
+        self._points.close()
+        
+        # Now that the shape is known, fill in the reserved .npy header
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {
+            "descr": np.lib.format.dtype_to_descr(self.dtype),
+            "fortran_order": False,
+            "shape": (self.count, self.dimensions or 0),
+        })
+        if len(header.getvalue()) != NPY_HEADER_BYTES:
+            raise ValueError(f"Unexpected .npy header size {len(header.getvalue())}")
+        self._vectors.seek(0)
+        self._vectors.write(header.getvalue())
+        self._vectors.close()
+        
+        with open(self.path / "snapshot.json", "w") as f:
+            json.dump({
+                "embedding_model": config.embedding_model,
+                "dimensions": self.dimensions,
+                "dtype": self.dtype.name,
+                "count": self.count,
+                "created": datetime.datetime.now().isoformat(),
+            }, f, indent=2)
+        
+        return self.path
+    
+    def __enter__(self) -> "VectorSnapshotWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._points.close()
+            self._vectors.close()
+
+
+def _iter_ids(points: pq.ParquetFile, batch_size: int) -> Iterator[str]:
+    """Stream point IDs from the points file."""
+    for batch in points.iter_batches(batch_size=batch_size, columns=["id"]):
+        yield from batch.column(0).to_pylist()
+
+
+def _iter_payloads(points: pq.ParquetFile, batch_size: int) -> Iterator[Dict[str, Any]]:
+    """Stream point payloads from the points file, in the same shape as `chunk_payload`."""
+    columns = ["source", "source_id", "chunk_index", "total_chunks", "timestamp", "text", "metadata"]
+    for batch in points.iter_batches(batch_size=batch_size, columns=columns):
+        for row in batch.to_pylist():
+            metadata = json.loads(row.pop("metadata"))
+            yield {**metadata, **row}
+
+
+def _iter_hybrid_vectors(vectors: np.ndarray, points: pq.ParquetFile, batch_size: int) -> Iterator[Dict[str, Any]]:
+    """Stream dense vectors together with the sparse vector of each chunk's text."""
+    row = 0
+    for batch in points.iter_batches(batch_size=batch_size, columns=["text"]):
+        for text in batch.column(0).to_pylist():
+            yield point_vectors(text, vectors[row].tolist())
+            row += 1
+
+
+def upload_vector_snapshot(path: Path,
+                           client: Optional[QdrantClient] = None,
+                           batch_size: Optional[int] = None,
+                           parallel: Optional[int] = None) -> int:
+    """
+    Load a vector snapshot into Qdrant without calling the embedding API.
+    
+    Args:
+        path: Vector snapshot directory
+        client: Optional QdrantClient instance
+        batch_size: Points per upload request (default: config.snapshot_upload_batch_size)
+        parallel: Concurrent upload workers (default: config.snapshot_upload_parallel)
+    
+    Returns:
+        Number of points uploaded
+    """
+    path = Path(path)
+    batch_size = batch_size or config.snapshot_upload_batch_size
+    parallel = parallel or config.snapshot_upload_parallel
+    
+    with open(path / "snapshot.json") as f:
+        meta = json.load(f)
+    if meta["embedding_model"] != config.embedding_model:
+        raise ValueError(f"Snapshot {path} was embedded with {meta['embedding_model']}, "
+                         f"but EMBEDDING_MODEL is {config.embedding_model}")
+    
+    if client is None:
+        client = get_qdrant_client()
+    client = ensure_collection_exists(client)
+    manifest = get_manifest()
+    sync_manifest(client, manifest)
+    
+    # Memory-mapped; Qdrant reads it slice by slice
+    vectors = np.load(path / "vectors.npy", mmap_mode="r")
+    points = pq.ParquetFile(str(path / "points.parquet"))
+    
+    print(f"Uploading {meta['count']} points from {path}...")
+    client.upload_collection(
+        collection_name=config.collection_name,
+        vectors=_iter_hybrid_vectors(vectors, points, batch_size) if config.collection.sparse_vectors else vectors,
+        payload=_iter_payloads(points, batch_size),
+        ids=_iter_ids(points, batch_size),
+        batch_size=batch_size,
+        parallel=parallel,
+        wait=True
+    )
+    
+    # Items whose snapshot version has fewer chunks than the one ingested before
+    # leave points behind; find them before the manifest forgets the old count
+    columns = ["source", "source_id", "item_hash", "total_chunks", "chunk_index"]
+    entries = []
+    stale_ids = []
+    for batch in points.iter_batches(batch_size=batch_size, columns=columns):
+        batch_entries = [
+            (row["source"], row["source_id"], row["item_hash"], row["total_chunks"])
+            for row in batch.to_pylist() if row["chunk_index"] == 0
+        ]
+        recorded = manifest.chunk_counts((source, source_id) for source, source_id, _, _ in batch_entries)
+        for source, source_id, _, total_chunks in batch_entries:
+            old_count = recorded.get((source, source_id), 0)
+            stale_ids.extend(point_id(source, source_id, idx) for idx in range(total_chunks, old_count))
+        entries.extend(batch_entries)
+    if stale_ids:
+        delete_points(client, stale_ids)
+    
+    # Record the items so incremental runs can skip them
+    manifest.record_many(entries)
+    
+    bump_collection_version(client)
+    print(f"Uploaded {meta['count']} points to Qdrant ({len(stale_ids)} stale points deleted)")
+    return meta["count"]
@@ -0,0 +1,217 @@
+"""
+Tests for the shared crawler against a local HTTP server.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from regulasense_ingest.utils.http import Crawler, TokenBucket
+from regulasense_ingest.utils.http_cache import HttpCache
+
+
+class Server:
+    """Local HTTP/1.1 server whose responses are scripted per path."""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append({
+                        "path": self.path,
+                        "headers": dict(self.headers),
+                        "client": self.client_address,
+                        "time": time.monotonic(),
+                    })
+                route = server.routes.get(self.path)
+                if route is None:
+                    status, headers, body = 404, {}, b"not found"
+                elif callable(route):
+                    status, headers, body = route(self)
+                else:
+                    # A list of responses is served in order, repeating the last one
+                    status, headers, body = route.pop(0) if len(route) > 1 else route[0]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def hits(self, path):
+        """Requests received for a path."""
+        return [request for request in self.requests if request["path"] == path]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = Server()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(tmp_path / "http")
+
+
+def make_crawler(cache, **kwargs):
+    """Crawler with test-friendly defaults: no pacing, quick retries."""
+    options = dict(concurrency=2, rate_per_host=1000, burst=1000, max_retries=3, backoff=0.05, timeout=5)
+    options.update(kwargs)
+    return Crawler(cache=cache, **options)
+
+
+def test_fetch_many_reuses_pooled_connections(server, cache):
+    for i in range(12):
+        server.routes[f"/doc/{i}"] = [(200, {"Content-Type": "text/html"}, f"<p>doc {i}</p>".encode())]
+    crawler = make_crawler(cache)
+
+    urls = [f"{server.url}/doc/{i}" for i in range(12)]
+    results = list(crawler.fetch_many(urls))
+    crawler.close()
+
+    assert [url for url, _, _ in results] == urls
+    assert all(error is None for _, _, error in results)
+    assert [page.text for _, page, _ in results] == [f"<p>doc {i}</p>" for i in range(12)]
+    # Twelve requests over at most `concurrency` keep-alive connections
+    assert len({request["client"] for request in server.requests}) <= 2
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    for _ in range(2):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.04
+    for _ in range(4):
+        bucket.acquire()
+    # Four tokens beyond the burst at 20 per second
+    assert time.monotonic() - start >= 0.18
+
+
+def test_requests_to_one_host_are_paced(server, cache):
+    server.routes["/paced"] = [(200, {}, b"ok")]
+    crawler = make_crawler(cache, rate_per_host=10, burst=1)
+
+    for _ in range(4):
+        crawler.get(f"{server.url}/paced")
+    crawler.close()
+
+    times = [request["time"] for request in server.hits("/paced")]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert len(times) == 4
+    assert min(gaps) >= 0.08
+
+
+def test_5xx_is_retried_with_backoff(server, cache):
+    server.routes["/flaky"] = [(503, {}, b""), (502, {}, b""), (200, {}, b"recovered")]
+    crawler = make_crawler(cache, backoff=0.1)
+
+    start = time.monotonic()
+    page = crawler.get(f"{server.url}/flaky")
+    elapsed = time.monotonic() - start
+    crawler.close()
+
+    assert page.text == "recovered"
+    assert len(server.hits("/flaky")) == 3
+    # urllib3 retries the first failure at once and then backs off 0.1 * 2**1
+    assert elapsed >= 0.2
+
+
+def test_429_honours_retry_after(server, cache):
+    server.routes["/limited"] = [(429, {"Retry-After": "1"}, b""), (200, {}, b"ok")]
+    crawler = make_crawler(cache)
+
+    start = time.monotonic()
+    page = crawler.get(f"{server.url}/limited")
+    elapsed = time.monotonic() - start
+    crawler.close()
+
+    assert page.text == "ok"
+    assert len(server.hits("/limited")) == 2
+    assert elapsed >= 0.9
+
+
+def test_gives_up_after_max_retries(server, cache):
+    server.routes["/down"] = [(500, {}, b"")]
+    crawler = make_crawler(cache, max_retries=2, backoff=0.01)
+
+    with pytest.raises(requests.HTTPError):
+        crawler.get(f"{server.url}/down")
+    crawler.close()
+
+    assert len(server.hits("/down")) == 3
+
+
+def test_304_reuses_cached_body_and_parse(server, cache):
+    def page(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"ETag": '"v1"', "Content-Type": "text/html"}, b"<h1>Report</h1>"
+    server.routes["/report"] = page
+    crawler = make_crawler(cache)
+    calls = []
+
+    def parser(html):
+        calls.append(html)
+        return {"title": html}
+
+    first = crawler.get(f"{server.url}/report")
+    assert crawler.parse(first, parser) == {"title": "<h1>Report</h1>"}
+    second = crawler.get(f"{server.url}/report")
+    assert crawler.parse(second, parser) == {"title": "<h1>Report</h1>"}
+    crawler.close()
+
+    assert not first.not_modified
+    assert second.not_modified
+    assert second.content == b"<h1>Report</h1>"
+    assert len(calls) == 1
+    assert server.hits("/report")[1]["headers"].get("If-None-Match") == '"v1"'
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_304_after_eviction_refetches_unconditionally(server, cache):
+    url = f"{server.url}/evicted"
+
+    def page(handler):
+        if handler.headers.get("If-None-Match"):
+            # The body is evicted while the conditional request is in flight
+            cache._paths(url)[0].unlink()
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"ETag": '"v2"'}, b"fresh"
+    server.routes["/evicted"] = page
+    crawler = make_crawler(cache)
+
+    crawler.get(url)
+    page = crawler.get(url)
+    crawler.close()
+
+    hits = server.hits("/evicted")
+    assert page.content == b"fresh"
+    assert not page.not_modified
+    assert len(hits) == 3
+    assert "If-None-Match" in hits[1]["headers"]
+    assert "If-None-Match" not in hits[2]["headers"]
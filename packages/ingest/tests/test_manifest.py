@@ -0,0 +1,157 @@
+"""
+Tests for the incremental ingest manifest against an in-memory Qdrant.
+"""
+import datetime
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+from qdrant_client import QdrantClient, models
+
+from regulasense_ingest.config import config
+from regulasense_ingest.sources import fred
+from regulasense_ingest.sources.base import DataItem
+from regulasense_ingest.utils import qdrant, timeseries, vector_snapshot
+from regulasense_ingest.utils.manifest import content_hash, get_manifest, point_id, stale_point_ids
+
+DIMENSIONS = 4
+
+
+@pytest.fixture
+def embed_calls(tmp_path, monkeypatch):
+    """Isolate state and collection, and replace the embedding API with a counting fake."""
+    monkeypatch.setattr(config, "state_dir", tmp_path / "state")
+    monkeypatch.setattr(config, "collection_name", "manifest-test")
+    monkeypatch.setattr(config, "chunk_max_tokens", 20)
+    monkeypatch.setattr(config, "chunk_overlap_tokens", 0)
+    monkeypatch.setattr(config, "snapshot_upload_parallel", 1)
+    monkeypatch.setattr(config.collection, "vector_size", DIMENSIONS)
+    monkeypatch.setattr(config.collection, "sparse_vectors", False)
+    calls = []
+
+    def get_embeddings(texts, **kwargs):
+        calls.append(list(texts))
+        return [[1.0, float(len(text)), 0.0, 1.0] for text in texts]
+
+    monkeypatch.setattr(qdrant, "get_embeddings", get_embeddings)
+    monkeypatch.setattr(vector_snapshot, "get_embeddings", get_embeddings)
+    return calls
+
+
+@pytest.fixture
+def client():
+    return QdrantClient(":memory:")
+
+
+def document(source_id, sentences, **metadata):
+    content = " ".join(f"Sentence {i} of the {source_id} document." for i in range(sentences))
+    return DataItem(content=content, source="test", source_id=source_id, metadata=metadata)
+
+
+def chunk_indexes(client, source_id):
+    points, _ = client.scroll(
+        collection_name=config.collection_name,
+        scroll_filter=models.Filter(must=[
+            models.FieldCondition(key="source_id", match=models.MatchValue(value=source_id))
+        ]),
+        limit=1000
+    )
+    return sorted(point.payload["chunk_index"] for point in points)
+
+
+def test_content_hash_is_stable_across_runs():
+    first = DataItem(content="Basel III liquidity", source="bis", source_id="d1",
+                     metadata={"title": "LCR", "url": "https://www.bis.org/d1.htm"})
+    # Built later, with the metadata in another order
+    second = DataItem(content="Basel III liquidity", source="bis", source_id="d1",
+                      metadata={"url": "https://www.bis.org/d1.htm", "title": "LCR"})
+
+    assert content_hash(first) == content_hash(second)
+    second.metadata["title"] = "NSFR"
+    assert content_hash(first) != content_hash(second)
+
+
+def test_unchanged_items_are_skipped(embed_calls, client):
+    items = [document("a", 12), document("b", 3)]
+    written = qdrant.upload_items(items, client)
+    assert written == len(chunk_indexes(client, "a")) + len(chunk_indexes(client, "b"))
+    embedded = len(embed_calls)
+
+    assert qdrant.upload_items([document("a", 12), document("b", 3)], client) == 0
+    assert len(embed_calls) == embedded
+
+    assert qdrant.upload_items([document("a", 12), document("b", 4)], client) == len(chunk_indexes(client, "b"))
+
+
+def test_shorter_item_deletes_its_stale_points(embed_calls, client):
+    qdrant.upload_items([document("a", 12)], client)
+    before = chunk_indexes(client, "a")
+    assert len(before) > 2
+
+    qdrant.upload_items([document("a", 2)], client)
+    after = chunk_indexes(client, "a")
+    assert after == list(range(len(after)))
+    assert len(after) < len(before)
+    assert get_manifest().lookup(document("a", 2))[1] == len(after)
+
+
+def test_stale_point_ids_cover_only_lost_chunks():
+    item = document("a", 1)
+    assert stale_point_ids(item, old_count=5, new_count=3) == [point_id("test", "a", 3), point_id("test", "a", 4)]
+    assert stale_point_ids(item, old_count=3, new_count=5) == []
+
+
+def test_vector_snapshot_deletes_chunks_of_shorter_items(embed_calls, client, tmp_path):
+    qdrant.upload_items([document("a", 12)], client)
+    assert len(chunk_indexes(client, "a")) > 2
+
+    with vector_snapshot.VectorSnapshotWriter(tmp_path / "snapshot") as writer:
+        writer.add(document("a", 2))
+    vector_snapshot.upload_vector_snapshot(tmp_path / "snapshot", client)
+
+    after = chunk_indexes(client, "a")
+    assert after == list(range(writer.count))
+    assert get_manifest().lookup(document("a", 2))[1] == writer.count
+
+
+class FakeFred:
+    """FRED client serving one monthly series, unchanged between runs."""
+
+    def __init__(self, api_key):
+        pass
+
+    def get_series_info(self, series_id):
+        return pd.Series({"title": "Gross Domestic Product", "units": "Billions of Dollars",
+                          "frequency": "Monthly", "notes": "", "last_updated": "2024-12-20 07:51:02-06"})
+
+    def get_series(self, series_id, observation_start=None, observation_end=None, **kwargs):
+        dates = pd.date_range("2015-01-01", "2024-12-01", freq="MS")
+        series = pd.Series(np.arange(len(dates), dtype=float), index=dates)
+        if observation_start:
+            series = series[series.index >= observation_start]
+        return series
+
+
+def frozen_datetime(today):
+    """Stand-in for the `datetime` module whose clock reads `today`."""
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls.combine(today, datetime.time(12))
+    return types.SimpleNamespace(datetime=FrozenDatetime, timedelta=datetime.timedelta)
+
+
+def test_fred_item_hash_does_not_change_from_day_to_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "state_dir", tmp_path / "state")
+    monkeypatch.setattr(config, "fred_api_key", "test")
+    monkeypatch.setattr(timeseries, "_store", None)
+    monkeypatch.setattr(fred, "Fred", FakeFred)
+
+    hashes = []
+    for today in (datetime.date(2025, 1, 10), datetime.date(2025, 1, 11)):
+        monkeypatch.setattr(fred, "datetime", frozen_datetime(today))
+        items = list(fred.FredSource().fetch(series_ids=["GDP"]))
+        hashes.append(content_hash(items[0]))
+
+    assert hashes[0] == hashes[1]
@@ -4,7 +4,9 @@ Test script for RegulaSense API.
 Sends a sample query and prints the response.
 """
 import os
+import sys
 import json
+import time
 import requests
 from dotenv import load_dotenv
 
@@ -32,7 +34,9 @@ def test_api():
         print("\nAPI Response:")
         print(json.dumps(result, indent=2))
         
-        # Parse as JSON if it's a string
+        # The statement itself is a JSON string in the "result" field
+        if isinstance(result, dict):
+            result = result.get("result")
         if isinstance(result, str):
             try:
                 parsed = json.loads(result)
@@ -46,9 +50,42 @@ def test_api():
         print(f"Error testing API: {e}")
         return False
 
+def test_stream():
+    """Test the streaming endpoint, printing each server-sent event as it arrives."""
+    query = {
+        "prompt": "Extract the key financial metrics from Apple's most recent 10-K filing. Generate an XBRL-compatible financial statement with their revenue, assets, and net income."
+    }
+    url = API_URL.rstrip("/") + "/stream"
+    
+    try:
+        print(f"Streaming from {url}...")
+        start = time.perf_counter()
+        first_byte = None
+        with requests.post(url, json=query, stream=True, timeout=300) as response:
+            response.raise_for_status()
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                    print(f"Time to first byte: {first_byte:.3f} s")
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: "):])
+                    if event == "draft":
+                        print(data["delta"], end="", flush=True)
+                    else:
+                        print(f"\n[{time.perf_counter() - start:7.3f} s] {event}: {json.dumps(data)}")
+                    if event == "error":
+                        return False
+        return True
+    except Exception as e:
+        print(f"Error testing streaming API: {e}")
+        return False
+
 if __name__ == "__main__":
     print("Testing RegulaSense API...")
-    success = test_api()
+    success = test_stream() if "--stream" in sys.argv else test_api()
     if success:
         print("\nAPI test completed successfully!")
     else: